@@ -1,30 +1,100 @@
 """
 Financial Management Function Library
 
-A comprehensive function library for money tracking, categorization, 
+A comprehensive function library for money tracking, categorization,
 and transaction cleaning.
 
 Author: Nathan Urbaez and Haorui Cui
 Course: Object-Oriented Programming for Information Science
 Institution: University of Maryland, College Park
+
+Importing the package is cheap: the names below are resolved on first
+attribute access (PEP 562), so `from SRC import FinanceLedger` loads the
+ledger and its dependencies, while a tool that only needs
+`categorize_transaction` never pays for them. Submodules import each
+other relatively, so importing SRC leaves sys.path and the import system
+untouched.
+
+Startup cost is checked by `python -m SRC.benchmark --import-time`.
 """
 
-# Import all functions from the main module
-from .library_financial_functions import (
+import importlib
+
+# Modules reachable as SRC.<name>
+_SUBMODULES = (
+    "library_financial_functions", "finance_ledger", "finance_json", "category_rules", "keyword_index",
+    "ledger_cache", "ledger_query", "ledger_reconcile", "ledger_stats", "ledger_storage", "budget_class",
+    "spending_analyzer", "transaction_class", "synthetic_ledger", "instrumentation", "benchmark", "ledger_cli",
+)
+
+# Public name -> module that defines it
+_EXPORTS = {
     # Financial Calculations
-    calculate_total_spending,
-    calculate_average_spending,
-    
+    "calculate_total_spending": "library_financial_functions",
+    "calculate_average_spending": "library_financial_functions",
+    "compute_category_totals": "library_financial_functions",
+    "budget_status": "library_financial_functions",
+    "budget_summary": "library_financial_functions",
+    "top_categories": "library_financial_functions",
+    "to_cents": "library_financial_functions",
+    "from_cents": "library_financial_functions",
     # Categorization & Parsing
-    categorize_transaction,
-    parse_search_query,
-    
+    "categorize_transaction": "library_financial_functions",
+    "categorize_many": "library_financial_functions",
+    "parse_date": "library_financial_functions",
+    "try_parse_date": "library_financial_functions",
+    "is_expense": "library_financial_functions",
     # Keyword & Text Analysis
-    extract_keywords,
-    clean_text_content,
-    
+    "clean_text_content": "library_financial_functions",
+    "normalize_description": "library_financial_functions",
+    "NormalizedText": "library_financial_functions",
+    "tokenize_financial_text": "library_financial_functions",
+    "extract_financial_keywords": "library_financial_functions",
+    "search_transactions": "library_financial_functions",
+    "filter_transactions_by_date": "library_financial_functions",
+    "analyze_spending_trends": "library_financial_functions",
+    "detect_recurring_expenses": "library_financial_functions",
     # Validation & Formatting
-    validate_url_format,
-    format_search_results
-)
+    "format_currency": "library_financial_functions",
+    # Ledger
+    "FinanceLedger": "finance_ledger",
+    "LedgerSnapshot": "finance_ledger",
+    "AbstractTransaction": "finance_ledger",
+    "ExpenseTransaction": "finance_ledger",
+    "IncomeTransaction": "finance_ledger",
+    "validate_transaction_batch": "finance_ledger",
+    "BatchValidationResult": "finance_ledger",
+    "RowError": "finance_ledger",
+    "BudgetEvent": "finance_ledger",
+    "Anomaly": "finance_ledger",
+    "CategoryRule": "category_rules",
+    "RuleSet": "category_rules",
+    "reconcile": "ledger_reconcile",
+    "reconcile_sorted": "ledger_reconcile",
+    "ReconcileResult": "ledger_reconcile",
+    "KeywordIndex": "keyword_index",
+    "QuantileSketch": "ledger_stats",
+    "RunningStats": "ledger_stats",
+    # Classes
+    "Budget": "budget_class",
+    "SpendingAnalyzer": "spending_analyzer",
+    "Transaction": "transaction_class",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    elif name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_SUBMODULES))
 
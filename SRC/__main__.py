@@ -0,0 +1,7 @@
+"""Run the batch-processing command line: python -m SRC <command> ... (see ledger_cli)."""
+
+import sys
+
+from .ledger_cli import main
+
+sys.exit(main(prog="python -m SRC"))
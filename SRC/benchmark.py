@@ -0,0 +1,430 @@
+"""
+Performance Benchmark Suite
+
+Times every public function in library_financial_functions, every public
+FinanceLedger method, and save/load for both finance_ledger and finance_json
+on synthetic ledgers (see synthetic_ledger.py) of increasing size. Results
+are written as JSON so runs from different versions can be compared.
+
+Usage (from the repository root):
+    python -m SRC.benchmark --sizes 1000 10000 100000 --output bench.json
+    python -m SRC.benchmark --sizes 1000 --only ledger. --compare bench.json
+    python -m SRC.benchmark --import-time      (exits 1 when an import is over budget)
+
+Sizes up to 10^7 are supported; the per-row cases scale linearly, so
+expect minutes per case at the top end.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import inspect
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import finance_json
+from . import ledger_reconcile
+from . import library_financial_functions as lib
+from . import transaction_class
+from .category_rules import CategoryRule, RuleSet
+from .finance_ledger import FinanceLedger
+from .synthetic_ledger import generate_transactions
+
+BUDGETS = {"food": 400.0, "transportation": 150.0, "entertainment": 60.0, "shopping": 200.0}
+
+
+@dataclass
+class BenchContext:
+    """Shared, pre-built inputs for one ledger size."""
+    size: int
+    rows: List[Dict]          # raw generator output, mixed date formats
+    records: List[Dict]       # normalized ledger records
+    ledger: FinanceLedger     # populated from rows
+    tmpdir: str
+    year: int
+    month: int
+    start: str
+    end: str
+
+
+def build_context(size: int, seed: int, tmpdir: str) -> BenchContext:
+    """Generate `size` rows and load them into a ledger (not timed)."""
+    rows = list(generate_transactions(size, seed=seed))
+    ledger = FinanceLedger("bench", BUDGETS)
+    ledger.add_transactions(rows)
+    records = ledger.transactions
+    mid = records[len(records) // 2]["date"] if records else "2015-01-15"
+    year, month = int(mid[:4]), int(mid[5:7])
+    return BenchContext(size, rows, records, ledger, tmpdir, year, month,
+                        start=f"{year:04d}-01-01", end=f"{year:04d}-12-31")
+
+
+def _path(ctx: BenchContext, name: str) -> str:
+    return os.path.join(ctx.tmpdir, f"{name}_{ctx.size}")
+
+
+def _fresh_ledger(ctx: BenchContext) -> FinanceLedger:
+    ledger = FinanceLedger("bench", BUDGETS)
+    ledger.add_transactions(ctx.records)
+    return ledger
+
+
+def _concurrent_ledger(ctx: BenchContext) -> FinanceLedger:
+    ledger = FinanceLedger("bench", BUDGETS, concurrent=True)
+    ledger.add_transactions(ctx.records)
+    return ledger
+
+
+def _partitioned_ledger_with_new_row(ctx: BenchContext) -> FinanceLedger:
+    _fresh_ledger(ctx).save_partitioned(_path(ctx, "parts"))
+    ledger = FinanceLedger.open_partitioned(_path(ctx, "parts"))
+    last = ctx.records[-1]["date"] if ctx.records else "2015-01-15"
+    ledger.add_transaction("expense", "Late coffee", 4.5, last)
+    return ledger
+
+
+def _rules_with_rideshare() -> RuleSet:
+    """The built-in rules plus one: a change that touches only the Uber rows."""
+    rules = RuleSet.default_rules()
+    return RuleSet(list(rules) + [CategoryRule("Rideshare", "uber", priority=100)], rules.default)
+
+
+def _bank_export(ctx: BenchContext) -> List[Dict]:
+    """The ledger as a bank would report it: every 3rd row a day late, every 20th missing."""
+    rows = []
+    for i, t in enumerate(ctx.records):
+        if i % 20 == 19:
+            continue
+        if i % 3 == 0:
+            t = dict(t, date=(datetime.fromisoformat(t["date"]) + timedelta(days=1)).strftime("%Y-%m-%d"))
+        rows.append(t)
+    return rows
+
+
+def _json_ledger(ctx: BenchContext) -> finance_json.FinanceLedger:
+    ledger = finance_json.FinanceLedger("bench", dict(BUDGETS))
+    ledger.transactions = list(ctx.records)
+    return ledger
+
+
+# name -> (setup(ctx) -> state, run(ctx, state)); setup is not timed
+Case = Tuple[Optional[Callable[[BenchContext], Any]], Callable[[BenchContext, Any], Any]]
+
+CASES: Dict[str, Case] = {
+    # ---- library: per-row functions (applied to every row) ----
+    "lib.format_currency": (None, lambda c, _: [lib.format_currency(t["amount"]) for t in c.records]),
+    "lib.clean_text_content": (None, lambda c, _: [lib.clean_text_content(t["description"]) for t in c.records]),
+    "lib.to_cents": (None, lambda c, _: [lib.to_cents(t["amount"]) for t in c.records]),
+    "lib.from_cents": (None, lambda c, _: [lib.from_cents(n) for n in range(c.size)]),
+    "lib.normalize_description": (None, lambda c, _: [lib.normalize_description(t["description"]) for t in c.records]),
+    "lib.categorize_transaction": (None, lambda c, _: [lib.categorize_transaction(t["description"]) for t in c.records]),
+    "lib.tokenize_financial_text": (None, lambda c, _: [lib.tokenize_financial_text(t["description"]) for t in c.records]),
+    "lib.extract_financial_keywords": (None, lambda c, _: [lib.extract_financial_keywords(t["description"]) for t in c.records]),
+    "lib.is_expense": (None, lambda c, _: [lib.is_expense(t) for t in c.records]),
+    "lib.parse_date": (None, lambda c, _: [lib.parse_date(t["date"]) for t in c.rows]),
+    "lib.try_parse_date": (None, lambda c, _: [lib.try_parse_date(t["date"]) for t in c.rows]),
+    "lib.budget_status": (None, lambda c, _: [lib.budget_status(t["amount"], 100.0) for t in c.records]),
+    # ---- library: whole-list functions ----
+    "lib.calculate_average_spending": (lambda c: [t["amount"] for t in c.records],
+                                       lambda c, amounts: lib.calculate_average_spending(amounts)),
+    "lib.calculate_total_spending": (None, lambda c, _: lib.calculate_total_spending(c.records)),
+    "lib.analyze_spending_trends": (None, lambda c, _: lib.analyze_spending_trends(c.records)),
+    "lib.search_transactions": (None, lambda c, _: lib.search_transactions(c.records, "uber")),
+    "lib.filter_transactions_by_date": (None, lambda c, _: lib.filter_transactions_by_date(c.records, c.start, c.end)),
+    "lib.compute_category_totals": (None, lambda c, _: lib.compute_category_totals(c.records)),
+    "lib.categorize_many": (None, lambda c, _: lib.categorize_many([t["description"] for t in c.records])),
+    "lib.categorize_many[processes]": (None, lambda c, _: lib.categorize_many(
+        [t["description"] for t in c.records], workers=max(2, os.cpu_count() or 1), min_parallel=0)),
+    "lib.budget_summary": (None, lambda c, _: lib.budget_summary(c.records, {"Food": 400.0, "Shopping": 200.0})),
+    "lib.top_categories": (None, lambda c, _: lib.top_categories(c.records, 5)),
+    "lib.detect_recurring_expenses": (None, lambda c, _: lib.detect_recurring_expenses(c.records)),
+    # ---- FinanceLedger ----
+    "ledger.add_transaction": (lambda c: FinanceLedger("bench", BUDGETS),
+                               lambda c, led: [led.add_transaction(t["type"], t["description"], t["amount"], t["date"])
+                                               for t in c.rows]),
+    "ledger.add_transactions": (lambda c: FinanceLedger("bench", BUDGETS), lambda c, led: led.add_transactions(c.rows)),
+    "ledger.total_spent": (None, lambda c, _: c.ledger.total_spent()),
+    "ledger.total_spent[range]": (None, lambda c, _: c.ledger.total_spent(c.start, c.end)),
+    "ledger.month_summary": (None, lambda c, _: c.ledger.month_summary(c.year, c.month)),
+    "ledger.month_category_spend": (None, lambda c, _: c.ledger.month_category_spend(c.year, c.month)),
+    "ledger.search": (None, lambda c, _: c.ledger.search("uber")),
+    "ledger.top_categories": (None, lambda c, _: c.ledger.top_categories(5)),
+    "ledger.detect_recurring": (None, lambda c, _: c.ledger.detect_recurring()),
+    "ledger.trend": (None, lambda c, _: c.ledger.trend()),
+    # Read cache: warmed in setup, so these time a hit (the plain cases above start cold)
+    "ledger.trend[cached]": (lambda c: c.ledger.trend(), lambda c, _: c.ledger.trend()),
+    "ledger.month_summary[cached]": (lambda c: c.ledger.month_summary(c.year, c.month),
+                                     lambda c, _: c.ledger.month_summary(c.year, c.month)),
+    "ledger.detect_recurring[cached]": (lambda c: c.ledger.detect_recurring(),
+                                        lambda c, _: c.ledger.detect_recurring()),
+    "ledger.cache_info": (None, lambda c, _: c.ledger.cache_info()),
+    "ledger.query": (None, lambda c, _: c.ledger.query().between(c.start, c.end).expenses()
+                     .amount_over(50).text("uber").sum()),
+    "ledger.query[group_by]": (None, lambda c, _: c.ledger.query().category("food").group_by("month")),
+    "ledger.amount_range": (None, lambda c, _: c.ledger.amount_range(500, None)),
+    "ledger.largest": (None, lambda c, _: c.ledger.largest(20, start_date=c.start, end_date=c.end)),
+    "ledger.smallest": (None, lambda c, _: c.ledger.smallest(20)),
+    "ledger.anomalies": (None, lambda c, _: c.ledger.anomalies()),
+    "ledger.category_stats": (None, lambda c, _: c.ledger.category_stats()),
+    "ledger.merchant_stats": (None, lambda c, _: c.ledger.merchant_stats()),
+    "ledger.spending_percentiles": (None, lambda c, _: c.ledger.spending_percentiles()),
+    "ledger.spending_percentiles[category]": (None, lambda c, _: c.ledger.spending_percentiles(category="food")),
+    "ledger.quantile_sketches": (None, lambda c, _: c.ledger.quantile_sketches("month")),
+    "ledger.on_anomaly": (None, lambda c, _: c.ledger.remove_anomaly_hook(c.ledger.on_anomaly(print))),
+    "ledger.keyword_index": (_fresh_ledger, lambda c, led: led.keyword_index()),
+    "ledger.replay_budget_events": (None, lambda c, _: c.ledger.replay_budget_events(lambda e: None)),
+    "ledger.subscribe_budget_events": (None, lambda c, _: c.ledger.unsubscribe_budget_events(
+        c.ledger.subscribe_budget_events(print))),
+    "ledger.stats": (None, lambda c, _: c.ledger.stats()),
+    "ledger.snapshot": (None, lambda c, _: c.ledger.snapshot()),
+    "ledger.add_transactions[concurrent]": (lambda c: FinanceLedger("bench", BUDGETS, concurrent=True),
+                                            lambda c, led: led.add_transactions(c.rows)),
+    "ledger.month_summary[concurrent]": (_concurrent_ledger, lambda c, led: led.month_summary(c.year, c.month)),
+    "ledger.find_duplicates": (None, lambda c, _: c.ledger.find_duplicates(c.rows, window_days=1)),
+    "ledger.add_transactions[skip_duplicates]": (_fresh_ledger, lambda c, led: led.add_transactions(
+        c.rows, skip_duplicates=True, window_days=1)),
+    "ledger.set_rules": (_fresh_ledger, lambda c, led: led.set_rules(_rules_with_rideshare())),
+    "ledger.set_rules[full]": (_fresh_ledger, lambda c, led: led.set_rules(
+        RuleSet(RuleSet.default_rules(), default="Uncategorized"))),
+    "ledger.add_transactions[rules]": (lambda c: FinanceLedger("bench", BUDGETS, rules=_rules_with_rideshare()),
+                                       lambda c, led: led.add_transactions(c.rows)),
+    "ledger.save_to_file": (None, lambda c, _: c.ledger.save_to_file(_path(c, "ledger.json"))),
+    "ledger.load_from_file": (lambda c: c.ledger.save_to_file(_path(c, "ledger.json")),
+                              lambda c, _: FinanceLedger.load_from_file(_path(c, "ledger.json"))),
+    "ledger.export_monthly_report": (None, lambda c, _: c.ledger.export_monthly_report(
+        c.year, c.month, _path(c, "report.csv"))),
+    "ledger.save_partitioned": (_fresh_ledger, lambda c, led: led.save_partitioned(_path(c, "parts"))),
+    "ledger.save_partitioned[incremental]": (_partitioned_ledger_with_new_row,
+                                             lambda c, led: led.save_partitioned(_path(c, "parts"))),
+    "ledger.open_partitioned": (lambda c: _fresh_ledger(c).save_partitioned(_path(c, "parts")),
+                                lambda c, _: FinanceLedger.open_partitioned(_path(c, "parts"))
+                                .month_summary(c.year, c.month)),
+    "ledger.loaded_months": (None, lambda c, _: c.ledger.loaded_months()),
+    "ledger.asave": (None, lambda c, _: asyncio.run(c.ledger.asave(_path(c, "aledger.json")))),
+    "ledger.aload": (lambda c: c.ledger.save_to_file(_path(c, "aledger.json")),
+                     lambda c, _: asyncio.run(FinanceLedger.aload(_path(c, "aledger.json")))),
+    "ledger.aexport_monthly_report": (None, lambda c, _: asyncio.run(c.ledger.aexport_monthly_report(
+        c.year, c.month, _path(c, "areport.csv")))),
+    # ---- ledger_reconcile ----
+    "reconcile.reconcile": (_bank_export, lambda c, bank: ledger_reconcile.reconcile(
+        c.ledger, bank, date_tolerance=1, amount_tolerance=0.01)),
+    # ---- category_rules ----
+    "rules.categorize_many": (lambda c: _rules_with_rideshare().compile(),
+                              lambda c, matcher: matcher.categorize_many([t["description"] for t in c.records])),
+    # ---- finance_json ----
+    "finance_json.save_to_json": (_json_ledger, lambda c, led: led.save_to_json(_path(c, "fj.json"))),
+    "finance_json.load_from_json": (lambda c: _json_ledger(c).save_to_json(_path(c, "fj.json")),
+                                    lambda c, _: finance_json.FinanceLedger.load_from_json(_path(c, "fj.json"))),
+}
+
+# Compressed snapshots: a save/load pair per codec for both ledger formats
+CODEC_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "lzma": ".xz"}
+
+
+def _compressed_path(ctx: BenchContext, name: str, suffix: str) -> str:
+    return _path(ctx, name) + suffix  # the codec is picked from the extension, so it goes last
+
+
+def _codec_cases(codec: str, suffix: str) -> Dict[str, Case]:
+    def ledger_file(c: BenchContext) -> str:
+        return _compressed_path(c, "ledger.json", suffix)
+
+    def json_file(c: BenchContext) -> str:
+        return _compressed_path(c, "fj.json", suffix)
+
+    return {
+        f"ledger.save_to_file[{codec}]": (None, lambda c, _: c.ledger.save_to_file(ledger_file(c))),
+        f"ledger.load_from_file[{codec}]": (lambda c: c.ledger.save_to_file(ledger_file(c)),
+                                            lambda c, _: FinanceLedger.load_from_file(ledger_file(c))),
+        f"finance_json.save_to_json[{codec}]": (_json_ledger, lambda c, led: led.save_to_json(json_file(c))),
+        f"finance_json.load_from_json[{codec}]": (
+            lambda c: _json_ledger(c).save_to_json(json_file(c)),
+            lambda c, _: finance_json.FinanceLedger.load_from_json(json_file(c))),
+    }
+
+
+for _codec, _suffix in CODEC_SUFFIXES.items():
+    CASES.update(_codec_cases(_codec, _suffix))
+
+# Cases that write a file: its size goes into the report as "bytes", to compare codecs
+CASE_OUTPUTS: Dict[str, Callable[[BenchContext], str]] = {
+    "ledger.save_to_file": lambda c: _path(c, "ledger.json"),
+    "finance_json.save_to_json": lambda c: _path(c, "fj.json"),
+}
+for _codec, _suffix in CODEC_SUFFIXES.items():
+    CASE_OUTPUTS[f"ledger.save_to_file[{_codec}]"] = lambda c, s=_suffix: _compressed_path(c, "ledger.json", s)
+    CASE_OUTPUTS[f"finance_json.save_to_json[{_codec}]"] = lambda c, s=_suffix: _compressed_path(c, "fj.json", s)
+
+# Public callables that deliberately have no case of their own
+COVERED_ELSEWHERE = {
+    "ledger.unsubscribe_budget_events": "timed together with subscribe_budget_events",
+    "ledger.remove_anomaly_hook": "timed together with on_anomaly",
+    "ledger.cache_clear": "run before every timed case by reset_caches()",
+    "ledger.save": "timed by save_to_file, which wraps it",
+}
+
+
+def uncovered_public_api() -> List[str]:
+    """Public library functions and FinanceLedger methods with no benchmark case."""
+    names = []
+    for name, obj in vars(lib).items():
+        if name.startswith("_") or inspect.isclass(obj) or not callable(obj):
+            continue
+        if getattr(obj, "__module__", None) == lib.__name__:
+            names.append(f"lib.{name}")
+    for name, obj in vars(FinanceLedger).items():
+        if name.startswith("_") or isinstance(obj, property):
+            continue
+        if callable(obj) or isinstance(obj, (classmethod, staticmethod)):
+            names.append(f"ledger.{name}")
+    covered = {name.split("[")[0] for name in CASES} | set(COVERED_ELSEWHERE)
+    return sorted(n for n in names if n not in covered)
+
+
+def reset_caches(ctx: Optional[BenchContext] = None) -> None:
+    """Clear process-wide memo caches (and the shared ledger's read cache) so every run starts cold."""
+    lib.normalize_description.cache_clear()
+    transaction_class._categorize_cached.cache_clear()
+    if ctx is not None:
+        ctx.ledger.cache_clear()
+
+
+def time_case(ctx: BenchContext, case: Case, repeat: int) -> Dict[str, float]:
+    setup, run = case
+    timings = []
+    for _ in range(repeat):
+        reset_caches(ctx)
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = setup(ctx) if setup else None
+            started = time.perf_counter()
+            run(ctx, state)
+            timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {
+        "best_s": round(best, 6),
+        "mean_s": round(sum(timings) / len(timings), 6),
+        "rows_per_s": round(ctx.size / best, 1) if best > 0 else None,
+    }
+
+
+def run_benchmarks(sizes: List[int], seed: int = 0, repeat: int = 3,
+                   only: Optional[str] = None, log=print) -> Dict[str, Any]:
+    """Run every selected case at every size and return the JSON-ready report."""
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": {},
+        "uncovered": uncovered_public_api(),
+    }
+    with tempfile.TemporaryDirectory(prefix="finance_bench_") as tmpdir:
+        for size in sizes:
+            with contextlib.redirect_stdout(io.StringIO()):
+                ctx = build_context(size, seed, tmpdir)
+            results = report["results"][str(size)] = {}
+            for name, case in CASES.items():
+                if only and only not in name:
+                    continue
+                results[name] = time_case(ctx, case, repeat)
+                if name in CASE_OUTPUTS:
+                    results[name]["bytes"] = os.path.getsize(CASE_OUTPUTS[name](ctx))
+                log(f"{size:>10,}  {name:<36} {results[name]['best_s']:>10.4f}s")
+    return report
+
+
+def compare_reports(new: Dict[str, Any], old: Dict[str, Any]) -> List[Tuple[str, str, float, float, float]]:
+    """Return (size, case, old_s, new_s, new/old) for cases present in both reports."""
+    rows = []
+    for size, cases in new["results"].items():
+        for name, res in cases.items():
+            prev = old.get("results", {}).get(size, {}).get(name)
+            if prev and prev["best_s"] > 0:
+                rows.append((size, name, prev["best_s"], res["best_s"], round(res["best_s"] / prev["best_s"], 3)))
+    return rows
+
+
+# Cold-start import cost budget per entry point, in ms (`import SRC` must not load the ledger)
+IMPORT_BUDGETS_MS = {"SRC": 15.0, "SRC.library_financial_functions": 35.0, "SRC.finance_ledger": 110.0}
+
+
+def measure_import_time(module: str, runs: int = 5) -> float:
+    """Cumulative `python -X importtime` cost of importing `module` in a fresh interpreter, best of `runs`, in ms."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # the directory holding the package
+    paths = [root] + [p for p in os.environ.get("PYTHONPATH", "").split(os.pathsep) if p]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(paths))
+    best = float("inf")
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              env=env, capture_output=True, text=True, check=True)
+        for line in proc.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"; the top-level module is not indented
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].rstrip() == f" {module}":
+                best = min(best, int(parts[1]) / 1000)
+    if best == float("inf"):
+        raise RuntimeError(f"no import time reported for {module!r}")
+    return round(best, 2)
+
+
+def check_import_budgets(budgets: Optional[Dict[str, float]] = None, runs: int = 5) -> Dict[str, Dict[str, Any]]:
+    """Measure each module's import time against its budget (default IMPORT_BUDGETS_MS)."""
+    report = {}
+    for module, budget in (budgets or IMPORT_BUDGETS_MS).items():
+        ms = measure_import_time(module, runs)
+        report[module] = {"ms": ms, "budget_ms": budget, "ok": ms <= budget}
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m SRC.benchmark", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="ledger sizes to generate (default: 1000 10000 100000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best is reported")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    parser.add_argument("--import-time", action="store_true",
+                        help="check cold import times against IMPORT_BUDGETS_MS instead of running cases")
+    args = parser.parse_args(argv)
+
+    if args.import_time:
+        budgets = check_import_budgets(runs=args.repeat)
+        json.dump(budgets, sys.stdout, indent=2)
+        print()
+        return 0 if all(entry["ok"] for entry in budgets.values()) else 1
+
+    report = run_benchmarks(args.sizes, seed=args.seed, repeat=args.repeat, only=args.only,
+                            log=lambda line: print(line, file=sys.stderr))
+    if report["uncovered"]:
+        print(f"warning: no benchmark for {', '.join(report['uncovered'])}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        for size, name, old_s, new_s, ratio in compare_reports(report, old):
+            print(f"{size:>10}  {name:<36} {old_s:>10.4f}s -> {new_s:>10.4f}s  x{ratio}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
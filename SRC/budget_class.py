@@ -1,4 +1,4 @@
-from library_financial_functions import categorize_transaction, format_currency
+from .library_financial_functions import categorize_transaction, format_currency
 
 class Budget:
     def __init__(self, category, limit_amount):
@@ -1,24 +1,27 @@
 
 import json
 
+from .ledger_storage import open_text, write_json
+
 class FinanceLedger:
     def __init__(self, owner, budgets=None):
         self.owner = owner
         self.transactions = []
         self.budgets = budgets or {}
 
-    def save_to_json(self, filename):
+    def save_to_json(self, filename, compression=None):
+        # compression: 'gzip', 'bz2', 'lzma', 'none', or None to go by the extension (.gz, .bz2, .xz)
         data = {
             "owner": self.owner,
             "budgets": self.budgets,
             "transactions": self.transactions
         }
-        with open(filename, "w") as f:
-            json.dump(data, f, indent=2)
+        with open_text(filename, "w", compression) as f:
+            write_json(f, data, indent=2)
 
     @classmethod
-    def load_from_json(cls, filename):
-        with open(filename, "r") as f:
+    def load_from_json(cls, filename, compression=None):
+        with open_text(filename, "r", compression) as f:
             data = json.load(f)
 
         ledger = cls(data["owner"], data["budgets"])
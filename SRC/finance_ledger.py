@@ -1,84 +1,53 @@
-from abc import ABC, abstractmethod
-
 from __future__ import annotations
 
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, field
-
-
-import json
+from abc import ABC, abstractmethod
+import calendar
+import contextlib
 import csv
-from typing import Optional
-
-class FinanceLedger:
-
-    # ----------------------- Persistence Methods -----------------------
-    def save_to_file(self, filename: str) -> None:
-        """Save ledger state (transactions and budgets) to a JSON file."""
-        data = {
-            "owner": self._owner,
-            "category_budgets": self._category_budgets,
-            "transactions": self._transactions
-        }
-        try:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4)
-            print(f"Ledger saved to {filename}")
-        except Exception as e:
-            print(f"❌ Error saving ledger: {e}")
-
-    @classmethod
-    def load_from_file(cls, filename: str) -> FinanceLedger:
-        """Load a ledger from a JSON file and return a FinanceLedger instance."""
-        try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            ledger = cls(owner=data["owner"], category_budgets=data.get("category_budgets"))
-            for tx in data.get("transactions", []):
-                ledger.add_transaction(tx["type"], tx["description"], tx["amount"], tx["date"])
-            print(f"Ledger loaded from {filename}")
-            return ledger
-        except Exception as e:
-            print(f"❌ Error loading ledger: {e}")
-            raise
-
-    def export_monthly_report(self, year: int, month: int, filename: Optional[str] = None) -> None:
-        """Export the month summary to a CSV file."""
-        summary = self.month_summary(year, month)
-        filename = filename or f"{self._owner}_report_{year}_{month:02d}.csv"
-        try:
-            with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(["Category", "Spent", "Budget", "Percent Used", "Status"])
-                for category, info in summary.get("budget_status", {}).items():
-                    writer.writerow([
-                        category,
-                        info["spent"],
-                        info["budget"],
-                        f"{info['percent_used']:.1f}%",
-                        info["status"]
-                    ])
-            print(f"Monthly report exported to {filename}")
-        except Exception as e:
-            print(f"❌ Error exporting report: {e}")
+import json
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import date as _date
 
 # Import the functional library (assumed to be in same SRC package/dir)
-from library_financial_functions import (
+from .library_financial_functions import (
     format_currency,
     clean_text_content,
     calculate_total_spending,
     categorize_transaction,
+    categorize_many,
     extract_financial_keywords,
     analyze_spending_trends,
     search_transactions,
     is_expense,
     parse_date,
+    try_parse_date,
+    normalize_description,
     filter_transactions_by_date,
     compute_category_totals,
     budget_summary,
+    budget_status,
+    to_cents,
+    from_cents,
+    MAX_CENTS,
     top_categories as _top_categories_fn,  # in case available
     detect_recurring_expenses,
 )
+from .category_rules import RuleSet
+from .keyword_index import KeywordIndex
+from .ledger_cache import CacheInfo, GenerationCache, freeze
+from .ledger_query import LedgerIndexes, LedgerQuery
+from .ledger_stats import QuantileSketch, RunningStats, merge_sketches
+from .ledger_storage import PartitionedStore, atomic_write as _atomic_write, open_text as _open_text, write_json as _write_json
+from .instrumentation import summarize as _summarize_call_stats
+
+if TYPE_CHECKING:  # asyncio costs ~45ms to import; the async methods import it when called
+    import asyncio
 
 @dataclass
 class AbstractTransaction(ABC):
@@ -95,22 +64,26 @@ class AbstractTransaction(ABC):
     description: str
 
     def __post_init__(self) -> None:
-    # validate and normalize shared fields
+        # validate and normalize shared fields
 
-    # amount must be numeric and non-negative
-    try:
-        self.amount = float(self.amount)
-    except Exception as exc:
-        raise TypeError("amount must be numeric") from exc
-    if self.amount < 0:
-        raise ValueError("amount must be non-negative")
+        # amount must be numeric, finite, non-negative and representable in int64 cents
+        try:
+            self.amount = float(self.amount)
+        except Exception as exc:
+            raise TypeError("amount must be numeric") from exc
+        if not math.isfinite(self.amount):
+            raise ValueError("amount must be finite")
+        if self.amount < 0:
+            raise ValueError("amount must be non-negative")
+        if self.amount * 100 > MAX_CENTS:
+            raise ValueError("amount is too large")
 
-    # normalize/validate date using your existing helper
-    self.date = parse_date(self.date)
+        # normalize/validate date using your existing helper
+        self.date = parse_date(self.date)
 
-    # description should be a string
-    if not isinstance(self.description, str):
-        raise TypeError("description must be a string")
+        # description should be a string
+        if not isinstance(self.description, str):
+            raise TypeError("description must be a string")
 
 # ----- abstract, polymorphic behavior -----
 
@@ -129,6 +102,15 @@ class AbstractTransaction(ABC):
         """
         raise NotImplementedError
 
+    @classmethod
+    def _from_validated(cls, amount: float, date: str, description: str) -> AbstractTransaction:
+        """Build an instance from fields that were already validated, skipping __post_init__."""
+        tx = cls.__new__(cls)
+        tx.amount = amount
+        tx.date = date
+        tx.description = description
+        return tx
+
 @dataclass
 class ExpenseTransaction(AbstractTransaction):
     """Concrete transaction representing money going out."""
@@ -153,6 +135,251 @@ class IncomeTransaction(AbstractTransaction):
         # income increases the balance
         return self.amount
 
+_TRANSACTION_CLASSES = {"expense": ExpenseTransaction, "income": IncomeTransaction}
+_UNSET = object()
+_NUMERIC_TEXT_RE = re.compile(r"\s*[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?\s*")
+
+
+@dataclass(frozen=True)
+class RowError:
+    """
+    One problem found in one input row during batch validation.
+
+    Attributes:
+        index: position of the row in the input batch
+        field: 'type', 'amount', 'date', 'description', or 'row'
+               ('duplicate' for rows skipped by FinanceLedger.add_transactions)
+        message: same wording the single-transaction validators raise with
+    """
+    index: int
+    field: str
+    message: str
+
+
+@dataclass
+class BatchValidationResult:
+    """
+    Outcome of validate_transaction_batch().
+
+    Attributes:
+        valid: transaction objects (or ledger-style dicts) for every clean row
+        errors: every problem found, in row order; a row may report several
+        indexes: input row index of each entry in `valid`
+    """
+    valid: List[Any] = field(default_factory=list)
+    errors: List[RowError] = field(default_factory=list)
+    indexes: List[int] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True when no row had a problem."""
+        return not self.errors
+
+    def error_rows(self) -> Dict[int, List[RowError]]:
+        """Group errors by row index."""
+        grouped: Dict[int, List[RowError]] = defaultdict(list)
+        for err in self.errors:
+            grouped[err.index].append(err)
+        return dict(grouped)
+
+
+def validate_transaction_batch(rows: Iterable[Dict], as_records: bool = False) -> BatchValidationResult:
+    """Validate many transaction rows in one pass without raising per row.
+
+    Each row is a dict with 'type', 'amount', 'date' and 'description'
+    (the same shape FinanceLedger stores). Applies the same rules as
+    AbstractTransaction.__post_init__ and the ledger factory, but checks every
+    field of every row and reports problems instead of stopping at the first.
+    The common (valid) path uses type checks and precompiled patterns rather
+    than try/except.
+
+    Parameters
+    ----------
+    rows : Iterable[Dict]
+        Input rows; consumed once.
+    as_records : bool
+        Return ledger-style dicts instead of ExpenseTransaction/IncomeTransaction.
+
+    Examples
+    --------
+    >>> result = validate_transaction_batch([
+    ...     {'type': 'expense', 'amount': 4.75, 'date': '2024-10-05', 'description': 'Coffee'},
+    ...     {'type': 'expense', 'amount': -1, 'date': '2024-13-01', 'description': 'Bad'},
+    ... ])
+    >>> len(result.valid), [(e.index, e.field) for e in result.errors]
+    (1, [(1, 'amount'), (1, 'date')])
+    """
+    result = BatchValidationResult()
+    valid, errors, indexes = result.valid, result.errors, result.indexes
+    date_cache: Dict[str, Optional[str]] = {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append(RowError(index, "row", "row must be a dictionary"))
+            continue
+        before = len(errors)
+
+        ttype = row.get("type")
+        ttype = ttype.strip().lower() if isinstance(ttype, str) else ttype
+        if ttype not in _TRANSACTION_CLASSES:
+            errors.append(RowError(index, "type", "ttype must be either 'expense' or 'income'"))
+
+        amount = row.get("amount")
+        if isinstance(amount, (int, float)) and not isinstance(amount, bool):
+            amount = float(amount)
+        elif isinstance(amount, str) and _NUMERIC_TEXT_RE.fullmatch(amount):
+            amount = float(amount)
+        else:
+            errors.append(RowError(index, "amount", "amount must be numeric"))
+            amount = None
+        if amount is None:
+            pass
+        elif not math.isfinite(amount):
+            errors.append(RowError(index, "amount", "amount must be finite"))
+        elif amount < 0:
+            errors.append(RowError(index, "amount", "amount must be non-negative"))
+        elif amount * 100 > MAX_CENTS:
+            errors.append(RowError(index, "amount", "amount is too large"))
+
+        raw_date = row.get("date")
+        # Imports repeat the same few dates, so parse each distinct string once
+        date = date_cache.get(raw_date, _UNSET) if isinstance(raw_date, str) else None
+        if date is _UNSET:
+            date = date_cache[raw_date] = try_parse_date(raw_date)
+        if date is None:
+            errors.append(RowError(index, "date", f"Unrecognized date format: {raw_date!r}"))
+
+        description = row.get("description")
+        if not isinstance(description, str):
+            errors.append(RowError(index, "description", "description must be a string"))
+
+        if len(errors) != before:
+            continue
+        indexes.append(index)
+        if as_records:
+            valid.append({'type': ttype, 'amount': amount, 'description': description, 'date': date})
+        else:
+            valid.append(_TRANSACTION_CLASSES[ttype]._from_validated(amount, date, description))
+    return result
+
+
+@dataclass(frozen=True)
+class BudgetEvent:
+    """
+    Notification that a category crossed a budget threshold in a month.
+
+    Attributes:
+        month: 'YYYY-MM' month the spending belongs to
+        category: lowercase category name (matches the budget key)
+        status: 'approaching' or 'exceeded'; events only report rises, so
+            spend that set_rules() moves out of a category never emits one
+        spent: running amount spent in the category for that month
+        budget: the category's monthly budget
+        percent_used: spent / budget * 100, rounded to 2 decimals
+    """
+    month: str
+    category: str
+    status: str
+    spent: float
+    budget: float
+    percent_used: float
+
+
+# Order of budget_status() results; a BudgetEvent is emitted only when the status rises
+_BUDGET_STATUS_RANK = {"under": 0, "approaching": 1, "exceeded": 2}
+
+
+@dataclass(frozen=True)
+class Anomaly:
+    """
+    An expense that sits unusually far from its category's or merchant's history.
+
+    Attributes:
+        record: the stored transaction dict
+        scope: 'category' or 'merchant'
+        key: lowercase category name, or the merchant key from normalize_description()
+        mean: mean amount of the group the record was compared with
+        stddev: sample standard deviation of that group
+        z_score: (amount - mean) / stddev
+    """
+    record: Dict
+    scope: str
+    key: str
+    mean: float
+    stddev: float
+    z_score: float
+
+
+@dataclass(frozen=True)
+class LedgerSnapshot:
+    """
+    Read-only view of a ledger's first `epoch` transactions.
+
+    Produced by FinanceLedger.snapshot(). Later appends never show up in a
+    snapshot, so several reads against one snapshot agree with each other.
+    The record list is shared with other readers: do not mutate it.
+
+    Attributes:
+        owner: the ledger owner
+        epoch: number of transactions committed when the snapshot was taken
+        records: the first `epoch` stored transaction dicts
+        category_budgets: the ledger's budgets (lowercase keys)
+        categorize: batch categorizer of the ledger's rule set (None: the built-in table)
+    """
+    owner: str
+    epoch: int
+    records: List[Dict]
+    category_budgets: Dict[str, float]
+    categorize: Optional[Callable[..., List[str]]] = None
+
+    def total_spent(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> float:
+        data = self.records
+        if start_date or end_date:
+            data = filter_transactions_by_date(data, start_date, end_date)
+        return calculate_total_spending(data)
+
+    def month_summary(self, year: int, month: int) -> Dict[str, Dict[str, float]]:
+        return FinanceLedger._summarize_month(self.records, self.category_budgets, year, month, self.categorize)
+
+    def search(self, query: str) -> List[Dict]:
+        return search_transactions(self.records, query)
+
+    def top_categories(self, n: int = 3) -> List[Tuple[str, float]]:
+        totals = compute_category_totals(self.records, categorize=self.categorize)
+        return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:max(0, int(n))]
+
+    def detect_recurring(self, min_occurrences: int = 3, tolerance_days: int = 4) -> List[Dict]:
+        return detect_recurring_expenses(self.records, min_occurrences=min_occurrences, tolerance_days=tolerance_days)
+
+    def trend(self) -> Dict:
+        return analyze_spending_trends(self.records)
+
+
+_NO_LOCK = contextlib.nullcontext()
+
+def _write_report_csv(f, summary: Dict[str, Dict]) -> None:
+    writer = csv.writer(f)
+    writer.writerow(["Category", "Spent", "Budget", "Percent Used", "Status"])
+    for category, info in summary.get("budget_status", {}).items():
+        writer.writerow([
+            category,
+            info["spent"],
+            info["budget"],
+            f"{info['percent_used']:.1f}%",
+            info["status"]
+        ])
+
+
+@dataclass
+class _SaveSlot:
+    """Per-file asave() state: the write in progress and the one queued behind it."""
+    running: Optional[asyncio.Future] = None
+    queued: Optional[asyncio.Future] = None
+
+
+class _SaveAbandoned(Exception):
+    """Set on a queued asave() write whose starting caller was cancelled before it began."""
+
+
 class FinanceLedger:
     """Manage a collection of financial transactions for a single user.
 
@@ -162,6 +389,20 @@ class FinanceLedger:
         Name/identifier for the owner of this ledger.
     category_budgets : Optional[Dict[str, float]]
         Optional mapping of category -> monthly budget amount.
+    warning_threshold : float
+        Fraction of a budget that counts as 'approaching' (default 0.9).
+    anomaly_threshold : float
+        Z-score at which an expense is reported as an anomaly (default 3.0).
+    concurrent : bool
+        Make the ledger safe to share between threads (default False).
+        Appends are serialized by a lock that is held only while a record
+        and its indexes are updated; readers work on the committed prefix
+        of the append-only record list (see snapshot()) without taking it.
+    cache_size : int
+        Results of the memoized read APIs kept (default 128; 0 disables).
+    rules : Optional[RuleSet]
+        Category rule set used instead of the built-in keyword table
+        (default None); can be swapped later with set_rules().
 
     Examples
     --------
@@ -175,15 +416,57 @@ class FinanceLedger:
     """
 
     # ----------------------- Initialization & Encapsulation -----------------------
-    def __init__(self, owner: str, category_budgets: Optional[Dict[str, float]] = None) -> None:
+    def __init__(self, owner: str, category_budgets: Optional[Dict[str, float]] = None,
+                 warning_threshold: float = 0.9, anomaly_threshold: float = 3.0,
+                 concurrent: bool = False, cache_size: int = 128,
+                 rules: Optional[RuleSet] = None) -> None:
         if not isinstance(owner, str) or not owner.strip():
             raise ValueError("owner must be a non-empty string")
         if category_budgets is not None and not isinstance(category_budgets, dict):
             raise TypeError("category_budgets must be a dict or None")
+        if rules is not None and not isinstance(rules, RuleSet):
+            raise TypeError("rules must be a RuleSet or None")
         # Store private attributes
         self._owner: str = owner.strip()
         self._transactions: List[Dict] = []  # list of dicts (compatible with Project 1 functions)
         self._category_budgets: Dict[str, float] = {k.lower(): float(v) for k, v in (category_budgets or {}).items()}
+        self._warning_threshold: float = float(warning_threshold)
+        # Running spend per month per category in integer cents, kept up to date by add_transaction()
+        self._month_category_spend: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._budget_states: Dict[Tuple[str, str], str] = {}
+        self._budget_subscribers: Dict[Optional[str], List[Callable[[BudgetEvent], None]]] = defaultdict(list)
+        self._budget_events: List[BudgetEvent] = []
+        self._keyword_index: Optional[KeywordIndex] = None  # built on first keyword_index() call
+        # (day ordinal, type, cents, description) -> positions; built on first duplicate check
+        self._duplicate_index: Optional[Dict[Tuple[int, str, int, str], List[int]]] = None
+        self._indexes = LedgerIndexes()  # month/category/type positions used by query()
+        self._call_stats: Dict = {}  # filled only while instrumentation is enabled
+        # Welford running stats of expense amounts, updated in O(1) per insert
+        self._anomaly_threshold: float = float(anomaly_threshold)
+        self._category_stats: Dict[str, RunningStats] = defaultdict(RunningStats)
+        self._merchant_stats: Dict[str, RunningStats] = defaultdict(RunningStats)
+        self._anomaly_hooks: List[Callable[[Anomaly], None]] = []
+        # KLL sketches of expense amounts per category and per month (bounded memory, mergeable)
+        self._category_sketches: Dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+        self._month_sketches: Dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+        self._save_slots: Dict[str, _SaveSlot] = {}  # asave() coalescing, keyed by absolute path
+        # Concurrent mode: writers hold the lock; readers see records[:_epoch], published after indexing
+        self._concurrent: bool = bool(concurrent)
+        self._write_lock: Optional[threading.RLock] = threading.RLock() if concurrent else None
+        self._epoch: int = 0
+        # Partitioned storage (open_partitioned/save_partitioned): month files are loaded on demand
+        self._store: Optional[PartitionedStore] = None
+        self._partition_months: Dict[str, Dict[str, Any]] = {}  # manifest entries of months on disk
+        self._loaded_months: set = set()
+        self._dirty_months: set = set()  # months with transactions not yet saved to the store
+        self._loading_partitions = False  # historical rows: update state, but notify no one
+        # Memoized read APIs; entries are valid only at the generation they were computed at
+        self._generation: int = 0  # bumped on every mutation
+        self._read_cache = GenerationCache(cache_size)
+        # Category rules: None keeps the library's built-in table (and its process-pool batch path)
+        self._rules: Optional[RuleSet] = rules
+        self._matcher = rules.compile() if rules is not None else None
+        self._description_index: Optional[Dict[str, List[int]]] = None  # description -> positions, for set_rules()
 
     # Properties for controlled access
     @property
@@ -194,7 +477,7 @@ class FinanceLedger:
     @property
     def transactions(self) -> List[Dict]:
         """A COPY of transactions to preserve encapsulation."""
-        return list(self._transactions)
+        return list(self._view().records)
 
     @property
     def category_budgets(self) -> Dict[str, float]:
@@ -235,18 +518,139 @@ class FinanceLedger:
             'description': tx.description,
             'date': tx.date,
         }
-        self._transactions.append(record)
+        with self._guard():
+            self._append(record)
         return tx
 
+    def add_transactions(self, rows: Iterable[Dict], workers: Optional[int] = None,
+                         skip_duplicates: bool = False, window_days: int = 0) -> List[RowError]:
+        """Bulk-add rows shaped like stored records; invalid rows are skipped.
+
+        Integrates: validate_transaction_batch(), categorize_many().
+
+        Descriptions are categorized up front in one batch; pass `workers`
+        > 1 to spread large imports over processes (serial by default). Returns the per-row error report for
+        the rows that were not added.
+
+        With skip_duplicates=True, rows matching an already stored transaction
+        (see find_duplicates()) are not added and are reported with field
+        'duplicate'. Identical rows within the batch itself are all kept.
+        """
+        result = validate_transaction_batch(rows, as_records=True)
+        records, errors = result.valid, result.errors
+        if not skip_duplicates:
+            categories = self._categorize_batch([r['description'] for r in records], workers)
+            for record, category in zip(records, categories):
+                with self._guard():  # per row, so readers and other writers interleave
+                    self._append(record, category)
+            return errors
+        # Check and insert under one lock hold so concurrent importers cannot both add a row
+        with self._guard():
+            matches = self._match_duplicates(records, window_days)
+            kept = [r for r, pos in zip(records, matches) if pos is None]
+            categories = self._categorize_batch([r['description'] for r in kept], workers)
+            for record, category in zip(kept, categories):
+                self._append(record, category)
+        duplicates = [RowError(index, 'duplicate', f"duplicate of transaction #{pos} ({self._transactions[pos]['date']})")
+                      for index, pos in zip(result.indexes, matches) if pos is not None]
+        if not duplicates:
+            return errors
+        return sorted(errors + duplicates, key=lambda e: e.index)
+
+    def _append(self, record: Dict, category: Optional[str] = None) -> None:
+        # Budget states need the month's rows on disk, anomaly hooks every month's,
+        # before the new row is judged; loading them later would not notify anyone
+        self._ensure_loaded(None if self._anomaly_hooks else [record['date'][:7]])
+        cents = to_cents(record['amount'])  # before storing, so a bad amount leaves nothing behind
+        self._transactions.append(record)
+        self._on_record_added(record, category, cents)
+        self._dirty_months.add(record['date'][:7])
+
+    def _categorize_batch(self, descriptions: List[str], workers: Optional[int] = None) -> List[str]:
+        if self._matcher is not None:
+            return self._matcher.categorize_many(descriptions)
+        return categorize_many(descriptions, workers=workers)
+
+    def _on_record_added(self, record: Dict, category: Optional[str] = None, cents: Optional[int] = None) -> None:
+        """Keep incrementally maintained state in step with a newly stored record."""
+        if category is None:
+            description = record['description']
+            category = self._matcher.categorize(description) if self._matcher else categorize_transaction(description)
+        position = len(self._transactions) - 1
+        if cents is None:
+            cents = to_cents(record['amount'])
+        self._indexes.add(position, record, category, cents)
+        if record['type'] == 'expense':
+            self._track_budget_spend(record, category.lower(), cents)
+            self._track_amount_stats(record, category.lower())
+        if self._keyword_index is not None:
+            self._keyword_index.add(record if self._matcher is None else dict(record, category=category))
+        if self._duplicate_index is not None:
+            self._index_duplicate_key(position, record, cents)
+        if self._description_index is not None:
+            self._description_index.setdefault(record['description'], []).append(position)
+        self._epoch = len(self._transactions)
+        self._generation += 1  # after the epoch: readers that see the new generation also see the record
+
+    # ----------------------- Concurrency -------------------------------------------
+    def _guard(self):
+        """The write lock in concurrent mode, else a no-op context manager."""
+        return self._write_lock if self._write_lock is not None else _NO_LOCK
+
+    def _view(self, months: Optional[Iterable[str]] = None) -> LedgerSnapshot:
+        """Snapshot for internal reads; shares the live list when not in concurrent mode.
+
+        With partitioned storage, first loads `months` ('YYYY-MM' keys), or every month when None.
+        """
+        self._ensure_loaded(months)
+        records = self._transactions[:self._epoch] if self._concurrent else self._transactions
+        return LedgerSnapshot(self._owner, len(records), records, self._category_budgets, self._batch_categorizer())
+
+    def _batch_categorizer(self) -> Optional[Callable[..., List[str]]]:
+        return self._matcher.categorize_many if self._matcher is not None else None
+
+    def snapshot(self) -> LedgerSnapshot:
+        """Return an immutable view of every transaction committed so far.
+
+        Costs one list slice (a pointer copy) and never waits for writers.
+        Use it when several reads must agree with each other while other
+        threads keep adding transactions.
+        """
+        self._ensure_loaded()
+        return LedgerSnapshot(self._owner, self._epoch, self._transactions[:self._epoch],
+                              dict(self._category_budgets), self._batch_categorizer())
+
     def total_spent(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> float:
         """Compute total expenses in an optional date range.
 
-        Integrates: filter_transactions_by_date() + calculate_total_spending().
+        Sums the exact integer-cents amounts through the type and month
+        indexes, giving the same result as calculate_total_spending() over
+        filter_transactions_by_date() without re-parsing every date.
+
+        With partitioned storage, months entirely inside the range are taken
+        from the manifest aggregates; only partially covered months are loaded.
         """
-        data = self._transactions
-        if start_date or end_date:
-            data = filter_transactions_by_date(data, start_date, end_date)
-        return calculate_total_spending(data)
+        start = parse_date(start_date) if start_date else None
+        end = parse_date(end_date) if end_date else None
+        from_manifest, edges = 0, []
+        if self._store is not None:
+            with self._guard():
+                for key, info in self._partition_months.items():
+                    if key in self._loaded_months:
+                        continue
+                    year, month = int(key[:4]), int(key[5:7])
+                    first, last = f"{key}-01", f"{key}-{calendar.monthrange(year, month)[1]:02d}"
+                    if (start is not None and last < start) or (end is not None and first > end):
+                        continue
+                    if (start is None or start <= first) and (end is None or end >= last):
+                        from_manifest += to_cents(info["expense_total"])
+                    else:
+                        edges.append(key)
+            self._ensure_loaded(edges)
+        total = from_manifest + self._new_query().between(start, end).expenses().sum_cents()
+        if total == 0:
+            raise ValueError("No valid expense transactions found.")
+        return from_cents(total)
 
     def month_summary(self, year: int, month: int) -> Dict[str, Dict[str, float]]:
         """Return a budget and category summary for the given month.
@@ -261,14 +665,32 @@ class FinanceLedger:
               'budget_status': {category: {'spent': x, 'budget': y, 'percent_used': z, 'status': 'under'|'approaching'|'exceeded'}},
             }
         """
+        key = f"{int(year):04d}-{int(month):02d}"
+        return self._cached(("month_summary", int(year), int(month)), [key],
+                            lambda view: self._summarize_month(self._month_records(key, view.epoch),
+                                                               view.category_budgets, year, month, view.categorize))
+
+    def _month_records(self, key: str, epoch: int) -> List[Dict]:
+        """The month's records among the first `epoch`, from the month index instead of a full scan.
+
+        Lock-free like snapshot(): position lists only grow, and positions
+        at or past `epoch` are skipped.
+        """
+        positions = self._indexes.by_month.get(key, ())
+        return [self._transactions[p] for p in positions if p < epoch]
+
+    @staticmethod
+    def _summarize_month(records: List[Dict], budgets: Dict[str, float], year: int, month: int,
+                         categorize: Optional[Callable[..., List[str]]] = None) -> Dict[str, Dict[str, float]]:
         if not (1 <= int(month) <= 12):
             raise ValueError("month must be in 1..12")
         start = f"{int(year):04d}-{int(month):02d}-01"
-        # simple month end: filter function treats end as inclusive; choose a large day and rely on parsing
-        end = f"{int(year):04d}-{int(month):02d}-31"
-        month_tx = filter_transactions_by_date(self._transactions, start, end)
-        totals = compute_category_totals(month_tx)
-        budget_status = budget_summary(month_tx, self._category_budgets) if self._category_budgets else {}
+        # filter function treats end as inclusive, so use the real last day of the month
+        last_day = calendar.monthrange(int(year), int(month))[1]
+        end = f"{int(year):04d}-{int(month):02d}-{last_day:02d}"
+        month_tx = filter_transactions_by_date(records, start, end)
+        totals = compute_category_totals(month_tx, categorize=categorize)
+        budget_status = budget_summary(month_tx, budgets, categorize=categorize) if budgets else {}
         return {'totals': totals, 'budget_status': budget_status}
 
     def search(self, query: str) -> List[Dict]:
@@ -276,29 +698,771 @@ class FinanceLedger:
 
         Integrates: search_transactions().
         """
-        return search_transactions(self._transactions, query)
+        return self._view().search(query)
 
     def top_categories(self, n: int = 3) -> List[Tuple[str, float]]:
         """Return top-n categories by total expense amount.
 
         Integrates: compute_category_totals().
         """
-        totals = compute_category_totals(self._transactions)
-        return sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:max(0, int(n))]
+        return self._cached(("top_categories", n), None, lambda view: view.top_categories(n))
 
     def detect_recurring(self, min_occurrences: int = 3, tolerance_days: int = 4) -> List[Dict]:
         """Detect recurring expenses (e.g., subscriptions) with cadence.
 
         Integrates: detect_recurring_expenses().
         """
-        return detect_recurring_expenses(self._transactions, min_occurrences=min_occurrences, tolerance_days=tolerance_days)
+        return self._cached(("detect_recurring", min_occurrences, tolerance_days), None,
+                            lambda view: view.detect_recurring(min_occurrences, tolerance_days))
 
     def trend(self) -> Dict:
         """Analyze spending trend across months.
 
         Integrates: analyze_spending_trends().
         """
-        return analyze_spending_trends(self._transactions)
+        return self._cached(("trend",), None, lambda view: view.trend())
+
+    def query(self) -> LedgerQuery:
+        """Start a lazy, index-aware query over the stored transactions.
+
+        Chain filters, then finish with a terminal::
+
+            ledger.query().between('2025-01-01', '2025-03-31').category('food') \
+                  .expenses().amount_over(50).text('pizza').sum()
+
+        Available terminals: iteration, all(), count(), sum(), group_by('month'|'category'|'type'),
+        and explain() to see which index drives the scan.
+        """
+        self._ensure_loaded()
+        return self._new_query()
+
+    def _new_query(self) -> LedgerQuery:
+        """A query over what is in memory now, without loading partitions."""
+        if self._concurrent:
+            return LedgerQuery(self._transactions, self._indexes, limit=self._epoch, lock=self._write_lock)
+        return LedgerQuery(self._transactions, self._indexes)
+
+    def amount_range(self, low: Optional[float] = None, high: Optional[float] = None,
+                     ttype: str = "expense", start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> List[Dict]:
+        """Return transactions of one type with low <= amount <= high, in insertion order.
+
+        Uses the amount-sorted index: O(log n + k) for k matches, plus the date
+        check when bounds are given.
+        """
+        return self.query().between(start_date, end_date).of_type(ttype).amount_between(low, high).all()
+
+    def largest(self, n: int = 10, ttype: str = "expense", start_date: Optional[str] = None,
+                end_date: Optional[str] = None) -> List[Dict]:
+        """Return the n largest transactions of a type, optionally within a date range."""
+        return self.query().between(start_date, end_date).of_type(ttype).top(n, largest=True)
+
+    def smallest(self, n: int = 10, ttype: str = "expense", start_date: Optional[str] = None,
+                 end_date: Optional[str] = None) -> List[Dict]:
+        """Return the n smallest transactions of a type, optionally within a date range."""
+        return self.query().between(start_date, end_date).of_type(ttype).top(n, largest=False)
+
+    def keyword_index(self) -> KeywordIndex:
+        """Return the ledger's corpus keyword index (TF-IDF by category/month).
+
+        Built from all stored transactions on first use, then updated as
+        transactions are added.
+        """
+        self._ensure_loaded()
+        with self._guard():
+            if self._keyword_index is None:
+                records: Iterable[Dict] = self._transactions
+                if self._matcher is not None:  # category tables follow the ledger's rules
+                    records = (dict(r, category=c) for r, c in zip(self._transactions, self._indexes.categories))
+                self._keyword_index = KeywordIndex(records)
+        return self._keyword_index
+
+    # ----------------------- Category Rules ----------------------------------------
+    @property
+    def rules(self) -> RuleSet:
+        """The category rule set in effect (the built-in keyword table unless one was given)."""
+        return self._rules if self._rules is not None else RuleSet.default_rules()
+
+    def set_rules(self, rules: RuleSet) -> int:
+        """Switch to another category rule set; return how many stored transactions changed category.
+
+        Only the descriptions a changed rule can match (RuleSet.changed_rules())
+        are categorized again, each distinct description once, through the
+        description index; then just their records move, with each affected
+        category index rebuilt once. Running spend and budget states follow:
+        a status that rises emits a BudgetEvent, as on insert, while one that
+        falls is updated silently. The running stats and sketches of the
+        categories involved are rebuilt. The keyword index is rebuilt on next use.
+        """
+        if not isinstance(rules, RuleSet):
+            raise TypeError("rules must be a RuleSet")
+        self._ensure_loaded()
+        with self._guard():
+            changed = self.rules.changed_rules(rules)
+            matcher = rules.compile()
+            index = self._description_positions()
+            if changed is None:
+                candidates: Iterable[str] = index
+            else:
+                probe = RuleSet(changed).compile()
+                candidates = [d for d in index if probe.match(d) is not None]
+            categories = self._indexes.categories
+            moves: Dict[int, str] = {}
+            touched = set()
+            for description in candidates:
+                positions = index[description]
+                old, new = categories[positions[0]], matcher.categorize(description)
+                if old == new:
+                    continue
+                for position in positions:
+                    self._move_spend(position, old.lower(), new.lower(), touched)
+                    moves[position] = new
+            self._indexes.recategorize(moves)
+            # Budget states follow the final spend, so a category that loses and regains
+            # records in one switch does not report crossings it never ends up making
+            for month, category in touched:
+                self._update_budget_state(month, category)
+            self._rules, self._matcher = rules, matcher
+            self._rebuild_category_stats({category for _, category in touched})
+            moved = len(moves)
+            if moved:
+                self._keyword_index = None
+            self._generation += 1
+        return moved
+
+    def _description_positions(self) -> Dict[str, List[int]]:
+        """Distinct description -> positions; built on first use, then kept up to date. Call with the guard held."""
+        if self._description_index is None:
+            index: Dict[str, List[int]] = defaultdict(list)
+            for position, record in enumerate(self._transactions):
+                index[record['description']].append(position)
+            self._description_index = dict(index)
+        return self._description_index
+
+    def _move_spend(self, position: int, old: str, new: str, touched: set) -> None:
+        """Move one record's running spend between categories, noting the (month, category) pairs."""
+        month = self._transactions[position]['date'][:7]
+        touched.update(((month, old), (month, new)))
+        if self._transactions[position]['type'] == 'expense':
+            cents = self._indexes.cents[position]
+            spend = self._month_category_spend[month]
+            spend[old] -= cents
+            spend[new] += cents
+
+    def _rebuild_category_stats(self, categories: Iterable[str]) -> None:
+        for category in categories:
+            stats, sketch = RunningStats(), QuantileSketch()
+            for position in self._indexes.by_category.get(category, ()):
+                record = self._transactions[position]
+                if record['type'] == 'expense':
+                    stats.update(record['amount'])
+                    sketch.update(record['amount'])
+            if stats.count:
+                self._category_stats[category], self._category_sketches[category] = stats, sketch
+            else:
+                self._category_stats.pop(category, None)
+                self._category_sketches.pop(category, None)
+
+    # ----------------------- Duplicate Detection -----------------------------------
+    @staticmethod
+    def _duplicate_key(record: Dict, cents: int) -> Tuple[int, str, int, str]:
+        """Canonical key: (day ordinal, type, amount in cents, lowercased single-spaced description)."""
+        description = " ".join(normalize_description(record['description']).lowered.split())
+        return (_date.fromisoformat(record['date']).toordinal(), record['type'], cents, description)
+
+    def _index_duplicate_key(self, position: int, record: Dict, cents: int) -> None:
+        key = self._duplicate_key(record, cents)
+        bucket = self._duplicate_index.get(key)
+        if bucket is None:
+            self._duplicate_index[key] = [position]
+        else:
+            bucket.append(position)
+
+    def _match_duplicates(self, records: List[Dict], window_days: int) -> List[Optional[int]]:
+        """Position of the stored transaction each record duplicates, or None.
+
+        Each stored transaction matches at most one record per call, so two
+        identical incoming rows against one stored row report one duplicate.
+        Fuzzy dates are probed as 2 * window_days + 1 hash lookups (nearest
+        day first), never a scan. Call with the guard held.
+        """
+        if not isinstance(window_days, int) or isinstance(window_days, bool) or window_days < 0:
+            raise ValueError("window_days must be a non-negative integer")
+        self._ensure_loaded()
+        if self._duplicate_index is None:
+            self._duplicate_index = {}
+            for position, record in enumerate(self._transactions):
+                self._index_duplicate_key(position, record, self._indexes.cents[position])
+        offsets = [0]
+        for d in range(1, window_days + 1):
+            offsets += (-d, d)
+        index = self._duplicate_index
+        claimed: set = set()
+        matches: List[Optional[int]] = []
+        for record in records:
+            day, ttype, cents, description = self._duplicate_key(record, to_cents(record['amount']))
+            match = None
+            for offset in offsets:
+                for position in index.get((day + offset, ttype, cents, description), ()):
+                    if position not in claimed:
+                        match = position
+                        break
+                if match is not None:
+                    break
+            if match is not None:
+                claimed.add(match)
+            matches.append(match)
+        return matches
+
+    def find_duplicates(self, rows: Iterable[Dict], window_days: int = 0) -> List[Tuple[int, Dict]]:
+        """Report rows that duplicate an already stored transaction, without adding anything.
+
+        A row is a duplicate when a stored transaction has the same type,
+        amount (to the cent) and description (case and spacing ignored) and
+        a date at most `window_days` days away. Invalid rows are ignored.
+
+        Returns:
+            (row index, copy of the matching stored record) pairs, in row order.
+        """
+        result = validate_transaction_batch(rows, as_records=True)
+        with self._guard():
+            matches = self._match_duplicates(result.valid, window_days)
+            return [(index, dict(self._transactions[pos]))
+                    for index, pos in zip(result.indexes, matches) if pos is not None]
+
+    # ----------------------- Budget Threshold Events -----------------------------
+    def _track_budget_spend(self, record: Dict, category: str, cents: int) -> None:
+        """Update the running month/category spend and emit events on threshold crossings.
+
+        Constant work per transaction: one categorization, one dict update and
+        one status comparison for the affected (month, category) pair.
+        """
+        month = record['date'][:7]
+        self._month_category_spend[month][category] += cents
+        self._update_budget_state(month, category)
+
+    def _update_budget_state(self, month: str, category: str) -> None:
+        """Re-derive one (month, category) budget status; emit a BudgetEvent only when it rises.
+
+        Spend only falls when set_rules() moves records out of a category;
+        the lower status is then recorded without an event.
+        """
+        budget = self._category_budgets.get(category)
+        if not budget:
+            return
+        spent = from_cents(self._month_category_spend[month][category])
+        status = budget_status(spent, budget, self._warning_threshold)
+        key = (month, category)
+        previous = self._budget_states.get(key, "under")
+        if status == previous:
+            return
+        self._budget_states[key] = status
+        if _BUDGET_STATUS_RANK[status] < _BUDGET_STATUS_RANK[previous]:
+            return
+        event = BudgetEvent(
+            month=month,
+            category=category,
+            status=status,
+            spent=spent,
+            budget=budget,
+            percent_used=round(spent / budget * 100.0, 2),
+        )
+        self._budget_events.append(event)
+        if not self._loading_partitions:
+            self._dispatch_budget_event(event, self._budget_subscribers)
+
+    @staticmethod
+    def _dispatch_budget_event(event: BudgetEvent,
+                               subscribers: Dict[Optional[str], List[Callable[[BudgetEvent], None]]]) -> None:
+        """Call category-specific subscribers first, then catch-all (None) subscribers."""
+        for callback in list(subscribers.get(event.category, ())):
+            callback(event)
+        for callback in list(subscribers.get(None, ())):
+            callback(event)
+
+    def subscribe_budget_events(self, callback: Callable[[BudgetEvent], None],
+                                category: Optional[str] = None) -> Callable[[BudgetEvent], None]:
+        """Register a callback for budget threshold events.
+
+        Parameters
+        ----------
+        callback : Callable[[BudgetEvent], None]
+            Called once each time a category moves to 'approaching' or 'exceeded'.
+            Months loaded lazily from partitioned storage are not reported.
+        category : Optional[str]
+            Only receive events for this category; None receives every category.
+
+        Returns the callback unchanged.
+        """
+        if not callable(callback):
+            raise TypeError("callback must be callable")
+        key = category.strip().lower() if category is not None else None
+        self._budget_subscribers[key].append(callback)
+        return callback
+
+    def unsubscribe_budget_events(self, callback: Callable[[BudgetEvent], None],
+                                  category: Optional[str] = None) -> None:
+        """Remove a callback previously passed to subscribe_budget_events()."""
+        key = category.strip().lower() if category is not None else None
+        try:
+            self._budget_subscribers[key].remove(callback)
+        except ValueError:
+            raise ValueError("callback is not subscribed") from None
+
+    @property
+    def budget_events(self) -> List[BudgetEvent]:
+        """A COPY of every budget event emitted so far, in emission order."""
+        self._ensure_loaded()
+        return list(self._budget_events)
+
+    def replay_budget_events(self, callback: Callable[[BudgetEvent], None],
+                             category: Optional[str] = None) -> int:
+        """Feed previously emitted events to a callback (useful in tests).
+
+        Returns the number of events replayed.
+        """
+        key = category.strip().lower() if category is not None else None
+        self._ensure_loaded()
+        count = 0
+        for event in list(self._budget_events):
+            if key is None or event.category == key:
+                callback(event)
+                count += 1
+        return count
+
+    def month_category_spend(self, year: int, month: int) -> Dict[str, float]:
+        """Return the incrementally tracked {category: spent} for a month (lowercase keys)."""
+        if not (1 <= int(month) <= 12):
+            raise ValueError("month must be in 1..12")
+        key = f"{int(year):04d}-{int(month):02d}"
+        self._ensure_loaded([key])
+        with self._guard():
+            return {k: from_cents(v) for k, v in self._month_category_spend.get(key, {}).items()}
+
+    # ----------------------- Running Statistics & Anomalies ------------------------
+    # Groups need this much history before their members can be flagged
+    ANOMALY_MIN_HISTORY = 5
+
+    def _track_amount_stats(self, record: Dict, category: str) -> None:
+        """Check a new expense against its groups' history, then fold it in."""
+        merchant = normalize_description(record['description']).merchant_key
+        amount = record['amount']
+        groups = (("category", category, self._category_stats[category]),
+                  ("merchant", merchant, self._merchant_stats[merchant]))
+        if self._anomaly_hooks and not self._loading_partitions:
+            for scope, key, stats in groups:
+                anomaly = self._check_anomaly(record, scope, key, stats, self._anomaly_threshold)
+                if anomaly is not None:
+                    for hook in list(self._anomaly_hooks):
+                        hook(anomaly)
+        for _, _, stats in groups:
+            stats.update(amount)
+        self._category_sketches[category].update(amount)
+        self._month_sketches[record['date'][:7]].update(amount)
+
+    def _check_anomaly(self, record: Dict, scope: str, key: str,
+                       stats: RunningStats, threshold: float) -> Optional[Anomaly]:
+        if stats.count < self.ANOMALY_MIN_HISTORY:
+            return None
+        z = stats.z_score(record['amount'])
+        if abs(z) < threshold:
+            return None
+        return Anomaly(record=record, scope=scope, key=key, mean=stats.mean,
+                       stddev=stats.stddev, z_score=round(z, 2))
+
+    def on_anomaly(self, callback: Callable[[Anomaly], None]) -> Callable[[Anomaly], None]:
+        """Register a hook called when a newly added expense is an anomaly.
+
+        The new amount is compared with the history *before* it, per category
+        and per merchant, so one transaction can trigger up to two calls.
+        Rows loaded lazily from partitioned storage never trigger it; while a
+        hook is registered, adding an expense first loads every month so the
+        comparison sees the full history. Returns the callback unchanged.
+        """
+        if not callable(callback):
+            raise TypeError("callback must be callable")
+        self._anomaly_hooks.append(callback)
+        return callback
+
+    def remove_anomaly_hook(self, callback: Callable[[Anomaly], None]) -> None:
+        """Unregister a hook added with on_anomaly()."""
+        try:
+            self._anomaly_hooks.remove(callback)
+        except ValueError:
+            raise ValueError("callback is not registered") from None
+
+    def anomalies(self, threshold: Optional[float] = None, scope: str = "category") -> List[Anomaly]:
+        """Return stored expenses whose amount is at least `threshold` standard
+        deviations from the current mean of their category (or merchant).
+
+        Uses the running statistics, so no per-group recomputation is needed.
+        """
+        if scope not in ("category", "merchant"):
+            raise ValueError("scope must be 'category' or 'merchant'")
+        threshold = self._anomaly_threshold if threshold is None else float(threshold)
+        self._ensure_loaded()
+        with self._guard():  # copy the group state, then scan without the lock
+            groups = [(category, list(positions)) for category, positions in self._indexes.by_category.items()]
+            source = self._category_stats if scope == "category" else self._merchant_stats
+            group_stats = {k: RunningStats().merge(v) for k, v in source.items()}
+        found: List[Anomaly] = []
+        for category, positions in groups:
+            for pos in positions:
+                record = self._transactions[pos]
+                if record['type'] != 'expense':
+                    continue
+                if scope == "category":
+                    key = category
+                else:
+                    key = normalize_description(record['description']).merchant_key
+                stats = group_stats[key]
+                anomaly = self._check_anomaly(record, scope, key, stats, threshold)
+                if anomaly is not None:
+                    found.append(anomaly)
+        found.sort(key=lambda a: abs(a.z_score), reverse=True)
+        return found
+
+    def category_stats(self) -> Dict[str, Dict[str, float]]:
+        """Running count/mean/variance/stddev of expense amounts per category (lowercase keys)."""
+        self._ensure_loaded()
+        with self._guard():
+            return {k: s.as_dict() for k, s in self._category_stats.items()}
+
+    def merchant_stats(self) -> Dict[str, Dict[str, float]]:
+        """Running count/mean/variance/stddev of expense amounts per merchant key."""
+        self._ensure_loaded()
+        with self._guard():
+            return {k: s.as_dict() for k, s in self._merchant_stats.items()}
+
+    # ----------------------- Spending Percentiles ----------------------------------
+    def _sketch_for(self, category: Optional[str], month: Optional[str]) -> QuantileSketch:
+        if category is not None and month is not None:
+            raise ValueError("pass category or month, not both")
+        if category is not None:
+            self._ensure_loaded()
+            return self._category_sketches.get(category.strip().lower(), QuantileSketch())
+        if month is not None:
+            key = parse_date(month + "-01" if len(month) == 7 else month)[:7]
+            self._ensure_loaded([key])
+            return self._month_sketches.get(key, QuantileSketch())
+        self._ensure_loaded()
+        return merge_sketches(self._category_sketches.values())
+
+    def spending_percentiles(self, category: Optional[str] = None, month: Optional[str] = None,
+                             percentiles: Iterable[float] = (50, 90, 99)) -> Dict[str, Optional[float]]:
+        """Approximate percentiles of expense amounts, e.g. {'p50': 18.2, 'p90': 71.0, 'p99': 310.5}.
+
+        Parameters
+        ----------
+        category : str, optional
+            Restrict to one category (case-insensitive).
+        month : str, optional
+            Restrict to one month, 'YYYY-MM' (or any date inside it).
+        percentiles : iterable of float
+            Percentiles in 0..100.
+
+        Answers come from KLL sketches kept up to date on insert, so the cost
+        does not grow with history; rank error is about 1%, and exact for
+        groups of fewer than ~200 expenses. Values are None when the group
+        has no expenses.
+        """
+        pcts = [float(p) for p in percentiles]
+        if any(not 0 <= p <= 100 for p in pcts):
+            raise ValueError("percentiles must be between 0 and 100")
+        with self._guard():
+            sketch = self._sketch_for(category, month).copy()
+        values = sketch.quantiles([p / 100.0 for p in pcts])
+        return {f"p{p:g}": (None if v is None else round(v, 2)) for p, v in zip(pcts, values)}
+
+    def quantile_sketches(self, by: str = "category") -> Dict[str, QuantileSketch]:
+        """Copies of the per-'category' or per-'month' sketches, keyed like month_category_spend().
+
+        Merge them across ledgers (QuantileSketch.merge or merge_sketches) for
+        population-level percentiles, or ship them with to_dict().
+        """
+        if by == "category":
+            source = self._category_sketches
+        elif by == "month":
+            source = self._month_sketches
+        else:
+            raise ValueError("by must be 'category' or 'month'")
+        self._ensure_loaded()
+        with self._guard():
+            return {k: sk.copy() for k, sk in source.items()}
+
+    # ----------------------- Persistence Methods -----------------------
+    def _snapshot(self) -> Dict[str, Any]:
+        """Point-in-time copy of the persisted state; records are never mutated, so a shallow copy suffices."""
+        self._ensure_loaded()
+        data = {
+            "owner": self._owner,
+            "category_budgets": dict(self._category_budgets),
+            "transactions": self._transactions[:self._epoch]
+        }
+        if self._rules is not None:
+            data["category_rules"] = self._rules.to_dict()
+        return data
+
+    @staticmethod
+    def _write_snapshot(filename: str, data: Dict[str, Any], compression: Optional[str] = None) -> None:
+        _atomic_write(filename, lambda f: _write_json(f, data, indent=4), compression)
+
+    @classmethod
+    def _read_file(cls, filename: str, compression: Optional[str] = None) -> FinanceLedger:
+        with _open_text(filename, "r", compression) as f:
+            data = json.load(f)
+        rules = RuleSet.from_dict(data["category_rules"]) if "category_rules" in data else None
+        ledger = cls(owner=data["owner"], category_budgets=data.get("category_budgets"), rules=rules)
+        for tx in data.get("transactions", []):
+            ledger.add_transaction(tx["type"], tx["description"], tx["amount"], tx["date"])
+        return ledger
+
+    def save(self, filename: str, compression: Optional[str] = None) -> None:
+        """Save like save_to_file(), but raise errors (OSError, ValueError) instead of printing them.
+
+        The file is replaced atomically, so a failed save leaves any earlier
+        one intact.
+        """
+        self._write_snapshot(filename, self._snapshot(), compression)
+
+    def save_to_file(self, filename: str, compression: Optional[str] = None) -> None:
+        """Save ledger state (transactions and budgets) to a JSON file.
+
+        The file is compressed as it is written when `compression` is
+        'gzip', 'bz2' or 'lzma', or when it is None and the name ends in
+        .gz, .bz2 or .xz. Pass 'none' to force plain JSON.
+        Errors are printed; use save() to have them raised.
+        """
+        try:
+            self.save(filename, compression)
+            print(f"Ledger saved to {filename}")
+        except Exception as e:
+            print(f"❌ Error saving ledger: {e}")
+
+    @classmethod
+    def load_from_file(cls, filename: str, compression: Optional[str] = None) -> FinanceLedger:
+        """Load a ledger from a JSON file and return a FinanceLedger instance.
+
+        Compressed files are read the same way save_to_file() picks the codec.
+        """
+        try:
+            ledger = cls._read_file(filename, compression)
+            print(f"Ledger loaded from {filename}")
+            return ledger
+        except Exception as e:
+            print(f"❌ Error loading ledger: {e}")
+            raise
+
+    def export_monthly_report(self, year: int, month: int, filename: Optional[str] = None) -> None:
+        """Export the month summary to a CSV file."""
+        summary = self.month_summary(year, month)
+        filename = filename or f"{self._owner}_report_{year}_{month:02d}.csv"
+        try:
+            _atomic_write(filename, lambda f: _write_report_csv(f, summary))
+            print(f"Monthly report exported to {filename}")
+        except Exception as e:
+            print(f"❌ Error exporting report: {e}")
+
+    # ----------------------- Partitioned Storage -----------------------------------
+    def _ensure_loaded(self, months: Optional[Iterable[str]] = None) -> None:
+        """Load the given months' partitions (all when None) that are on disk but not yet in memory."""
+        if self._store is None:
+            return
+        with self._guard():
+            wanted = list(self._partition_months) if months is None else list(months)
+            for key in sorted(wanted):
+                if key not in self._partition_months or key in self._loaded_months:
+                    continue
+                records = self._store.read_partition(key)
+                self._loaded_months.add(key)
+                categories = self._categorize_batch([r['description'] for r in records])
+                # Reads load these rows, so subscribers and anomaly hooks must not hear about them
+                self._loading_partitions = True
+                try:
+                    for record, category in zip(records, categories):  # written by save_partitioned(), so valid
+                        self._transactions.append(record)
+                        self._on_record_added(record, category)
+                finally:
+                    self._loading_partitions = False
+
+    def save_partitioned(self, directory: str) -> List[str]:
+        """Save to a month-partitioned directory and return the months written.
+
+        Saving back to the directory the ledger was opened from (or last
+        saved to) rewrites only the months that gained transactions since;
+        untouched month files are left alone. Saving anywhere else writes
+        every month. The manifest, with per-month count and expense/income
+        totals and the category rules, is written last.
+        """
+        store = PartitionedStore(directory)
+        same = self._store is not None and self._store.directory == store.directory
+        with self._guard():
+            if not same:
+                self._ensure_loaded()
+            to_write = sorted(self._dirty_months if same else self._indexes.by_month)
+            self._ensure_loaded(to_write)  # a rewritten month must include its rows already on disk
+            batches = {key: [self._transactions[p] for p in self._indexes.by_month[key]] for key in to_write}
+            months = dict(self._partition_months) if same else {}
+            rules = self._rules.to_dict() if self._rules is not None else None
+            self._dirty_months.difference_update(to_write)
+        try:
+            for key, records in batches.items():
+                months[key] = store.write_partition(key, records)
+            store.write_manifest(self._owner, dict(self._category_budgets), months, rules)
+        except BaseException:
+            with self._guard():
+                self._dirty_months.update(to_write)
+            raise
+        with self._guard():
+            if not same:
+                self._loaded_months = set(self._indexes.by_month)
+            self._loaded_months.update(to_write)
+            self._store, self._partition_months = store, months
+        return to_write
+
+    @classmethod
+    def open_partitioned(cls, directory: str, **options: Any) -> FinanceLedger:
+        """Open a directory written by save_partitioned(), reading only its manifest.
+
+        Month files load on first use: month_summary() and
+        month_category_spend() load just their month, total_spent() loads
+        only months its range cuts through, and whole-ledger reads (search(),
+        query(), trend(), ...) load everything. Extra keyword arguments go to
+        the constructor (e.g. concurrent=True); an explicit `rules` replaces
+        the rule set saved in the manifest.
+        """
+        store = PartitionedStore(directory)
+        manifest = store.read_manifest()
+        if "rules" not in options and "category_rules" in manifest:
+            options["rules"] = RuleSet.from_dict(manifest["category_rules"])
+        ledger = cls(owner=manifest["owner"], category_budgets=manifest.get("category_budgets"), **options)
+        ledger._store = store
+        ledger._partition_months = dict(manifest["months"])
+        return ledger
+
+    def loaded_months(self) -> List[str]:
+        """Months currently in memory ('YYYY-MM'), whether loaded from partitions or added."""
+        with self._guard():
+            return sorted(set(self._indexes.by_month) | self._loaded_months)
+
+    # ----------------------- Async Persistence -------------------------------------
+    async def asave(self, filename: str, compression: Optional[str] = None) -> None:
+        """Save like save_to_file() without blocking the event loop.
+
+        The state is snapshotted on the loop, then JSON encoding and the
+        atomic temp-file-and-rename write run in the default executor.
+        Calls for the same file coalesce: while a write is in flight, every
+        further call waits for one follow-up write that snapshots the state
+        when it starts, so a burst of N saves costs at most two writes and
+        each caller's changes are on disk when its await returns (with the
+        `compression` of the call that started the write).
+        Errors are raised, never printed. Cancelling the call that started
+        a write before it begins hands the write over to the callers that
+        joined it, one of which starts it instead; once the write has begun
+        it always completes.
+        """
+        import asyncio
+        key = os.path.abspath(filename)
+        while True:
+            slot = self._save_slots.setdefault(key, _SaveSlot())
+            if slot.queued is None:
+                break
+            try:
+                return await asyncio.shield(slot.queued)
+            except _SaveAbandoned:
+                continue  # its starter was cancelled; the first waiter to get here starts it
+        loop = asyncio.get_running_loop()
+        mine = slot.queued = loop.create_future()
+        try:
+            await asyncio.sleep(0)  # let callers from the same burst join this write
+            while slot.running is not None:
+                await asyncio.wait([slot.running])
+            slot.queued, slot.running = None, mine
+            write = loop.run_in_executor(None, self._write_snapshot, filename, self._snapshot(), compression)
+        except BaseException as e:
+            # Cancelled or failed before the write started: joined callers retry or see the error
+            mine.set_exception(_SaveAbandoned() if isinstance(e, asyncio.CancelledError) else e)
+            mine.exception()  # mark retrieved
+            self._release_save_slot(key, slot, mine)
+            raise
+        write.add_done_callback(lambda done: self._finish_save(key, slot, mine, done))
+        # A started write runs to completion even if this caller is cancelled, and keeps
+        # the slot until it lands, so a later save can never be overwritten by it.
+        await asyncio.shield(mine)
+
+    def _finish_save(self, key: str, slot: _SaveSlot, mine: asyncio.Future, write: asyncio.Future) -> None:
+        if write.cancelled():
+            mine.cancel()
+        elif write.exception() is not None:
+            mine.set_exception(write.exception())
+            mine.exception()
+        else:
+            mine.set_result(None)
+        self._release_save_slot(key, slot, mine)
+
+    def _release_save_slot(self, key: str, slot: _SaveSlot, future: asyncio.Future) -> None:
+        if slot.queued is future:
+            slot.queued = None
+        if slot.running is future:
+            slot.running = None
+        if slot.queued is None and slot.running is None:
+            self._save_slots.pop(key, None)
+
+    @classmethod
+    async def aload(cls, filename: str, compression: Optional[str] = None) -> FinanceLedger:
+        """Load like load_from_file(), parsing and rebuilding in the default executor. Never prints."""
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(None, cls._read_file, filename, compression)
+
+    async def aexport_monthly_report(self, year: int, month: int, filename: Optional[str] = None) -> str:
+        """Export like export_monthly_report() off the event loop; returns the path written. Never prints."""
+        filename = filename or f"{self._owner}_report_{year}_{month:02d}.csv"
+        key = f"{int(year):04d}-{int(month):02d}"
+        self._ensure_loaded([key])
+        records = self._month_records(key, self._epoch)
+        budgets, categorize = dict(self._category_budgets), self._batch_categorizer()
+
+        def work() -> None:
+            summary = self._summarize_month(records, budgets, year, month, categorize)
+            _atomic_write(filename, lambda f: _write_report_csv(f, summary))
+
+        import asyncio
+        await asyncio.get_running_loop().run_in_executor(None, work)
+        return filename
+
+    # ----------------------- Read Cache --------------------------------------------
+    def _cached(self, key: Tuple, months: Optional[List[str]], compute: Callable[[LedgerSnapshot], Any]) -> Any:
+        """Serve compute(view) from the read cache while the ledger generation is unchanged.
+
+        The generation is read before the view is taken, so a racing writer
+        can only make a stored result newer than its key, never older.
+        Results are frozen once when computed (ledger_cache.freeze()), so
+        every caller shares the cached value and a hit costs O(1).
+        """
+        self._ensure_loaded(months)
+        generation = self._generation
+        hit, value = self._read_cache.lookup(key, generation)
+        if not hit:
+            value = freeze(compute(self._view(months)))
+            self._read_cache.store(key, generation, value)
+        return value
+
+    def cache_info(self) -> CacheInfo:
+        """Hits, misses, size and evictions of the memoized trend/top_categories/detect_recurring/month_summary."""
+        return self._read_cache.info()
+
+    def cache_clear(self) -> None:
+        """Empty the read cache and reset its counters."""
+        self._read_cache.clear()
+
+    # ----------------------- Instrumentation ---------------------------------------
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-method call counts, timings and rows processed for this ledger.
+
+        Empty unless instrumentation.enable() (or instrumentation.profile()) was
+        active while the methods ran.
+        """
+        return _summarize_call_stats(self._call_stats)
 
     # ----------------------- Representations ---------------------------------------
     def __str__(self) -> str:
@@ -0,0 +1,297 @@
+"""
+Opt-in Hot-Path Instrumentation
+
+Records call counts, cumulative/min/max and percentile timings, and rows
+processed for every public function in library_financial_functions and
+every public FinanceLedger method. Recording is thread-safe, so the
+concurrent ledger can be profiled from several threads.
+
+Instrumentation is off by default and then costs nothing: the original
+functions are untouched. enable() swaps timing wrappers into the library
+module, every loaded module that bound its functions with
+`from library_financial_functions import ...`, and the FinanceLedger
+class; disable() puts the originals back.
+
+Usage:
+    from SRC import instrumentation
+    instrumentation.enable()
+    ...                                   # run the workload
+    print(instrumentation.format_report(instrumentation.get_stats()))
+
+    with instrumentation.profile():       # or profile one block and print its report
+        ledger.month_summary(2025, 11)
+"""
+
+import contextlib
+import functools
+import importlib
+import inspect
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+# Report names use the short module names: "library_financial_functions.parse_date", ...
+LIBRARY_MODULE = "library_financial_functions"
+LEDGER_MODULE = "finance_ledger"
+
+SAMPLE_SIZE = 1024
+
+
+class CallStats:
+    """Running statistics for one instrumented callable."""
+
+    __slots__ = ("calls", "total", "min", "max", "rows", "samples", "_rng", "_lock")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.rows = 0
+        self.samples: List[float] = []  # reservoir sample of durations for percentiles
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, rows: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.total += elapsed
+            self.rows += rows
+            if elapsed < self.min:
+                self.min = elapsed
+            if elapsed > self.max:
+                self.max = elapsed
+            if len(self.samples) < SAMPLE_SIZE:
+                self.samples.append(elapsed)
+            else:
+                slot = self._rng.randrange(self.calls)
+                if slot < SAMPLE_SIZE:
+                    self.samples[slot] = elapsed
+
+    def percentile(self, pct: float) -> float:
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            calls, total, low, high, rows = self.calls, self.total, self.min, self.max, self.rows
+        return {
+            "calls": calls,
+            "total_s": total,
+            "mean_s": total / calls if calls else 0.0,
+            "min_s": low if calls else 0.0,
+            "p50_s": self.percentile(50),
+            "p90_s": self.percentile(90),
+            "p99_s": self.percentile(99),
+            "max_s": high,
+            "rows": rows,
+            "rows_per_s": rows / total if total > 0 else 0.0,
+        }
+
+
+# Active collectors: the global one while enabled, plus one per open profile() block
+_global_stats: Dict[str, CallStats] = {}
+_collectors: List[Dict[str, CallStats]] = []
+_originals: Dict[Any, Dict[str, Any]] = {}  # namespace -> {attribute: original}
+_enabled = False
+_stats_lock = threading.Lock()  # guards creating a collector's first CallStats for a name
+
+
+def _stats_for(collector: Dict[str, CallStats], name: str) -> CallStats:
+    stats = collector.get(name)
+    if stats is None:
+        with _stats_lock:
+            stats = collector.get(name)
+            if stats is None:
+                stats = collector[name] = CallStats()
+    return stats
+
+
+def _record(name: str, elapsed: float, rows: int) -> None:
+    for collector in list(_collectors):
+        _stats_for(collector, name).record(elapsed, rows)
+
+
+def _sized_rows(value: Any) -> Optional[int]:
+    return len(value) if isinstance(value, (list, tuple)) else None
+
+
+def _wrap_function(func: Callable, name: str) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        rows = _sized_rows(args[0]) if args else None
+        _record(name, elapsed, 1 if rows is None else rows)
+        return result
+    for attr in ("cache_info", "cache_clear"):  # keep lru_cache helpers reachable
+        if hasattr(func, attr):
+            setattr(wrapper, attr, getattr(func, attr))
+    return wrapper
+
+
+def _wrap_method(func: Callable, name: str, is_classmethod: bool) -> Callable:
+    record = _method_recorder(func, name, is_classmethod)
+    if inspect.iscoroutinefunction(func):
+        # Time the awaited call (asave, aload, ...), not just creating the coroutine
+        @functools.wraps(func)
+        async def async_wrapper(owner, *args, **kwargs):
+            started = time.perf_counter()
+            result = await func(owner, *args, **kwargs)
+            record(owner, result, time.perf_counter() - started, args)
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(owner, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(owner, *args, **kwargs)
+        record(owner, result, time.perf_counter() - started, args)
+        return result
+    return wrapper
+
+
+def _method_recorder(func: Callable, name: str, is_classmethod: bool) -> Callable:
+    def record(owner, result, elapsed: float, args: tuple) -> None:
+        ledger = result if is_classmethod else owner
+        rows = _sized_rows(args[0]) if args else None
+        if rows is None:
+            rows = 1 if func.__name__ == "add_transaction" else len(getattr(ledger, "_transactions", ()))
+        _record(name, elapsed, rows)
+        per_instance = getattr(ledger, "_call_stats", None)
+        if per_instance is not None:
+            _stats_for(per_instance, func.__name__).record(elapsed, rows)
+    return record
+
+
+def _patch(namespace: Any, attr: str, replacement: Any) -> None:
+    saved = _originals.setdefault(namespace, {})
+    if attr not in saved:
+        saved[attr] = namespace.__dict__[attr] if isinstance(namespace, type) else getattr(namespace, attr)
+    setattr(namespace, attr, replacement)
+
+
+def _install() -> None:
+    lib = importlib.import_module(f".{LIBRARY_MODULE}", __package__)
+    wrapped: Dict[int, Callable] = {}
+    for attr, obj in list(vars(lib).items()):
+        if attr.startswith("_") or inspect.isclass(obj) or not callable(obj):
+            continue
+        if getattr(obj, "__module__", None) != lib.__name__:
+            continue
+        replacement = _wrap_function(obj, f"{LIBRARY_MODULE}.{attr}")
+        wrapped[id(obj)] = replacement
+        _patch(lib, attr, replacement)
+    # Any loaded module may hold its own references from `from ... import`
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if module is lib or not isinstance(namespace, dict):
+            continue
+        for attr, obj in list(namespace.items()):
+            if id(obj) in wrapped:
+                _patch(module, attr, wrapped[id(obj)])
+    ledger_module = sys.modules.get(f"{__package__}.{LEDGER_MODULE}")
+    if ledger_module is not None:
+        cls = ledger_module.FinanceLedger
+        for attr, obj in list(vars(cls).items()):
+            if attr.startswith("_") or attr == "stats":
+                continue
+            name = f"FinanceLedger.{attr}"
+            if isinstance(obj, classmethod):
+                _patch(cls, attr, classmethod(_wrap_method(obj.__func__, name, True)))
+            elif inspect.isfunction(obj):
+                _patch(cls, attr, _wrap_method(obj, name, False))
+
+
+def _uninstall() -> None:
+    for namespace, saved in _originals.items():
+        for attr, original in saved.items():
+            setattr(namespace, attr, original)
+    _originals.clear()
+
+
+def _refresh() -> None:
+    if _collectors and not _originals:
+        _install()
+    elif not _collectors and _originals:
+        _uninstall()
+
+
+def enable() -> None:
+    """Start recording into the module-level statistics (see get_stats())."""
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        _collectors.append(_global_stats)
+        _refresh()
+
+
+def disable() -> None:
+    """Stop recording and restore the original functions. Collected stats are kept."""
+    global _enabled
+    if _enabled:
+        _enabled = False
+        _collectors.remove(_global_stats)
+        _refresh()
+
+
+def is_enabled() -> bool:
+    """True while module-level recording is on."""
+    return _enabled
+
+
+def reset() -> None:
+    """Discard the module-level statistics."""
+    _global_stats.clear()
+
+
+def summarize(stats: Dict[str, CallStats]) -> Dict[str, Dict[str, float]]:
+    """Convert raw CallStats into plain dicts, slowest (by total time) first."""
+    ordered = sorted(stats.items(), key=lambda kv: kv[1].total, reverse=True)
+    return {name: s.as_dict() for name, s in ordered}
+
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    """Return the module-level report: {callable name: {calls, total_s, p50_s, ..., rows}}."""
+    return summarize(_global_stats)
+
+
+def format_report(report: Dict[str, Dict[str, float]]) -> str:
+    """Render a report from get_stats()/summarize() as a flat text table."""
+    header = f"{'name':<56} {'calls':>8} {'total ms':>10} {'mean us':>10} {'p50 us':>9} " \
+             f"{'p90 us':>9} {'p99 us':>9} {'rows':>10}"
+    lines = [header, "-" * len(header)]
+    for name, s in report.items():
+        lines.append(
+            f"{name:<56} {s['calls']:>8} {s['total_s'] * 1e3:>10.2f} {s['mean_s'] * 1e6:>10.1f} "
+            f"{s['p50_s'] * 1e6:>9.1f} {s['p90_s'] * 1e6:>9.1f} {s['p99_s'] * 1e6:>9.1f} {s['rows']:>10}"
+        )
+    return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profile(stream: Optional[TextIO] = sys.stderr) -> Iterator[Dict[str, Dict[str, float]]]:
+    """Profile only the enclosed block.
+
+    Yields a dict that is filled with the block's report on exit, and writes
+    format_report() of it to `stream` (pass None to skip printing).
+    """
+    collector: Dict[str, CallStats] = {}
+    report: Dict[str, Dict[str, float]] = {}
+    _collectors.append(collector)
+    _refresh()
+    try:
+        yield report
+    finally:
+        _collectors.remove(collector)
+        _refresh()
+        report.update(summarize(collector))
+        if stream is not None:
+            print(format_report(report), file=stream)
@@ -0,0 +1,99 @@
+import math
+from collections import Counter, defaultdict
+
+from .library_financial_functions import categorize_transaction, tokenize_financial_text
+
+
+class KeywordIndex:
+    """Corpus-level keyword statistics for a set of transaction descriptions.
+
+    Every description is tokenized once on the way in (normalization is
+    shared through normalize_description's bounded cache), and term
+    frequencies are kept for the whole corpus, per category and per month,
+    together with document frequencies for TF-IDF ranking. New transactions
+    can be added at any time; the tables update incrementally.
+
+    Args:
+        transactions (iterable[dict] | None): Records with 'description' and
+            optionally 'date' ('YYYY-MM-DD') and 'category'.
+
+    Examples:
+        >>> index = KeywordIndex([
+        ...     {'description': 'Uber ride downtown', 'date': '2024-03-01'},
+        ...     {'description': 'Uber ride airport', 'date': '2024-03-09'},
+        ...     {'description': 'Starbucks coffee', 'date': '2024-04-02'},
+        ... ])
+        >>> index.top_keywords(2)
+        [('uber', 2), ('ride', 2)]
+        >>> index.category_keywords('Transportation', 1)
+        [('ride', 2.58)]
+    """
+
+    def __init__(self, transactions=None):
+        self._doc_count = 0
+        self._term_freq = Counter()
+        self._doc_freq = Counter()
+        self._by_category = defaultdict(Counter)
+        self._by_month = defaultdict(Counter)
+        if transactions is not None:
+            self.add_many(transactions)
+
+    def add(self, transaction):
+        """Index one transaction record."""
+        if not isinstance(transaction, dict):
+            raise TypeError("transaction must be a dictionary")
+        description = transaction.get("description")
+        if not isinstance(description, str):
+            raise TypeError("description must be a string")
+        tokens = tokenize_financial_text(description)
+        self._doc_count += 1
+        if not tokens:
+            return
+        self._term_freq.update(tokens)
+        self._doc_freq.update(set(tokens))
+        category = transaction.get("category") or categorize_transaction(description)
+        self._by_category[category].update(tokens)
+        date = transaction.get("date")
+        if date:
+            self._by_month[str(date)[:7]].update(tokens)
+
+    def add_many(self, transactions):
+        """Index many transaction records in one pass."""
+        for t in transactions:
+            self.add(t)
+
+    def __len__(self):
+        return self._doc_count
+
+    def document_frequency(self, term):
+        """Number of indexed descriptions that contain term."""
+        return self._doc_freq.get(term.lower(), 0)
+
+    def idf(self, term):
+        """Smoothed inverse document frequency of term."""
+        return math.log((1 + self._doc_count) / (1 + self.document_frequency(term))) + 1
+
+    def top_keywords(self, n=10):
+        """Return the n most frequent keywords across the whole corpus as (term, count)."""
+        return self._term_freq.most_common(max(0, int(n)))
+
+    def _rank(self, counts, n):
+        scored = [(term, round(tf * self.idf(term), 2)) for term, tf in counts.items()]
+        scored.sort(key=lambda kv: (-kv[1], kv[0]))
+        return scored[:max(0, int(n))]
+
+    def category_keywords(self, category, n=5):
+        """Return the n keywords most characteristic of a category, ranked by TF-IDF."""
+        return self._rank(self._by_category.get(category, {}), n)
+
+    def month_keywords(self, month, n=5):
+        """Return the n keywords most characteristic of a 'YYYY-MM' month, ranked by TF-IDF."""
+        return self._rank(self._by_month.get(month, {}), n)
+
+    def categories(self):
+        """Categories that have at least one indexed keyword."""
+        return sorted(self._by_category)
+
+    def months(self):
+        """Months ('YYYY-MM') that have at least one indexed keyword."""
+        return sorted(self._by_month)
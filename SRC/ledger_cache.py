@@ -0,0 +1,137 @@
+"""
+Generation-Checked Read Cache
+
+FinanceLedger memoizes its pure read APIs (trend, top_categories,
+detect_recurring, month_summary) here. Each entry remembers the ledger
+generation it was computed at; the ledger bumps its generation on every
+mutation, so an entry is only served while nothing has changed since, and
+a stale entry is simply recomputed in place. Size is bounded with LRU
+eviction.
+
+Cached values are shared by every caller, so they are frozen once when
+computed (freeze()): dicts and lists become ReadOnlyDict/ReadOnlyList,
+which still compare, serialize and isinstance-check as dict and list but
+raise TypeError on mutation. A cache hit is then O(1) instead of a copy.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, NoReturn, Tuple
+
+
+def _read_only(self: Any, *args: Any, **kwargs: Any) -> NoReturn:
+    raise TypeError(f"{type(self).__name__} is a shared cached result; copy it "
+                    f"(dict(...)/list(...)) before modifying")
+
+
+class ReadOnlyDict(dict):
+    """A dict that refuses mutation. Copy it with dict() to get a mutable one."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class ReadOnlyList(list):
+    """A list that refuses mutation. Copy it with list() to get a mutable one."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Return `value` with every nested dict and list replaced by its read-only counterpart.
+
+    Examples:
+        >>> frozen = freeze({"totals": {"Food": 12.5}, "top": [("Food", 12.5)]})
+        >>> frozen == {"totals": {"Food": 12.5}, "top": [("Food", 12.5)]}
+        True
+        >>> frozen["totals"]["Food"] = 0
+        Traceback (most recent call last):
+        ...
+        TypeError: ReadOnlyDict is a shared cached result; copy it (dict(...)/list(...)) before modifying
+    """
+    if isinstance(value, dict):
+        return ReadOnlyDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return ReadOnlyList(freeze(v) for v in value)
+    if isinstance(value, tuple) and not hasattr(value, "_fields"):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class CacheInfo(NamedTuple):
+    """Counters reported by GenerationCache.info() (same fields as functools.lru_cache plus evictions)."""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    evictions: int
+
+
+class GenerationCache:
+    """Bounded LRU map from a call key to (generation, value).
+
+    Args:
+        maxsize (int): Entries kept; the least recently used is evicted
+            beyond this. 0 disables caching (every lookup misses).
+
+    Examples:
+        >>> cache = GenerationCache(maxsize=2)
+        >>> cache.store(("trend",), 1, {"trend": "stable"})
+        >>> cache.lookup(("trend",), 1)
+        (True, {'trend': 'stable'})
+        >>> cache.lookup(("trend",), 2)  # the ledger changed since
+        (False, None)
+        >>> cache.info()
+        CacheInfo(hits=1, misses=1, maxsize=2, currsize=1, evictions=0)
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        if not isinstance(maxsize, int) or isinstance(maxsize, bool) or maxsize < 0:
+            raise ValueError("maxsize must be a non-negative integer")
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()  # readers may share a concurrent-mode ledger
+        self._hits = self._misses = self._evictions = 0
+
+    def lookup(self, key: Hashable, generation: int) -> Tuple[bool, Any]:
+        """(True, value) if `key` was stored at `generation`, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return True, entry[1]
+            self._misses += 1
+            return False, None
+
+    def store(self, key: Hashable, generation: int, value: Any) -> None:
+        """Remember `value` for `key` as of `generation`, evicting the least recently used beyond maxsize."""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._entries), self._evictions)
@@ -0,0 +1,424 @@
+"""
+Batch-Processing Command Line
+
+One entry point for the jobs that used to be ad-hoc scripts:
+
+    python -m SRC.ledger_cli import bank.csv more.jsonl --output ledger.json.gz
+    python -m SRC.ledger_cli summarize ledger.json.gz --output-format json
+    python -m SRC.ledger_cli export-reports ledger.json.gz --out-dir reports/ --workers 4
+    python -m SRC.ledger_cli detect-recurring bank.csv --output-format csv
+    python -m SRC.ledger_cli convert-format bank.csv bank.jsonl.gz
+
+(Run from the repository root; `python -m SRC ...` is the same command.)
+
+Inputs are CSV (columns type, description, amount, date), JSON Lines, or
+JSON: a list of rows, or a saved ledger (FinanceLedger.save_to_file() or
+finance_json), whose owner, budgets and category rules are kept. Any of
+them may be gzip/bz2/lzma compressed (.gz, .bz2, .xz). CSV and JSON Lines
+are streamed `--chunk-size` rows at a time; a JSON document is parsed
+whole. Rows go through FinanceLedger.add_transactions() (categorization
+spread over `--workers` processes, one per CPU by default, for large
+chunks) or, for
+convert-format, through validate_transaction_batch() only.
+
+Results go to stdout (or the output file); at the end of each run one
+line on stderr reports rows, elapsed time, rows/sec and peak memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence
+
+from .category_rules import RuleSet
+from .finance_ledger import FinanceLedger, validate_transaction_batch
+from .ledger_storage import CODEC_EXTENSIONS, open_text, write_json
+from .library_financial_functions import budget_status
+
+try:
+    import resource  # not on Windows
+except ImportError:  # pragma: no cover
+    resource = None
+
+INPUT_FORMATS = ("csv", "json", "jsonl")
+OUTPUT_FORMATS = ("text", "json", "csv")
+FORMAT_EXTENSIONS = {".csv": "csv", ".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+CSV_FIELDS = ("type", "description", "amount", "date")
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def file_format(path: str, fmt: Optional[str] = None) -> str:
+    """Row format of `path`: `fmt` if given, else from the extension (ignoring a .gz/.bz2/.xz suffix)."""
+    if fmt is not None:
+        if fmt not in INPUT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(INPUT_FORMATS)}, got {fmt!r}")
+        return fmt
+    stem, ext = os.path.splitext(path)
+    if ext.lower() in CODEC_EXTENSIONS:
+        ext = os.path.splitext(stem)[1]
+    if ext.lower() not in FORMAT_EXTENSIONS:
+        raise ValueError(f"cannot tell the format of {path!r}; pass --format")
+    return FORMAT_EXTENSIONS[ext.lower()]
+
+
+class RowSource:
+    """The rows of one input file, read lazily in chunks.
+
+    Args:
+        path (str): CSV, JSON Lines or JSON file, optionally compressed.
+        fmt (str): 'csv', 'json' or 'jsonl'; None to go by the extension.
+
+    After reading starts, `meta` holds the owner, budgets and rules of a
+    saved ledger (empty for plain row files).
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None) -> None:
+        self.path = path
+        self.format = file_format(path, fmt)
+        self.meta: Dict[str, Any] = {}
+
+    def chunks(self, size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        size = max(1, int(size))
+        rows = self._rows()
+        while True:
+            chunk = [row for _, row in zip(range(size), rows)]
+            if not chunk:
+                return
+            yield chunk
+
+    def _rows(self) -> Iterator[Dict]:
+        with open_text(self.path, "r") as f:
+            if self.format == "csv":
+                yield from csv.DictReader(f)
+            elif self.format == "jsonl":
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    self.meta = {
+                        "owner": data.get("owner"),
+                        # FinanceLedger files say category_budgets, finance_json files say budgets
+                        "budgets": data.get("category_budgets", data.get("budgets")) or {},
+                        "rules": data.get("category_rules"),
+                    }
+                    data = data.get("transactions", [])
+                yield from data
+
+
+@dataclass
+class RunStats:
+    """What one command processed, reported on stderr at the end of a run."""
+    rows: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    peak_memory_mb: Optional[float] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def format(self) -> str:
+        memory = "n/a" if self.peak_memory_mb is None else f"{self.peak_memory_mb:,.1f} MB"
+        skipped = f", {self.errors:,} rejected" if self.errors else ""
+        return (f"{self.rows:,} rows{skipped} in {self.seconds:.2f}s "
+                f"({self.rows_per_second:,.0f} rows/s), peak memory {memory}")
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where the platform does not report it)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def parse_budgets(items: Sequence[str]) -> Dict[str, float]:
+    """['food=400', 'rent=1800'] -> {'food': 400.0, 'rent': 1800.0}."""
+    budgets = {}
+    for item in items:
+        category, sep, amount = item.partition("=")
+        try:
+            if not sep or not category.strip():
+                raise ValueError
+            budgets[category.strip()] = float(amount)
+        except ValueError:
+            raise ValueError(f"budget must look like CATEGORY=AMOUNT, got {item!r}") from None
+    return budgets
+
+
+def _categorize_workers(args: argparse.Namespace) -> int:
+    # The library categorizes serially unless asked; a command-line run can afford processes
+    return args.workers if args.workers is not None else (os.cpu_count() or 1)
+
+
+def load_ledger(paths: Sequence[str], args: argparse.Namespace, stats: RunStats) -> FinanceLedger:
+    """Stream every input into one FinanceLedger, chunk by chunk.
+
+    The first saved ledger among the inputs supplies the owner, budgets and
+    rules; --owner, --budget and --rules override them.
+    """
+    ledger: Optional[FinanceLedger] = None
+    for path in paths:
+        source = RowSource(path, args.format)
+        offset = 0  # row number of the chunk's first row within this file
+        for chunk in source.chunks(args.chunk_size):
+            if ledger is None:
+                ledger = _new_ledger(source.meta, args)
+            errors = ledger.add_transactions(chunk, workers=_categorize_workers(args),
+                                             skip_duplicates=args.skip_duplicates, window_days=args.window_days)
+            _count_chunk(stats, path, offset, len(chunk), errors, args.show_errors)
+            offset += len(chunk)
+    return ledger if ledger is not None else _new_ledger({}, args)
+
+
+def _count_chunk(stats: RunStats, path: str, offset: int, size: int, errors: List[Any], show: int) -> None:
+    """Add a chunk to the run totals and print the problems of its first `show` rejected rows."""
+    rejected = sorted({e.index for e in errors})
+    stats.rows += size
+    stats.errors += len(rejected)
+    shown = set(rejected[:max(0, show)])
+    for error in errors:
+        if error.index in shown:
+            print(f"{path}: row {offset + error.index}: {error.field}: {error.message}", file=sys.stderr)
+
+
+def _new_ledger(meta: Dict[str, Any], args: argparse.Namespace) -> FinanceLedger:
+    budgets = dict(meta.get("budgets") or {})
+    budgets.update(parse_budgets(args.budget))
+    if args.rules:
+        rules = RuleSet.load(args.rules)
+    else:
+        rules = RuleSet.from_dict(meta["rules"]) if meta.get("rules") else None
+    return FinanceLedger(args.owner or meta.get("owner") or "ledger", budgets,
+                         warning_threshold=args.warning_threshold, rules=rules)
+
+
+@contextlib.contextmanager
+def _output(path: Optional[str]) -> Iterator[IO[str]]:
+    """The --output file (compressed by extension), or stdout."""
+    if path is None or path == "-":
+        yield sys.stdout
+    else:
+        with open_text(path, "w") as f:
+            yield f
+
+
+# ----------------------- Commands ----------------------------------------------
+def cmd_import(args: argparse.Namespace, stats: RunStats) -> None:
+    ledger = load_ledger(args.inputs, args, stats)
+    if args.partitioned:
+        ledger.save_partitioned(args.output)
+    else:
+        ledger.save(args.output)  # raises, unlike save_to_file(), so main() exits non-zero
+
+
+def month_overview(ledger: FinanceLedger, threshold: float) -> Dict[str, Dict[str, Any]]:
+    """Per month: income, expenses, net, spend per category and budget status, all from the ledger indexes."""
+    overview = {}
+    budgets = ledger.category_budgets
+    for key in ledger.loaded_months():
+        year, month = int(key[:4]), int(key[5:7])
+        income = ledger.query().in_month(year, month).income().sum()
+        expenses = ledger.query().in_month(year, month).expenses().sum()
+        spend = ledger.month_category_spend(year, month)
+        overview[key] = {
+            "income": income,
+            "expenses": expenses,
+            "net": round(income - expenses, 2),
+            "categories": dict(sorted(spend.items(), key=lambda kv: kv[1], reverse=True)),
+            "budget_status": {c: budget_status(spend.get(c, 0.0), b, threshold) for c, b in budgets.items()},
+        }
+    return overview
+
+
+def cmd_summarize(args: argparse.Namespace, stats: RunStats) -> None:
+    ledger = load_ledger(args.inputs, args, stats)
+    months = month_overview(ledger, args.warning_threshold)
+    if args.month:
+        months = {k: v for k, v in months.items() if k in args.month}
+    with _output(args.output) as out:
+        if args.output_format == "json":
+            write_json(out, {"owner": ledger.owner, "months": months,
+                             "top_categories": ledger.top_categories(args.top)}, indent=2)
+            out.write("\n")
+        elif args.output_format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["Month", "Category", "Spent", "Budget", "Status"])
+            for key, info in months.items():
+                for category, spent in info["categories"].items():
+                    budget = ledger.category_budgets.get(category)
+                    writer.writerow([key, category, spent, "" if budget is None else budget,
+                                     info["budget_status"].get(category, "")])
+        else:
+            out.write(f"Ledger: {ledger.owner}\n")
+            for key, info in months.items():
+                top = ", ".join(f"{c} {v:,.2f}" for c, v in list(info["categories"].items())[:args.top])
+                out.write(f"{key}  income {info['income']:>12,.2f}  expenses {info['expenses']:>12,.2f}"
+                          f"  net {info['net']:>12,.2f}  {top}\n")
+                over = [f"{c} {s}" for c, s in info["budget_status"].items() if s != "under"]
+                if over:
+                    out.write(f"         budgets: {', '.join(over)}\n")
+
+
+def cmd_export_reports(args: argparse.Namespace, stats: RunStats) -> None:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    ledger = load_ledger(args.inputs, args, stats)
+    months = [m for m in ledger.loaded_months() if not args.month or m in args.month]
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    async def export_all() -> List[str]:
+        # The month summaries run in the loop's executor, one thread per worker
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(1, args.workers or 1)))
+        return await asyncio.gather(*(
+            ledger.aexport_monthly_report(int(m[:4]), int(m[5:7]),
+                                          os.path.join(args.out_dir, f"{ledger.owner}_report_{m[:4]}_{m[5:7]}.csv"))
+            for m in months))
+
+    for path in asyncio.run(export_all()):
+        print(path)
+
+
+def cmd_detect_recurring(args: argparse.Namespace, stats: RunStats) -> None:
+    ledger = load_ledger(args.inputs, args, stats)
+    found = ledger.detect_recurring(args.min_occurrences, args.tolerance_days)
+    fields = ("merchant", "count", "average_amount", "cadence_days", "last_date", "next_expected_date")
+    with _output(args.output) as out:
+        if args.output_format == "json":
+            write_json(out, found, indent=2)
+            out.write("\n")
+        elif args.output_format == "csv":
+            writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(found)
+        else:
+            for item in found:
+                out.write(f"{item['merchant']:<32} every {item['cadence_days']:>3} days  x{item['count']:<5}"
+                          f" avg {item['average_amount']:>10,.2f}  next {item['next_expected_date']}\n")
+
+
+def cmd_convert_format(args: argparse.Namespace, stats: RunStats) -> None:
+    """Validate rows chunk by chunk and write them in another format; nothing is held beyond one chunk."""
+    to = file_format(args.output_path, args.to)
+    with open_text(args.output_path, "w") as out:
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS) if to == "csv" else None
+        if writer is not None:
+            writer.writeheader()
+        elif to == "json":
+            out.write("[")
+        first = True
+        for path in args.inputs:
+            offset = 0
+            for chunk in RowSource(path, args.format).chunks(args.chunk_size):
+                result = validate_transaction_batch(chunk, as_records=True)
+                _count_chunk(stats, path, offset, len(chunk), result.errors, args.show_errors)
+                offset += len(chunk)
+                if writer is not None:
+                    writer.writerows(result.valid)
+                elif to == "jsonl":
+                    out.write("".join(json.dumps(r) + "\n" for r in result.valid))
+                elif result.valid:
+                    out.write(("" if first else ",") + ",".join(json.dumps(r) for r in result.valid))
+                    first = False
+        if to == "json":
+            out.write("]\n")
+
+
+# ----------------------- Argument Parsing --------------------------------------
+COMMANDS = {
+    "import": cmd_import,
+    "summarize": cmd_summarize,
+    "export-reports": cmd_export_reports,
+    "detect-recurring": cmd_detect_recurring,
+    "convert-format": cmd_convert_format,
+}
+
+
+def build_parser(prog: str = "python -m SRC.ledger_cli") -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__.strip().splitlines()[0])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=INPUT_FORMATS, help="input format (default: from the extension)")
+    common.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows read and processed at a time (default: {DEFAULT_CHUNK_SIZE})")
+    common.add_argument("--workers", type=int, default=None,
+                        help="processes for categorizing large chunks (default: CPU count); "
+                             "threads for export-reports (default: 1)")
+    common.add_argument("--show-errors", type=int, default=5, metavar="N",
+                        help="print the problems of the first N rejected rows of each chunk (default: 5)")
+    ledger_opts = argparse.ArgumentParser(add_help=False)
+    ledger_opts.add_argument("--owner", help="ledger owner (default: from a saved ledger, else 'ledger')")
+    ledger_opts.add_argument("--budget", action="append", default=[], metavar="CATEGORY=AMOUNT",
+                             help="monthly budget; repeatable")
+    ledger_opts.add_argument("--rules", help="category rule set saved by RuleSet.save()")
+    ledger_opts.add_argument("--warning-threshold", type=float, default=0.9)
+    ledger_opts.add_argument("--skip-duplicates", action="store_true",
+                             help="drop rows matching one already stored (see FinanceLedger.find_duplicates)")
+    ledger_opts.add_argument("--window-days", type=int, default=0, help="date tolerance for --skip-duplicates")
+    report_opts = argparse.ArgumentParser(add_help=False)
+    report_opts.add_argument("--output-format", choices=OUTPUT_FORMATS, default="text")
+    report_opts.add_argument("--output", help="write here instead of stdout")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import", parents=[common, ledger_opts], help="load rows into a saved ledger")
+    p.add_argument("inputs", nargs="+")
+    p.add_argument("--output", required=True, help="ledger file (.json, .json.gz, ...) or directory with --partitioned")
+    p.add_argument("--partitioned", action="store_true", help="write a month-partitioned directory")
+
+    p = sub.add_parser("summarize", parents=[common, ledger_opts, report_opts],
+                       help="income, expenses and budgets per month")
+    p.add_argument("inputs", nargs="+")
+    p.add_argument("--month", action="append", metavar="YYYY-MM", help="only these months; repeatable")
+    p.add_argument("--top", type=int, default=3, help="categories listed per month (default: 3)")
+
+    p = sub.add_parser("export-reports", parents=[common, ledger_opts], help="one budget report CSV per month")
+    p.add_argument("inputs", nargs="+")
+    p.add_argument("--out-dir", required=True)
+    p.add_argument("--month", action="append", metavar="YYYY-MM", help="only these months; repeatable")
+
+    p = sub.add_parser("detect-recurring", parents=[common, ledger_opts, report_opts],
+                       help="recurring expenses and their cadence")
+    p.add_argument("inputs", nargs="+")
+    p.add_argument("--min-occurrences", type=int, default=3)
+    p.add_argument("--tolerance-days", type=int, default=4)
+
+    p = sub.add_parser("convert-format", parents=[common], help="validate rows and rewrite them as csv/json/jsonl")
+    p.add_argument("inputs", nargs="+", help="input files, then the output file")
+    p.add_argument("--to", choices=INPUT_FORMATS, help="output format (default: from the output extension)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, prog: str = "python -m SRC.ledger_cli") -> int:
+    args = build_parser(prog).parse_args(argv)
+    if args.command == "convert-format":
+        if len(args.inputs) < 2:
+            print(f"{prog} convert-format: need at least one input and an output file", file=sys.stderr)
+            return 2
+        *args.inputs, args.output_path = args.inputs
+    stats = RunStats()
+    started = time.perf_counter()
+    try:
+        COMMANDS[args.command](args, stats)
+    except BrokenPipeError:  # stdout closed early, e.g. piped into head
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        print(f"{prog} {args.command}: error: {e}", file=sys.stderr)
+        return 1
+    stats.seconds = time.perf_counter() - started
+    stats.peak_memory_mb = peak_memory_mb()
+    print(stats.format(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
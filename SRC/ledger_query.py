@@ -0,0 +1,420 @@
+"""
+Ledger Indexes and Query Builder
+
+LedgerIndexes keeps positional indexes over a FinanceLedger's stored
+records (by month, by category, by type, and amount-sorted per type),
+plus every amount as int64 cents, updated as records are appended. The
+amount order is only restored when an amount query needs it, so bulk
+loads append in O(1) per row, and recent rows are kept in a small sorted
+run of their own so a query after a few inserts does not re-sort the
+whole index.
+LedgerQuery is the lazy builder returned by FinanceLedger.query(): filters
+are collected first, then the most selective available index drives the
+scan and the remaining filters are applied row by row, so no intermediate
+lists are built.
+A query from a concurrent-mode ledger is pinned to the records committed
+when it was created and plans under the ledger's write lock, but filters
+and aggregates without it.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from heapq import merge
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .library_financial_functions import from_cents, normalize_description, parse_date, to_cents
+
+
+class LedgerIndexes:
+    """Append-only positional indexes over ledger records.
+
+    Positions are indexes into the ledger's record list, which only grows,
+    so every per-key position list stays sorted.
+    """
+
+    def __init__(self) -> None:
+        self.by_month: Dict[str, List[int]] = defaultdict(list)
+        self.by_category: Dict[str, List[int]] = defaultdict(list)
+        self.by_type: Dict[str, List[int]] = defaultdict(list)
+        self.categories: List[str] = []  # position -> category, computed once at insert
+        # type -> (sorted amounts, positions in the same order); equal amounts keep insertion order.
+        # New rows wait in _unsorted_amounts until amount_runs() sorts them into _recent_amounts,
+        # a second sorted run that is folded into _by_amount once it outgrows _fold_size().
+        self._by_amount: Dict[str, Tuple[List[float], List[int]]] = {}
+        self._recent_amounts: Dict[str, Tuple[List[float], List[int]]] = {}
+        self._unsorted_amounts: Dict[str, Tuple[List[float], List[int]]] = {}
+        # Exact amounts as int64 cents: by position, and per type aligned with by_type
+        self.cents = array('q')
+        self.cents_by_type: Dict[str, array] = {}
+
+    def add(self, position: int, record: Dict, category: str, cents: Optional[int] = None) -> None:
+        if cents is None:
+            cents = to_cents(record['amount'])
+        self.by_month[record['date'][:7]].append(position)
+        self.by_category[category.lower()].append(position)
+        self.by_type[record['type']].append(position)
+        self.cents_by_type.setdefault(record['type'], array('q')).append(cents)
+        self.cents.append(cents)
+        self.categories.append(category)
+        amounts, positions = self._unsorted_amounts.setdefault(record['type'], ([], []))
+        amounts.append(record['amount'])
+        positions.append(position)
+
+    def recategorize(self, moves: Dict[int, str]) -> None:
+        """Give each position in `moves` its new category, keeping the position lists sorted.
+
+        Every affected category list is filtered or merged once, so the cost
+        is O(affected list sizes + k log k) for k moved positions, not O(n) per
+        position. Lists are replaced rather than edited, so a reader that
+        already holds one keeps a consistent (older) view.
+        """
+        leaving: Dict[str, set] = defaultdict(set)
+        arriving: Dict[str, List[int]] = defaultdict(list)
+        for position, category in moves.items():
+            old, new = self.categories[position].lower(), category.lower()
+            self.categories[position] = category
+            if old != new:
+                leaving[old].add(position)
+                arriving[new].append(position)
+        for key, gone in leaving.items():
+            self.by_category[key] = [p for p in self.by_category[key] if p not in gone]
+        for key, added in arriving.items():
+            merged = self.by_category[key] + sorted(added)
+            merged.sort()  # two sorted runs, merged in one linear pass
+            self.by_category[key] = merged
+
+    # Rows appended since the last amount query that are inserted one by one into the recent run;
+    # a longer tail is sorted on its own and merged in with one stable sort
+    _INSORT_LIMIT = 32
+    # The recent run is folded into the main run once it holds more than
+    # max(_MIN_FOLD, main size // _FOLD_DIVISOR) rows
+    _MIN_FOLD = 1024
+    _FOLD_DIVISOR = 16
+
+    def _fold_size(self, ttype: str) -> int:
+        return max(self._MIN_FOLD, len(self._by_amount.get(ttype, ((), ()))[0]) // self._FOLD_DIVISOR)
+
+    @staticmethod
+    def _merge_runs(first: Tuple[List[float], List[int]],
+                    second: Tuple[List[float], List[int]]) -> Tuple[List[float], List[int]]:
+        pairs = list(zip(*first))
+        pairs.extend(zip(*second))
+        pairs.sort(key=itemgetter(0))  # stable: earlier positions stay first among equal amounts
+        return [a for a, _ in pairs], [p for _, p in pairs]
+
+    def amount_runs(self, ttype: str) -> List[Tuple[List[float], List[int]]]:
+        """Return the sorted (amounts, positions) runs of one type: the main run, then recent rows.
+
+        Every position in the recent run is later than every position in the
+        main run. Rows appended since the last call go into the recent run,
+        which stays small relative to the main one, so a query after k inserts
+        costs O(k * recent size) at most instead of a re-sort of all n rows.
+        The recent run is folded into the main run once it grows past a
+        fraction of n, so the O(n) merge is amortized over that many inserts.
+        Runs are replaced rather than edited, so a reader that already holds
+        one keeps a consistent (older) view.
+        """
+        tail = self._unsorted_amounts.pop(ttype, None)
+        if tail is not None:
+            recent = self._recent_amounts.get(ttype, ([], []))
+            if len(tail[0]) <= self._INSORT_LIMIT:
+                amounts, positions = recent[0][:], recent[1][:]
+                for amount, position in zip(*tail):
+                    i = bisect_right(amounts, amount)  # after equal amounts: positions only grow
+                    amounts.insert(i, amount)
+                    positions.insert(i, position)
+                recent = (amounts, positions)
+            else:
+                recent = self._merge_runs(recent, tail)
+            if len(recent[0]) > self._fold_size(ttype):
+                self._by_amount[ttype] = self._merge_runs(self._by_amount.get(ttype, ([], [])), recent)
+                self._recent_amounts.pop(ttype, None)
+            else:
+                self._recent_amounts[ttype] = recent
+        runs = []
+        if ttype in self._by_amount:
+            runs.append(self._by_amount[ttype])
+        if ttype in self._recent_amounts:
+            runs.append(self._recent_amounts[ttype])
+        return runs
+
+    def amount_bounds(self, ttype: str, low: Optional[float], high: Optional[float],
+                      low_inclusive: bool = True) -> List[Tuple[List[float], List[int], int, int]]:
+        """Return (amounts, positions, lo, hi) for each run of ttype, where [lo, hi) lies within the bounds.
+
+        Each run is bisected on its own, O(log n) in total.
+        """
+        slices = []
+        for amounts, positions in self.amount_runs(ttype):
+            if low is None:
+                lo = 0
+            else:
+                lo = bisect_left(amounts, low) if low_inclusive else bisect_right(amounts, low)
+            hi = len(amounts) if high is None else bisect_right(amounts, high)
+            slices.append((amounts, positions, lo, max(lo, hi)))
+        return slices
+
+
+class LedgerQuery:
+    """Composable, lazily evaluated query over a FinanceLedger.
+
+    Builder methods narrow the query and return it, so calls chain. Nothing
+    is scanned until a terminal (iteration, all(), count(), sum(),
+    group_by()) runs.
+
+    Example: ``ledger.query().between('2025-01-01', '2025-03-31').expenses()
+    .amount_over(50).text('uber').sum()``
+    """
+
+    def __init__(self, records: List[Dict], indexes: LedgerIndexes,
+                 limit: Optional[int] = None, lock=None) -> None:
+        self._records = records
+        self._indexes = indexes
+        self._limit = limit  # only positions below this are visible (None: all, live)
+        self._lock = lock  # held while index structures are read (concurrent ledgers)
+        self._start: Optional[str] = None
+        self._end: Optional[str] = None
+        self._category: Optional[str] = None
+        self._type: Optional[str] = None
+        self._min_amount: Optional[float] = None
+        self._max_amount: Optional[float] = None
+        self._min_inclusive = True
+        self._text: Optional[str] = None
+
+    # ----------------------- Builders ----------------------------------------------
+    def between(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> LedgerQuery:
+        """Keep transactions in the inclusive date range (either bound optional)."""
+        self._start = parse_date(start_date) if start_date else None
+        self._end = parse_date(end_date) if end_date else None
+        return self
+
+    def in_month(self, year: int, month: int) -> LedgerQuery:
+        """Keep transactions from one calendar month."""
+        if not (1 <= int(month) <= 12):
+            raise ValueError("month must be in 1..12")
+        prefix = f"{int(year):04d}-{int(month):02d}"
+        self._start, self._end = f"{prefix}-01", f"{prefix}-31"  # ISO strings compare lexically
+        return self
+
+    def category(self, name: str) -> LedgerQuery:
+        """Keep transactions whose categorize_transaction() result is `name` (case-insensitive)."""
+        if not isinstance(name, str):
+            raise TypeError("category must be a string")
+        self._category = name.strip().lower()
+        return self
+
+    def of_type(self, ttype: str) -> LedgerQuery:
+        """Keep transactions of one type, 'expense' or 'income'."""
+        normalized = ttype.strip().lower() if isinstance(ttype, str) else ttype
+        if normalized not in ("expense", "income"):
+            raise ValueError("ttype must be either 'expense' or 'income'")
+        self._type = normalized
+        return self
+
+    def expenses(self) -> LedgerQuery:
+        """Keep expense transactions only."""
+        return self.of_type("expense")
+
+    def income(self) -> LedgerQuery:
+        """Keep income transactions only."""
+        return self.of_type("income")
+
+    def amount_over(self, amount: float) -> LedgerQuery:
+        """Keep transactions strictly larger than amount."""
+        self._min_amount, self._min_inclusive = float(amount), False
+        return self
+
+    def amount_between(self, low: Optional[float] = None, high: Optional[float] = None) -> LedgerQuery:
+        """Keep transactions with low <= amount <= high (either bound optional)."""
+        self._min_amount = float(low) if low is not None else None
+        self._min_inclusive = True
+        self._max_amount = float(high) if high is not None else None
+        return self
+
+    def amount_under(self, amount: float) -> LedgerQuery:
+        """Keep transactions with amount <= `amount`."""
+        self._max_amount = float(amount)
+        return self
+
+    def text(self, query: str) -> LedgerQuery:
+        """Keep transactions whose description contains query (case-insensitive), like search()."""
+        if not isinstance(query, str):
+            raise TypeError("query must be a string")
+        self._text = query.lower()
+        return self
+
+    # ----------------------- Planning ----------------------------------------------
+    def _month_keys(self) -> List[str]:
+        low = self._start[:7] if self._start else None
+        high = self._end[:7] if self._end else None
+        return sorted(m for m in self._indexes.by_month
+                      if (low is None or m >= low) and (high is None or m <= high))
+
+    def _plan(self) -> Tuple[str, Optional[Callable[[], Iterable[int]]], int]:
+        """Pick the index with the fewest candidate positions.
+
+        Returns (description, candidate-position factory or None for a full scan, estimate).
+        """
+        options: List[Tuple[int, str, Callable[[], Iterable[int]]]] = []
+        idx = self._indexes
+        if self._start or self._end:
+            months = self._month_keys()
+            lists = [idx.by_month[m] for m in months]
+            options.append((sum(map(len, lists)), f"month index ({len(months)} months)",
+                            lambda lists=lists: merge(*lists)))
+        if self._category is not None:
+            positions = idx.by_category.get(self._category, [])
+            options.append((len(positions), f"category index ({self._category})", lambda p=positions: p))
+        if self._type is not None:
+            positions = idx.by_type.get(self._type, [])
+            options.append((len(positions), f"type index ({self._type})", lambda p=positions: p))
+        if self._min_amount is not None or self._max_amount is not None:
+            slices = self._amount_slices()
+            # Slices come out in amount order; sort positions back into insertion order
+            options.append((sum(hi - lo for _, _, lo, hi in slices), "amount index",
+                            lambda slices=slices: sorted(chain.from_iterable(
+                                positions[lo:hi] for _, positions, lo, hi in slices))))
+        if not options:
+            return "full scan", None, len(self._records)
+        estimate, label, factory = min(options, key=lambda o: o[0])
+        return label, factory, estimate
+
+    def _amount_slices(self) -> List[Tuple[List[float], List[int], int, int]]:
+        types = [self._type] if self._type is not None else list(self._indexes.by_type)
+        return [bounds for ttype in types if ttype in self._indexes.by_type
+                for bounds in self._indexes.amount_bounds(ttype, self._min_amount, self._max_amount,
+                                                          self._min_inclusive)]
+
+    def _guard(self):
+        return self._lock if self._lock is not None else contextlib.nullcontext()
+
+    def explain(self) -> str:
+        """Describe the chosen access path and its candidate-row estimate."""
+        with self._guard():
+            label, _, estimate = self._plan()
+        return f"{label}: ~{estimate} candidate rows"
+
+    def _matches(self) -> Iterator[Tuple[int, Dict]]:
+        if self._lock is None:
+            _, factory, _ = self._plan()
+            return self._filter(factory() if factory else range(len(self._records)))
+        with self._lock:  # copy the candidate positions; filtering runs unlocked
+            _, factory, _ = self._plan()
+            positions = list(factory()) if factory else range(self._limit)
+        return self._filter(positions)
+
+    def _filter(self, positions: Iterable[int]) -> Iterator[Tuple[int, Dict]]:
+        """Apply every filter to the candidate positions, yielding (position, record)."""
+        records = self._records
+        start, end = self._start, self._end
+        category, ttype, text = self._category, self._type, self._text
+        low, high, low_inclusive = self._min_amount, self._max_amount, self._min_inclusive
+        categories = self._indexes.categories
+        limit = self._limit
+        for pos in positions:
+            if limit is not None and pos >= limit:
+                continue
+            t = records[pos]
+            if ttype is not None and t['type'] != ttype:
+                continue
+            if start is not None and t['date'] < start:
+                continue
+            if end is not None and t['date'] > end:
+                continue
+            if low is not None and (t['amount'] < low if low_inclusive else t['amount'] <= low):
+                continue
+            if high is not None and t['amount'] > high:
+                continue
+            if category is not None and categories[pos].lower() != category:
+                continue
+            if text is not None and text not in normalize_description(t['description']).lowered:
+                continue
+            yield pos, t
+
+    # ----------------------- Terminals ---------------------------------------------
+    def __iter__(self) -> Iterator[Dict]:
+        return (t for _, t in self._matches())
+
+    def all(self) -> List[Dict]:
+        """Materialize the matching records (in insertion order)."""
+        return list(self)
+
+    def count(self) -> int:
+        """Number of matching records."""
+        return sum(1 for _ in self._matches())
+
+    def sum_cents(self) -> int:
+        """Exact sum of matching amounts in integer cents.
+
+        A query filtered on type alone (or not at all) is summed straight
+        from the per-type cents arrays, without visiting any record.
+        """
+        idx = self._indexes
+        if (self._start is None and self._end is None and self._category is None and self._text is None
+                and self._min_amount is None and self._max_amount is None):
+            total = 0
+            for ttype in ([self._type] if self._type is not None else list(idx.cents_by_type)):
+                amounts = idx.cents_by_type.get(ttype)
+                if amounts is None:
+                    continue
+                if self._limit is None:
+                    total += sum(amounts)
+                else:
+                    total += sum(amounts[:bisect_left(idx.by_type[ttype], self._limit)])
+            return total
+        cents = idx.cents
+        return sum(cents[pos] for pos, _ in self._matches())
+
+    def sum(self) -> float:
+        """Sum of matching amounts (exact; summed in cents, so already at 2 decimals)."""
+        return from_cents(self.sum_cents())
+
+    def top(self, n: int = 10, largest: bool = True) -> List[Dict]:
+        """Return the n largest (or smallest) matching records, biggest first (or smallest first).
+
+        Walks the amount index from the requested end and stops after n
+        matches, so the cost is O(log n + rows examined) rather than a full
+        sort. Ties keep insertion order for smallest and reverse it for largest.
+        """
+        n = max(0, int(n))
+        if n == 0:
+            return []
+        with self._guard():  # bounded work, so it runs entirely under a concurrent ledger's lock
+            return self._top(n, largest)
+
+    def _top(self, n: int, largest: bool) -> List[Dict]:
+        streams = []
+        for amounts, positions, lo, hi in self._amount_slices():
+            order = range(hi - 1, lo - 1, -1) if largest else range(lo, hi)
+            streams.append(zip(map(amounts.__getitem__, order), map(positions.__getitem__, order)))
+        # (amount, position) pairs: ties across runs and types still follow insertion order
+        ordered = merge(*streams, reverse=largest)
+        out: List[Dict] = []
+        for _, t in self._filter(pos for _, pos in ordered):
+            out.append(t)
+            if len(out) == n:
+                break
+        return out
+
+    def group_by(self, key: str = "category") -> Dict[str, float]:
+        """Sum matching amounts by 'month', 'category' or 'type' (exact, via cents)."""
+        if key not in ("month", "category", "type"):
+            raise ValueError("key must be 'month', 'category' or 'type'")
+        totals: Dict[str, int] = defaultdict(int)  # cents
+        categories = self._indexes.categories
+        cents = self._indexes.cents
+        for pos, t in self._matches():
+            if key == "month":
+                group = t['date'][:7]
+            elif key == "category":
+                group = categories[pos]
+            else:
+                group = t['type']
+            totals[group] += cents[pos]
+        return {k: from_cents(v) for k, v in totals.items()}
@@ -0,0 +1,195 @@
+"""
+Ledger Reconciliation
+
+Matches the transactions of two ledgers (e.g. a FinanceLedger against a
+bank export) with a sort-merge join instead of comparing every pair. Both
+sides are ordered by (date, amount) once and walked together, so n rows
+cost O(n log n) for the sorts plus O(n log w) for the merge, where w is
+the number of rows inside the date tolerance window.
+
+reconcile() works on in-memory ledgers or record lists. reconcile_sorted()
+takes date-ordered iterables and yields results as it goes, holding only
+the rows inside the tolerance window, so inputs larger than memory (a
+partitioned ledger read with PartitionedStore.iter_records(), a
+date-ordered bank CSV) can be reconciled as streams.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date as _date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .library_financial_functions import to_cents
+
+MATCHED = "matched"
+ONLY_IN_A = "only_in_a"
+ONLY_IN_B = "only_in_b"
+
+
+@dataclass
+class ReconcileResult:
+    """Outcome of reconcile().
+
+    Attributes:
+        matched: (record from A, record from B) pairs
+        only_in_a: records of A with no counterpart in B
+        only_in_b: records of B with no counterpart in A
+    """
+    matched: List[Tuple[Dict, Dict]] = field(default_factory=list)
+    only_in_a: List[Dict] = field(default_factory=list)
+    only_in_b: List[Dict] = field(default_factory=list)
+
+    @property
+    def balanced(self) -> bool:
+        """True when every record on both sides found a counterpart."""
+        return not self.only_in_a and not self.only_in_b
+
+
+def _records(source: Any) -> List[Dict]:
+    """Records of a FinanceLedger, a LedgerSnapshot, or any iterable of record dicts."""
+    if hasattr(source, "transactions"):
+        return source.transactions
+    if hasattr(source, "records"):
+        return list(source.records)
+    return list(source)
+
+
+def reconcile(ledger_a: Any, ledger_b: Any, date_tolerance: int = 0,
+              amount_tolerance: float = 0.0) -> ReconcileResult:
+    """Pair up the transactions of two ledgers.
+
+    Two records match when they have the same type, dates at most
+    `date_tolerance` days apart and amounts at most `amount_tolerance`
+    apart. Each record is used at most once. Records of A are taken in
+    (date, amount) order and each takes the closest unused B record:
+    smallest amount difference first, then smallest date difference.
+
+    Args:
+        ledger_a: FinanceLedger, LedgerSnapshot, or iterable of records.
+        ledger_b: Same, e.g. a bank export loaded as records.
+        date_tolerance (int): Allowed date difference in days.
+        amount_tolerance (float): Allowed amount difference.
+
+    Returns:
+        ReconcileResult: matched pairs plus the unmatched records of each side.
+
+    Examples:
+        >>> a = [{'type': 'expense', 'amount': 4.5, 'description': 'Coffee', 'date': '2025-01-10'},
+        ...      {'type': 'expense', 'amount': 60.0, 'description': 'Gas', 'date': '2025-01-12'}]
+        >>> b = [{'type': 'expense', 'amount': 4.5, 'description': 'SQ *COFFEE', 'date': '2025-01-11'}]
+        >>> result = reconcile(a, b, date_tolerance=1)
+        >>> len(result.matched), [t['description'] for t in result.only_in_a], result.only_in_b
+        (1, ['Gas'], [])
+    """
+    def order(t: Dict) -> Tuple[str, int]:
+        return (t['date'], to_cents(t['amount']))
+
+    result = ReconcileResult()
+    side_a = sorted(_records(ledger_a), key=order)
+    side_b = sorted(_records(ledger_b), key=order)
+    for kind, a, b in reconcile_sorted(side_a, side_b, date_tolerance, amount_tolerance):
+        if kind == MATCHED:
+            result.matched.append((a, b))
+        elif kind == ONLY_IN_A:
+            result.only_in_a.append(a)
+        else:
+            result.only_in_b.append(b)
+    return result
+
+
+def reconcile_sorted(side_a: Iterable[Dict], side_b: Iterable[Dict], date_tolerance: int = 0,
+                     amount_tolerance: float = 0.0) -> Iterator[Tuple[str, Optional[Dict], Optional[Dict]]]:
+    """Streaming merge-join of two date-ordered record streams.
+
+    Same matching rules as reconcile(), but both inputs must already be in
+    ascending date order (raises ValueError when one is not). Only the B
+    records within `date_tolerance` days of the current A record are held
+    in memory.
+
+    Yields:
+        (MATCHED, a, b), (ONLY_IN_A, a, None) or (ONLY_IN_B, None, b), in
+        roughly date order.
+    """
+    if not isinstance(date_tolerance, int) or isinstance(date_tolerance, bool) or date_tolerance < 0:
+        raise ValueError("date_tolerance must be a non-negative integer")
+    if amount_tolerance < 0:
+        raise ValueError("amount_tolerance must be non-negative")
+    tolerance = to_cents(amount_tolerance)
+    ordinals: Dict[str, int] = {}
+
+    def day_of(record: Dict) -> int:
+        value = record['date']
+        day = ordinals.get(value)
+        if day is None:
+            day = ordinals[value] = _date.fromisoformat(value).toordinal()
+        return day
+
+    # B records waiting for a match, per type, sorted by (cents, day, seq); seq keeps dicts out of comparisons
+    window: Dict[str, List[Tuple[int, int, int, Dict]]] = {}
+    arrivals: deque = deque()  # the same entries in date order, for eviction
+    pending: set = set()       # seq of every B record still unmatched in the window
+    b_iter = iter(side_b)
+    b_next = next(b_iter, None)
+    last_a = last_b = -math.inf
+    seq = 0
+
+    for a in side_a:
+        a_day = day_of(a)
+        if a_day < last_a:
+            raise ValueError("reconcile_sorted() needs side A in date order")
+        last_a = a_day
+        # Admit every B record that is early enough to match this or a later A record
+        while b_next is not None:
+            b_day = day_of(b_next)
+            if b_day > a_day + date_tolerance:
+                break
+            if b_day < last_b:
+                raise ValueError("reconcile_sorted() needs side B in date order")
+            last_b = b_day
+            entry = (to_cents(b_next['amount']), b_day, seq, b_next)
+            bisect.insort(window.setdefault(b_next['type'], []), entry)
+            arrivals.append(entry)
+            pending.add(seq)
+            seq += 1
+            b_next = next(b_iter, None)
+        # B records too old for this A are too old for every later one as well
+        while arrivals and arrivals[0][1] < a_day - date_tolerance:
+            entry = arrivals.popleft()
+            if entry[2] in pending:
+                pending.discard(entry[2])
+                bucket = window[entry[3]['type']]
+                del bucket[bisect.bisect_left(bucket, entry)]
+                yield ONLY_IN_B, None, entry[3]
+
+        cents = to_cents(a['amount'])
+        bucket = window.get(a['type'])
+        best = None
+        if bucket:
+            lo = bisect.bisect_left(bucket, (cents - tolerance,))
+            hi = bisect.bisect_right(bucket, (cents + tolerance, math.inf))
+            for i in range(lo, hi):
+                b_cents, b_day, b_seq, _ = bucket[i]  # every entry left is within the date window
+                rank = (abs(b_cents - cents), abs(b_day - a_day), b_seq)
+                if best is None or rank < best[0]:
+                    best = (rank, i)
+        if best is None:
+            yield ONLY_IN_A, a, None
+            continue
+        entry = bucket.pop(best[1])
+        pending.discard(entry[2])
+        yield MATCHED, a, entry[3]
+
+    for entry in arrivals:
+        if entry[2] in pending:
+            yield ONLY_IN_B, None, entry[3]
+    while b_next is not None:
+        b_day = day_of(b_next)
+        if b_day < last_b:
+            raise ValueError("reconcile_sorted() needs side B in date order")
+        last_b = b_day
+        yield ONLY_IN_B, None, b_next
+        b_next = next(b_iter, None)
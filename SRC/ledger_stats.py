@@ -0,0 +1,230 @@
+"""
+Online Ledger Statistics
+
+Streaming summaries that FinanceLedger updates in O(1) amortized time per
+inserted transaction, so per-category, per-merchant and per-month
+statistics never need a pass over the whole history.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class RunningStats:
+    """Count, mean and variance maintained with Welford's algorithm.
+
+    Numerically stable for long streams, and mergeable (Chan et al.) so
+    summaries from separate ledgers or workers can be combined.
+
+    Examples:
+        >>> s = RunningStats()
+        >>> for x in [4.0, 7.0, 13.0, 16.0]:
+        ...     s.update(x)
+        >>> s.count, s.mean, s.variance
+        (4, 10.0, 30.0)
+    """
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+
+    def update(self, x: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    def merge(self, other: RunningStats) -> RunningStats:
+        """Fold another summary into this one and return self."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self._m2 = other.count, other.mean, other._m2
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1 denominator, like statistics.variance); 0.0 below two values."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        """Sample standard deviation."""
+        return math.sqrt(self.variance)
+
+    def z_score(self, x: float) -> float:
+        """How many standard deviations x lies from the mean (0.0 when undefined)."""
+        sd = self.stddev
+        return (x - self.mean) / sd if sd > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"count": self.count, "mean": self.mean, "variance": self.variance, "stddev": self.stddev}
+
+
+# Shared coin for compaction; seeded so sketches are reproducible run to run
+_COIN = random.Random(0x5EED)
+
+
+class QuantileSketch:
+    """Mergeable approximate quantiles in bounded memory (KLL sketch).
+
+    Values are buffered in a stack of compactors. When a level fills up it
+    is sorted and every other value (random offset) is promoted one level up
+    with twice the weight, so the sketch keeps O(k) values however many it
+    has seen. Rank error is roughly 1.7 / k (about 1% for k=200); until the
+    first compaction (fewer than ~k values) quantiles are exact.
+
+    Args:
+        k (int): Accuracy/memory trade-off; larger is more precise.
+
+    Examples:
+        >>> s = QuantileSketch()
+        >>> for x in range(1, 101):
+        ...     s.update(float(x))
+        >>> s.quantile(0.5), s.quantile(0.9), s.count
+        (50.0, 90.0, 100)
+    """
+
+    __slots__ = ("k", "count", "_compactors", "_size", "_max_size", "_min", "_max")
+
+    _SHRINK = 2.0 / 3.0
+
+    def __init__(self, k: int = 200) -> None:
+        if not isinstance(k, int) or k < 8:
+            raise ValueError("k must be an integer >= 8")
+        self.k = k
+        self.count = 0
+        self._compactors: List[List[float]] = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+        self._min = math.inf
+        self._max = -math.inf
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._compactors) - level - 1
+        return 2 + int(math.ceil(self.k * self._SHRINK ** depth))
+
+    def _grow(self) -> None:
+        self._compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self._compactors)))
+
+    def update(self, x: float) -> None:
+        """Add one value."""
+        self._compactors[0].append(x)
+        self._size += 1
+        self.count += 1
+        if x < self._min:
+            self._min = x
+        if x > self._max:
+            self._max = x
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        while self._size >= self._max_size:
+            for level in range(len(self._compactors)):
+                if len(self._compactors[level]) >= self._capacity(level):
+                    if level + 1 >= len(self._compactors):
+                        self._grow()
+                    items = self._compactors[level]
+                    items.sort()
+                    # An odd leftover stays behind at this level
+                    keep = [items.pop()] if len(items) % 2 else []
+                    promoted = items[_COIN.random() < 0.5::2]
+                    self._compactors[level] = keep
+                    self._compactors[level + 1].extend(promoted)
+                    self._size = sum(len(c) for c in self._compactors)
+                    break
+            else:
+                break
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        """Fold another sketch (e.g. from another ledger) into this one and return self."""
+        while len(self._compactors) < len(other._compactors):
+            self._grow()
+        for level, items in enumerate(other._compactors):
+            self._compactors[level].extend(items)
+        self.count += other.count
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        self._size = sum(len(c) for c in self._compactors)
+        self._compress()
+        return self
+
+    def copy(self) -> QuantileSketch:
+        """Independent copy, safe to merge into without touching the original."""
+        return QuantileSketch.from_dict(self.to_dict())
+
+    def _weighted(self) -> List[Tuple[float, int]]:
+        pairs = [(x, 1 << level) for level, items in enumerate(self._compactors) for x in items]
+        pairs.sort()
+        return pairs
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Approximate values at each fraction in qs (0.0 .. 1.0); None when empty."""
+        if self.count == 0:
+            return [None for _ in qs]
+        pairs = self._weighted()
+        total = sum(w for _, w in pairs)
+        out: List[Optional[float]] = []
+        for q in qs:
+            if not 0.0 <= q <= 1.0:
+                raise ValueError("quantile fractions must be between 0 and 1")
+            if q == 0.0:
+                out.append(self._min)
+                continue
+            if q == 1.0:
+                out.append(self._max)
+                continue
+            target = q * total
+            running = 0
+            value = pairs[-1][0]
+            for x, w in pairs:
+                running += w
+                if running >= target:
+                    value = x
+                    break
+            out.append(value)
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate value at fraction q (0.5 is the median)."""
+        return self.quantiles([q])[0]
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly form for shipping sketches between processes or services."""
+        return {"k": self.k, "count": self.count, "min": self._min if self.count else None,
+                "max": self._max if self.count else None,
+                "compactors": [list(c) for c in self._compactors]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> QuantileSketch:
+        sketch = cls(int(data["k"]))
+        sketch._compactors = [list(map(float, c)) for c in data["compactors"]] or [[]]
+        sketch.count = int(data["count"])
+        sketch._min = math.inf if data.get("min") is None else float(data["min"])
+        sketch._max = -math.inf if data.get("max") is None else float(data["max"])
+        sketch._size = sum(len(c) for c in sketch._compactors)
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch._compactors)))
+        return sketch
+
+
+def merge_sketches(sketches: Iterable[QuantileSketch], k: int = 200) -> QuantileSketch:
+    """Combine sketches (e.g. one per user ledger) into a new population-level sketch."""
+    merged = QuantileSketch(k)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
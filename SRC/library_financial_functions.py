@@ -23,9 +23,83 @@ def format_currency(amount):
     
     return "${:,.2f}".format(amount)
 
+# Cents are kept in int64 arrays; this is the largest float below 2**63, so
+# any finite amount whose cents do not exceed it fits
+MAX_CENTS = float(2**63 - 1024)
+
+def to_cents(amount):
+    """Convert a dollar amount to integer cents, rounding to the nearest cent.
+
+    Sums of cents are exact, so aggregates no longer drift the way float
+    sums do over many rows; convert back with from_cents() at the edge.
+
+    Raises:
+        ValueError: If the amount is NaN, infinite, or more than MAX_CENTS
+            cents away from zero.
+
+    Examples:
+        >>> to_cents(19.99), to_cents("0.1")
+        (1999, 10)
+        >>> sum(map(to_cents, [0.1] * 10)) == to_cents(1.0)
+        True
+    """
+    cents = float(amount) * 100
+    if not -MAX_CENTS <= cents <= MAX_CENTS:  # also rejects NaN
+        raise ValueError(f"amount out of range: {amount!r}")
+    return round(cents)  # round() of a float with no digits returns an int
+
+def from_cents(cents):
+    """Convert integer cents back to a dollar float (e.g. 1999 -> 19.99)."""
+    return cents / 100
+
 #-------------------------
 
 import re
+import string
+from functools import lru_cache
+from typing import NamedTuple
+
+# Deletes ASCII characters that are neither letters nor whitespace
+_NON_LETTER_TABLE = str.maketrans("", "", "".join(
+    c for c in map(chr, range(128)) if c not in string.ascii_letters and not c.isspace()
+))
+_NON_LETTER_RE = re.compile(r'[^a-zA-Z\s]')
+
+class NormalizedText(NamedTuple):
+    """Normalized forms of one description, computed once and cached."""
+    lowered: str       # description.lower(), used for substring search and categorization
+    merchant_key: str  # letters-only, single-spaced, lowercase; groups the same merchant
+
+@lru_cache(maxsize=1 << 16)
+def normalize_description(description):
+    """Return the cached NormalizedText for a description.
+    
+    Search, categorization, keyword extraction and recurring-expense
+    detection all read from this, so each distinct description is
+    normalized once no matter how many records or calls share it.
+    
+    Args:
+        description (str): The transaction description.
+        
+    Returns:
+        NormalizedText: (lowered, merchant_key).
+        
+    Raises:
+        TypeError: If description is not a string.
+        
+    Examples:
+        >>> normalize_description("Netflix.com  #1234")
+        NormalizedText(lowered='netflix.com  #1234', merchant_key='netflixcom')
+    """
+    if not isinstance(description, str):
+        raise TypeError("Input must be a string")
+    if description.isascii():
+        letters = description.translate(_NON_LETTER_TABLE)
+    else:
+        letters = _NON_LETTER_RE.sub('', description)
+    # Collapse whitespace runs into one space and strip edges
+    merchant_key = " ".join(letters.split()).lower()
+    return NormalizedText(description.lower(), merchant_key)
 
 def clean_text_content(text):
     """Clean up text by removing numbers, punctuation, and extra spaces.
@@ -51,12 +125,8 @@ def clean_text_content(text):
     if not isinstance(text, str):
         raise TypeError("Input must be a string")
     
-    # Remove everything except letters and spaces
-    cleaned = re.sub(r'[^a-zA-Z\s]', '', text)
-    # Collapse multiple spaces into one and strip edges
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-    
-    return cleaned.lower()
+    # Remove everything except letters and spaces, collapse spaces, lowercase
+    return normalize_description(text).merchant_key
 
 # =============================================================================
 # Purpose: Perform financial calculations, data parsing, and categorization.
@@ -132,22 +202,40 @@ def calculate_total_spending(transactions):
     if not isinstance(transactions, list):
         raise TypeError("transactions must be provided as a list of dictionaries")
     
-    total = 0.0
+    total = 0  # integer cents, so the sum is exact
     for t in transactions:
         if not isinstance(t, dict):
             raise TypeError("Each transaction must be a dictionary")
         if "amount" not in t or "type" not in t:
             raise TypeError("Each transaction must include 'amount' and 'type' keys")
         if t["type"] == "expense" and isinstance(t["amount"], (int, float)):
-            total += float(t["amount"])
+            total += round(t["amount"] * 100)  # to_cents(), inlined for this hot loop
     
-    if total == 0.0:
+    if total == 0:
         raise ValueError("No valid expense transactions found.")
     
-    return round(total, 2)
+    return from_cents(total)
 
 #-----------------------------
 
+_CATEGORY_KEYWORDS = {
+    "Food": [
+        "restaurant", "coffee", "cafe", "burger", "pizza", "bar",
+        "starbucks", "mcdonalds", "kfc", "burger king", "safeway",
+        "trader joes", "giant", "lidl", "marathon deli"
+    ],
+    "Transportation": ["uber", "lyft", "taxi", "bus", "train", "flight", "airline", "gas", "fuel"],
+    "Utilities": ["electric", "water", "gas bill", "internet", "wifi", "phone", "utility"],
+    "Entertainment": [
+        "movie", "netflix", "spotify", "game", "cinema", "concert", "music",
+        "steam", "fortnite"
+    ],
+    "Shopping": ["walmart", "target", "amazon", "mall", "store", "purchase"],
+    "Income": ["deposit", "salary", "payroll", "transfer from employer", "income"],
+    "Health": ["pharmacy", "doctor", "hospital", "clinic", "medication", "dentist"],
+    "Travel": ["hotel", "airbnb", "booking", "expedia", "trip", "travel"]
+}
+
 def categorize_transaction(description):
     """Categorize a financial transaction based on its description.
     
@@ -177,27 +265,9 @@ def categorize_transaction(description):
     if not isinstance(description, str):
         raise TypeError("description must be a string")
     
-    desc = description.lower()
-    
-    categories = {
-        "Food": [
-            "restaurant", "coffee", "cafe", "burger", "pizza", "bar",
-            "starbucks", "mcdonalds", "kfc", "burger king", "safeway",
-            "trader joes", "giant", "lidl", "marathon deli"
-        ],
-        "Transportation": ["uber", "lyft", "taxi", "bus", "train", "flight", "airline", "gas", "fuel"],
-        "Utilities": ["electric", "water", "gas bill", "internet", "wifi", "phone", "utility"],
-        "Entertainment": [
-            "movie", "netflix", "spotify", "game", "cinema", "concert", "music",
-            "steam", "fortnite"
-        ],
-        "Shopping": ["walmart", "target", "amazon", "mall", "store", "purchase"],
-        "Income": ["deposit", "salary", "payroll", "transfer from employer", "income"],
-        "Health": ["pharmacy", "doctor", "hospital", "clinic", "medication", "dentist"],
-        "Travel": ["hotel", "airbnb", "booking", "expedia", "trip", "travel"]
-    }
+    desc = normalize_description(description).lowered
     
-    for category, keywords in categories.items():
+    for category, keywords in _CATEGORY_KEYWORDS.items():
         if any(word in desc for word in keywords):
             return category
     
@@ -205,6 +275,108 @@ def categorize_transaction(description):
 
 #--------------------
 
+# Imported on first parallel run: concurrent.futures.process pulls in multiprocessing,
+# which would double the import time of this module for callers that never use it
+ProcessPoolExecutor = None
+
+# Category code -> name for categorize_many(); codes fit in one byte
+CATEGORY_NAMES = tuple(_CATEGORY_KEYWORDS) + ("Other",)
+_CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORY_NAMES)}
+
+# Below this many distinct descriptions, process start-up costs more than it saves
+PARALLEL_MIN_DESCRIPTIONS = 50_000
+CATEGORIZE_CHUNK_SIZE = 20_000
+
+def _categorize_chunk(descriptions):
+    """Worker: categorize a chunk and return one category code byte per description."""
+    return bytes(_CATEGORY_CODES[categorize_transaction(d)] for d in descriptions)
+
+def _category_codes(unique, workers, chunk_size, min_parallel):
+    if workers < 2 or len(unique) < max(1, min_parallel):
+        return _categorize_chunk(unique)
+    chunk_size = max(1, int(chunk_size))
+    chunks = [unique[i:i + chunk_size] for i in range(0, len(unique), chunk_size)]
+    global ProcessPoolExecutor
+    if ProcessPoolExecutor is None:
+        from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            return b"".join(pool.map(_categorize_chunk, chunks))
+    except (OSError, NotImplementedError, BrokenProcessPool):
+        # No usable process support (sandboxes, some platforms): do the work here
+        return _categorize_chunk(unique)
+
+def categorize_many(descriptions, workers=None, chunk_size=CATEGORIZE_CHUNK_SIZE,
+                    min_parallel=PARALLEL_MIN_DESCRIPTIONS):
+    """Categorize many descriptions at once, optionally spreading large inputs over processes.
+
+    Each distinct description is categorized once. Work stays in this
+    process unless the caller asks for more than one worker; then, when
+    there are at least `min_parallel` distinct descriptions, they are
+    split into chunks for a ProcessPoolExecutor (so the calling script
+    needs an `if __name__ == "__main__":` guard under the spawn start
+    method). Workers share
+    nothing and send back one code byte per description (see
+    CATEGORY_NAMES) instead of strings. Smaller inputs, or platforms
+    without process support, run serially in this process.
+
+    Args:
+        descriptions (iterable[str]): Transaction descriptions.
+        workers (int | None): Process count; None or 1 runs serially.
+        chunk_size (int): Distinct descriptions per worker task.
+        min_parallel (int): Smallest distinct count worth starting processes for.
+
+    Returns:
+        list[str]: Categories in input order, as categorize_transaction() would give.
+
+    Raises:
+        TypeError: If any description is not a string.
+
+    Examples:
+        >>> categorize_many(["Uber ride", "Starbucks", "Uber ride", "Gift"])
+        ['Transportation', 'Food', 'Transportation', 'Other']
+    """
+    descriptions = descriptions if isinstance(descriptions, list) else list(descriptions)
+    unique = list(dict.fromkeys(descriptions))
+    workers = 1 if workers is None else int(workers)
+    codes = _category_codes(unique, workers, chunk_size, min_parallel)
+    lookup = {d: CATEGORY_NAMES[code] for d, code in zip(unique, codes)}
+    return [lookup[d] for d in descriptions]
+
+#--------------------
+
+_KEYWORD_TOKEN_RE = re.compile(r"[a-z]+")
+
+# Expanded stopword list for finance data
+FINANCIAL_STOPWORDS = frozenset({
+    "the", "and", "for", "of", "to", "a", "in", "on", "at",
+    "payment", "purchase", "transaction", "from", "with", "store"
+})
+
+def tokenize_financial_text(description):
+    """Split a description into the meaningful lowercase keyword tokens.
+    
+    This is the tokenizer behind extract_financial_keywords(): letters-only
+    words, minus finance stopwords and words of two letters or fewer.
+    
+    Args:
+        description (str): The transaction text.
+        
+    Returns:
+        list[str]: Tokens in the order they appear.
+        
+    Examples:
+        >>> tokenize_financial_text("Payment to Uber Technologies #42")
+        ['uber', 'technologies']
+    """
+    # Convert to lowercase and tokenize words
+    tokens = _KEYWORD_TOKEN_RE.findall(normalize_description(description).lowered)
+    # Keep only meaningful tokens
+    return [t for t in tokens if t not in FINANCIAL_STOPWORDS and len(t) > 2]
+
+#--------------------
+
 def extract_financial_keywords(description, top_k=5):
     """Extract the most relevant financial keywords from a transaction description.
     
@@ -231,17 +403,7 @@ def extract_financial_keywords(description, top_k=5):
     if not isinstance(top_k, int) or top_k <= 0:
         raise TypeError("top_k must be a positive integer")
     
-    # Convert to lowercase and tokenize words
-    tokens = re.findall(r"[a-zA-Z]+", description.lower())
-    
-    # Expanded stopword list for finance data
-    stopwords = {
-        "the", "and", "for", "of", "to", "a", "in", "on", "at",
-        "payment", "purchase", "transaction", "from", "with", "store"
-    }
-    
-    # Keep only meaningful tokens
-    filtered_tokens = [t for t in tokens if t not in stopwords and len(t) > 2]
+    filtered_tokens = tokenize_financial_text(description)
     
     if not filtered_tokens:
         return []
@@ -296,7 +458,7 @@ def analyze_spending_trends(transactions):
     if not isinstance(transactions, list):
         raise TypeError("transactions must be a list of dictionaries")
 
-    monthly_totals = defaultdict(float)
+    monthly_cents = defaultdict(int)
 
     # Collect monthly totals for expenses
     for t in transactions:
@@ -308,13 +470,15 @@ def analyze_spending_trends(transactions):
             continue
         try:
             month = t["date"][:7]  # Extract YYYY-MM
-            monthly_totals[month] += float(t["amount"])
+            monthly_cents[month] += to_cents(t["amount"])
         except (ValueError, TypeError):
             continue
 
-    if not monthly_totals:
+    if not monthly_cents:
         raise ValueError("No valid expense transactions found.")
 
+    monthly_totals = {m: from_cents(c) for m, c in monthly_cents.items()}
+
     # Sort months and calculate month-to-month change percentages
     months = sorted(monthly_totals.keys())
     totals = [monthly_totals[m] for m in months]
@@ -343,7 +507,7 @@ def analyze_spending_trends(transactions):
             trend = "stable"
 
     return {
-        "monthly_totals": dict(monthly_totals),
+        "monthly_totals": monthly_totals,
         "trend": trend,
         "change_rates": change_rates
     }
@@ -392,13 +556,14 @@ def search_transactions(transactions, query):
     for t in transactions:
         if not isinstance(t, dict) or "description" not in t:
             continue
-        if query_lower in t["description"].lower():
+        if query_lower in normalize_description(t["description"]).lowered:
             results.append(t)
     
     return results
 
 #-----------------------
 
+import calendar
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from typing import List, Dict, Any, Optional, Tuple
@@ -467,6 +632,72 @@ def parse_date(date_str: str) -> str:
 
 #-----------------------
 
+_ISO_DATE_RE = re.compile(r"(\d{4})([-/])(\d{1,2})\2(\d{1,2})")
+_SLASH_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_MONTH_NAME_DATE_RE = re.compile(r"([A-Za-z]+) (\d{1,2}), (\d{4})")
+_MONTH_NUMBERS = {
+    **{name.lower(): i for i, name in enumerate(calendar.month_abbr) if name},
+    **{name.lower(): i for i, name in enumerate(calendar.month_name) if name},
+}
+
+def _valid_ymd(year: int, month: int, day: int) -> bool:
+    return 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]
+
+def try_parse_date(date_str: str) -> Optional[str]:
+    """
+    Like parse_date(), but return None instead of raising for bad input.
+
+    Recognized formats are matched with precompiled patterns and checked
+    arithmetically, so bulk validation does not pay for an exception per
+    rejected format. Inputs the patterns do not cover fall back to
+    parse_date().
+
+    Args:
+        date_str (str): Input date text.
+
+    Returns:
+        str | None: Normalized 'YYYY-MM-DD', or None if it cannot be parsed.
+
+    Examples:
+        >>> try_parse_date("03/05/2024")
+        '2024-03-05'
+        >>> try_parse_date("2024-02-30") is None
+        True
+    """
+    if not isinstance(date_str, str):
+        return None
+    text = date_str.strip()
+
+    m = _ISO_DATE_RE.fullmatch(text)
+    if m:
+        year, month, day = int(m.group(1)), int(m.group(3)), int(m.group(4))
+        if year >= 1000:
+            return f"{year:04d}-{month:02d}-{day:02d}" if _valid_ymd(year, month, day) else None
+    m = _SLASH_DATE_RE.fullmatch(text)
+    if m:
+        first, second, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        if year >= 1000:
+            # Same precedence as parse_date(): MM/DD/YYYY before DD/MM/YYYY
+            if _valid_ymd(year, first, second):
+                return f"{year:04d}-{first:02d}-{second:02d}"
+            if _valid_ymd(year, second, first):
+                return f"{year:04d}-{second:02d}-{first:02d}"
+            return None
+    m = _MONTH_NAME_DATE_RE.fullmatch(text)
+    if m:
+        month = _MONTH_NUMBERS.get(m.group(1).lower())
+        day, year = int(m.group(2)), int(m.group(3))
+        if month and year >= 1000:
+            return f"{year:04d}-{month:02d}-{day:02d}" if _valid_ymd(year, month, day) else None
+
+    # Uncommon shapes: defer to the strict parser
+    try:
+        return parse_date(text)
+    except ValueError:
+        return None
+
+#-----------------------
+
 def filter_transactions_by_date(
     transactions: List[dict],
     start_date: Optional[str] = None,
@@ -511,12 +742,16 @@ def filter_transactions_by_date(
 
 #-----------------------
 
-def compute_category_totals(transactions: List[dict]) -> Dict[str, float]:
+def compute_category_totals(transactions: List[dict], workers: Optional[int] = None,
+                            categorize=None) -> Dict[str, float]:
     """
     Sum expenses by category using your categorize_transaction() helper.
 
     Args:
         transactions (list[dict]): Dicts with 'type', 'amount', and 'description'.
+        workers (int | None): Passed to categorize_many(); processes are only used when > 1.
+        categorize (callable | None): Batch categorizer used instead of
+            categorize_many(), e.g. a category_rules.CategoryMatcher's categorize_many.
 
     Returns:
         dict: {category: total_spent} rounded to 2 decimals.
@@ -529,24 +764,55 @@ def compute_category_totals(transactions: List[dict]) -> Dict[str, float]:
         >>> compute_category_totals(tx)['Food'] > 0
         True
     """
-    totals: Dict[str, float] = defaultdict(float)
+    amounts: List[int] = []  # cents
+    descriptions: List[str] = []
     for t in transactions:
         if not is_expense(t):
             continue
         try:
-            amt = float(t.get("amount", 0))
-            cat = categorize_transaction(str(t.get("description", "")))
-            totals[cat] += amt
-        except Exception:
+            amt = to_cents(t.get("amount", 0))
+        except (TypeError, ValueError, OverflowError):
             continue
-    return {k: round(v, 2) for k, v in totals.items()}
+        amounts.append(amt)
+        descriptions.append(str(t.get("description", "")))
+    totals: Dict[str, int] = defaultdict(int)
+    for amt, cat in zip(amounts, (categorize or categorize_many)(descriptions, workers=workers)):
+        totals[cat] += amt
+    return {k: from_cents(v) for k, v in totals.items()}
+
+#-----------------------
+
+def budget_status(spent: float, budget: float, warning_threshold: float = 0.9) -> str:
+    """
+    Classify an amount spent against a single category budget.
+
+    Args:
+        spent (float): Amount spent so far in the category.
+        budget (float): Budget limit for the category.
+        warning_threshold (float): Fraction of budget that triggers 'approaching'.
+
+    Returns:
+        str: 'under', 'approaching', or 'exceeded'.
+
+    Examples:
+        >>> budget_status(95, 100)
+        'approaching'
+        >>> budget_status(120, 100)
+        'exceeded'
+    """
+    if budget > 0 and spent > budget:
+        return "exceeded"
+    if budget > 0 and spent >= warning_threshold * budget:
+        return "approaching"
+    return "under"
 
 #-----------------------
 
 def budget_summary(
     transactions: List[dict],
     category_budgets: Dict[str, float],
-    warning_threshold: float = 0.9
+    warning_threshold: float = 0.9,
+    categorize=None
 ) -> Dict[str, Dict[str, float]]:
     """
     Compare category spending against budgets.
@@ -555,6 +821,7 @@ def budget_summary(
     transactions (list[dict]): Expense transactions.
     category_budgets (dict): {category: monthly_budget_amount}
     warning_threshold (float): Fraction of budget that triggers 'approaching'.
+    categorize (callable | None): Batch categorizer, as for compute_category_totals().
 
     Returns:
         dict: {
@@ -571,17 +838,12 @@ def budget_summary(
         >>> budget_summary(tx, {'Food': 100})['Food']['status']
         'under'
     """
-    spent = compute_category_totals(transactions)
+    spent = compute_category_totals(transactions, categorize=categorize)
     result: Dict[str, Dict[str, float]] = {}
     for cat, budget in category_budgets.items():
         s = float(spent.get(cat, 0.0))
         pct = (s / budget * 100.0) if budget > 0 else 0.0
-        if budget > 0 and s > budget:
-            status = "exceeded"
-        elif budget > 0 and s >= warning_threshold * budget:
-            status = "approaching"
-        else:
-            status = "under"
+        status = budget_status(s, budget, warning_threshold)
         result[cat] = {
             "spent": round(s, 2),
             "budget": float(budget),
@@ -628,7 +890,7 @@ def detect_recurring_expenses(
     Detect recurring expenses (e.g., subscriptions, rent) by merchant and cadence.
 
     Strategy:
-        1) Normalize merchant from description using clean_text_content().
+        1) Normalize merchant from description using normalize_description().
         2) Group expenses by merchant; collect (date, amount).
         3) For each merchant, compute sorted inter-payment gaps in days.
         4) If there is a dominant cadence (e.g., ~30 days) with at least
@@ -674,7 +936,7 @@ def detect_recurring_expenses(
         try:
             if not is_expense(t):
                 continue
-            desc = clean_text_content(str(t.get("description", "")))
+            desc = normalize_description(str(t.get("description", ""))).merchant_key
             if not desc:
                 continue
             d = datetime.strptime(parse_date(str(t.get("date"))), "%Y-%m-%d")
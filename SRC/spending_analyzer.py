@@ -1,38 +1,149 @@
-from library_financial_functions import calculate_average_spending, analyze_spending_trends
+from itertools import chain
+
+from .library_financial_functions import calculate_average_spending, analyze_spending_trends
 
 class SpendingAnalyzer:
     def __init__(self, transactions):
         if not isinstance(transactions, list):
             raise ValueError("transactions must be provided as a list.")
+        self._validate(transactions)
+        self._transactions = list(transactions)
+        self._summary = None
+        self._pending = None
+        self._error = None
+
+    @classmethod
+    def streaming(cls, transactions):
+        # Streaming mode: accept any iterable (e.g. a generator from an importer),
+        # validate items as they are consumed and keep only the running summary,
+        # so memory is O(categories + months) instead of O(transactions).
+        analyzer = cls.__new__(cls)
+        analyzer._transactions = None
+        analyzer._summary = cls._empty_summary()
+        analyzer._pending = iter(transactions)
+        analyzer._error = None
+        return analyzer
+
+    @staticmethod
+    def _validate(transactions):
         if not all(hasattr(t, "amount") and hasattr(t, "txn_type") for t in transactions):
             raise ValueError("Each transaction must have 'amount' and 'txn_type' attributes.")
-        self._transactions = transactions
+
+    @property
+    def is_streaming(self):
+        return self._transactions is None
 
     @property
     def transactions(self):
-        return self._transactions
+        if self.is_streaming:
+            raise ValueError("transactions are not retained in streaming mode.")
+        return list(self._transactions)
+
+    @transactions.setter
+    def transactions(self, transactions):
+        if not isinstance(transactions, list):
+            raise ValueError("transactions must be provided as a list.")
+        self._validate(transactions)
+        self._transactions = list(transactions)
+        self._summary = None  # the list changed, so the cached statistics are stale
+        self._pending = None
+
+    def extend(self, transactions):
+        if self.is_streaming:
+            # Nothing is consumed until a statistic is requested
+            self._pending = chain(self._pending, transactions) if self._pending is not None else iter(transactions)
+            return
+        new_txns = list(transactions)
+        self._validate(new_txns)
+        self._transactions.extend(new_txns)
+        if self._summary is not None:
+            for t in new_txns:
+                self._accumulate(self._summary, t)
+
+    # Statistics are gathered in one scan and reused until the transaction list changes.
+    @staticmethod
+    def _empty_summary():
+        return {
+            "total": 0.0,
+            "count": 0,
+            "category_totals": {},
+            "category_counts": {},
+            "monthly_totals": {},
+        }
+
+    def _get_summary(self):
+        if self._error is not None:
+            # The stream was only partly consumed, so every total would be short
+            raise ValueError(f"streamed transactions could not be summarized: {self._error}")
+        if self._pending is not None:
+            self._consume_pending()
+        if self._summary is None:
+            summary = self._empty_summary()
+            for t in self._transactions:
+                self._accumulate(summary, t)
+            self._summary = summary
+        return self._summary
+
+    def _consume_pending(self):
+        summary = self._summary
+        try:
+            for t in self._pending:
+                if not (hasattr(t, "amount") and hasattr(t, "txn_type")):
+                    raise ValueError("Each transaction must have 'amount' and 'txn_type' attributes.")
+                self._accumulate(summary, t)
+        except Exception as e:
+            self._error = e
+            raise
+        finally:
+            self._pending = None
+
+    @staticmethod
+    def _accumulate(summary, t):
+        if t.txn_type != "expense":
+            return
+        amount = t.amount
+        summary["total"] += amount
+        summary["count"] += 1
+        category = getattr(t, "category", "Uncategorized")
+        summary["category_totals"][category] = summary["category_totals"].get(category, 0) + amount
+        summary["category_counts"][category] = summary["category_counts"].get(category, 0) + 1
+        date = getattr(t, "date", None)
+        if date:
+            month = str(date)[:7]
+            summary["monthly_totals"][month] = summary["monthly_totals"].get(month, 0.0) + amount
+
+    def summary(self):
+        s = self._get_summary()
+        return {
+            "total": s["total"],
+            "count": s["count"],
+            "mean": s["total"] / s["count"] if s["count"] else 0.0,
+            "category_totals": dict(s["category_totals"]),
+            "monthly_totals": dict(s["monthly_totals"]),
+        }
 
     def average_spending(self, category=None):
-        relevant_txns = [
-            t.amount for t in self._transactions
-            if t.txn_type == "expense" and (category is None or getattr(t, "category", None) == category)
-        ]
-        return calculate_average_spending(relevant_txns)
+        s = self._get_summary()
+        if category is None:
+            total, count = s["total"], s["count"]
+        else:
+            total, count = s["category_totals"].get(category, 0), s["category_counts"].get(category, 0)
+        if not count:
+            # Same error the library raises for an empty list
+            return calculate_average_spending([])
+        return round(total / count, 2)
 
     def spending_trends(self):
-        data = [{"amount": t.amount, "date": t.date, "category": getattr(t, "category", "Uncategorized")}
-                for t in self._transactions]
+        # One pre-aggregated expense entry per month; analyze_spending_trends does the rest
+        data = [{"amount": total, "type": "expense", "date": month}
+                for month, total in self._get_summary()["monthly_totals"].items()]
         return analyze_spending_trends(data)
 
     def total_spent(self):
-        return sum(t.amount for t in self._transactions if t.txn_type == "expense")
+        return self._get_summary()["total"]
 
     def top_categories(self, n=3):
-        category_totals = {}
-        for t in self._transactions:
-            if t.txn_type == "expense":
-                category = getattr(t, "category", "Uncategorized")
-                category_totals[category] = category_totals.get(category, 0) + t.amount
+        category_totals = self._get_summary()["category_totals"]
         sorted_totals = sorted(category_totals.items(), key=lambda x: x[1], reverse=True)
         return sorted_totals[:n]
 
@@ -40,4 +151,3 @@ class SpendingAnalyzer:
         avg = self.average_spending()
         total = self.total_spent()
         return f"Total spent: ${total:,.2f} | Average per transaction: ${avg:,.2f}"
-
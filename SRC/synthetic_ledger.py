@@ -0,0 +1,123 @@
+"""
+Synthetic Ledger Generator
+
+Produces realistic, reproducible transaction rows for benchmarks and load
+tests: a skewed merchant distribution, monthly recurring charges, biweekly
+paychecks, and a mix of the date formats parse_date() accepts.
+
+Rows are yielded lazily so ledgers of 10^7 transactions can be streamed
+without building the whole list first.
+"""
+
+import random
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional
+
+# (description template, typical amount, amount spread); {n} becomes a store number
+MERCHANTS = [
+    ("Starbucks Store #{n}", 6.0, 3.0),
+    ("Safeway #{n} groceries", 65.0, 30.0),
+    ("Uber *Trip {n}", 18.0, 10.0),
+    ("Amazon Marketplace order {n}", 40.0, 35.0),
+    ("Shell gas station {n}", 45.0, 15.0),
+    ("McDonalds #{n}", 11.0, 4.0),
+    ("Target Store {n}", 55.0, 30.0),
+    ("Trader Joes #{n}", 48.0, 20.0),
+    ("Lyft ride {n}", 16.0, 8.0),
+    ("Chipotle Mexican Grill {n}", 13.0, 3.0),
+    ("Walmart Supercenter {n}", 70.0, 40.0),
+    ("CVS Pharmacy {n}", 22.0, 15.0),
+    ("AMC cinema tickets", 28.0, 10.0),
+    ("Steam game purchase", 25.0, 20.0),
+    ("Local pizza restaurant", 32.0, 12.0),
+    ("Airbnb booking {n}", 240.0, 120.0),
+    ("Delta airline flight", 320.0, 150.0),
+    ("City dentist office", 120.0, 60.0),
+    ("Hardware store {n}", 35.0, 25.0),
+    ("Farmers market", 20.0, 8.0),
+]
+
+# (description, amount, day of month)
+RECURRING = [
+    ("Rent payment", 1800.00, 1),
+    ("Netflix subscription", 15.49, 5),
+    ("Comcast internet", 79.99, 9),
+    ("Spotify Premium", 10.99, 12),
+    ("Electric utility bill", 95.00, 18),
+    ("Planet Fitness gym", 24.99, 20),
+]
+
+_RECURRING_DAYS = {dom for _, _, dom in RECURRING}
+
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%B %d, %Y", "%b %d, %Y"]
+
+
+def _format_date(day: date, rng: random.Random, mixed: bool) -> str:
+    if not mixed:
+        return day.isoformat()
+    fmt = rng.choice(DATE_FORMATS)
+    # %B/%b are locale dependent; parse_date() expects the C-locale names these produce
+    return day.strftime(fmt)
+
+
+def generate_transactions(n: int, seed: int = 0, start: str = "2015-01-01",
+                          mixed_dates: bool = True) -> Iterator[Dict]:
+    """Yield n ledger-shaped rows ({'type', 'amount', 'description', 'date'}).
+
+    Dates advance monotonically from `start`, at roughly 20 rows per day
+    (between 90 days and 30 years of history in total). Merchant popularity
+    follows a Zipf-like distribution, each month carries the RECURRING
+    charges, and a paycheck arrives every 14 days.
+
+    Args:
+        n (int): Number of rows to produce.
+        seed (int): Random seed; the same seed always yields the same rows.
+        start (str): First date, 'YYYY-MM-DD'.
+        mixed_dates (bool): Emit a mix of date formats instead of ISO only.
+
+    Examples:
+        >>> rows = list(generate_transactions(5, seed=1, mixed_dates=False))
+        >>> len(rows), rows == list(generate_transactions(5, seed=1, mixed_dates=False))
+        (5, True)
+    """
+    if not isinstance(n, int) or n < 0:
+        raise ValueError("n must be a non-negative integer")
+    rng = random.Random(seed)
+    first = date.fromisoformat(start)
+    span_days = max(90, min(n // 20, 365 * 30))
+    cumulative = list(accumulate(1.0 / (rank + 1) for rank in range(len(MERCHANTS))))
+
+    produced = 0
+    last_day: Optional[date] = None
+    pending: List[Dict] = []
+    i = 0
+    while produced < n:
+        day = first + timedelta(days=(i * span_days) // max(n, 1))
+        i += 1
+        if day != last_day:
+            # New day: queue recurring charges and paychecks that fall on it
+            if day.day in _RECURRING_DAYS:
+                for desc, amount, dom in RECURRING:
+                    if dom == day.day:
+                        pending.append({"type": "expense", "amount": amount, "description": desc, "day": day})
+            if (day - first).days % 14 == 0:
+                pending.append({"type": "income", "amount": round(rng.gauss(2400, 50), 2),
+                                "description": "Payroll deposit ACME Corp", "day": day})
+            last_day = day
+        if pending:
+            row = pending.pop(0)
+            row["date"] = _format_date(row.pop("day"), rng, mixed_dates)
+        else:
+            template, mean, spread = MERCHANTS[bisect_left(cumulative, rng.random() * cumulative[-1])]
+            amount = max(0.5, round(rng.gauss(mean, spread / 2), 2))
+            row = {
+                "type": "expense",
+                "amount": amount,
+                "description": template.format(n=rng.randint(1, 400)),
+                "date": _format_date(day, rng, mixed_dates),
+            }
+        produced += 1
+        yield row
+
@@ -1,6 +1,18 @@
-from library_financial_functions import parse_date, categorize_transaction, format_currency
+from functools import lru_cache
+
+from .library_financial_functions import parse_date, categorize_transaction, format_currency
+
+# Shared across all Transaction objects: bulk imports repeat the same few merchants,
+# so each distinct description is categorized once. The call goes through the module
+# global so instrumentation can count the misses.
+@lru_cache(maxsize=8192)
+def _categorize_cached(description):
+    return categorize_transaction(description)
+
 
 class Transaction:
+    __slots__ = ("_txn_id", "_description", "_amount", "_txn_type", "_date", "_category")
+
     def __init__(self, txn_id, description, amount, txn_type, date):
         if not isinstance(txn_id, str) or not txn_id.strip():
             raise ValueError("Transaction ID must be a non-empty string.")
@@ -8,18 +20,35 @@ class Transaction:
             raise ValueError("txn_type must be 'expense' or 'income'.")
         if not isinstance(amount, (int, float)) or amount < 0:
             raise ValueError("Amount must be a non-negative number.")
-        
+
         self._txn_id = txn_id
         self._description = description.strip()
         self._amount = float(amount)
         self._txn_type = txn_type
         self._date = parse_date(date)
-        self._category = categorize_transaction(description)
+        self._category = None  # computed on first access
+
+    @classmethod
+    def from_trusted(cls, txn_id, description, amount, txn_type, date, category=None):
+        # For input that is already normalized (stripped description, float amount,
+        # 'YYYY-MM-DD' date), e.g. rows read back from our own files. Skips validation.
+        txn = cls.__new__(cls)
+        txn._txn_id = txn_id
+        txn._description = description
+        txn._amount = amount
+        txn._txn_type = txn_type
+        txn._date = date
+        txn._category = category
+        return txn
 
     @property
     def txn_id(self):
         return self._txn_id
 
+    @property
+    def description(self):
+        return self._description
+
     @property
     def amount(self):
         return self._amount
@@ -34,12 +63,13 @@ class Transaction:
 
     @property
     def category(self):
+        if self._category is None:
+            self._category = _categorize_cached(self._description)
         return self._category
 
     def formatted(self):
         sign = "-" if self._txn_type == "expense" else "+"
-        return f"[{self._date}] {self._description} ({self._category}): {sign}{format_currency(self._amount)}"
+        return f"[{self._date}] {self._description} ({self.category}): {sign}{format_currency(self._amount)}"
 
     def __str__(self):
         return f"{self._txn_id}: {self.formatted()}"
-
@@ -4,12 +4,9 @@ Demonstrates a complete information system workflow
 """
 
 import sys
-import os
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
-from finance_ledger import (
+# Run from the repository root so the SRC package is importable
+from SRC.finance_ledger import (
     AbstractTransaction,
     ExpenseTransaction,
     IncomeTransaction,
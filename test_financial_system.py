@@ -6,7 +6,7 @@ Tests inheritance, polymorphism, abstract base classes, and composition.
 
 import unittest
 from abc import ABC
-from finance_ledger import (
+from SRC.finance_ledger import (
     AbstractTransaction,
     ExpenseTransaction,
     IncomeTransaction,
@@ -15,7 +15,7 @@ from finance_ledger import (
 
 import unittest
 from abc import ABC
-from finance_ledger import (
+from SRC.finance_ledger import (
     AbstractTransaction,
     ExpenseTransaction,
     IncomeTransaction,
@@ -7,12 +7,51 @@ Demonstrates:
 - Test organization and best practices
 - Using unittest framework (reinforces OOP with TestCase classes)
 """
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
 import unittest
-from finance_ledger import (
+from unittest import mock
+from SRC.finance_ledger import (
     AbstractTransaction,
     ExpenseTransaction,
     IncomeTransaction,
     FinanceLedger,
+    BudgetEvent,
+    validate_transaction_batch,
+    Anomaly,
+)
+from SRC.category_rules import CategoryRule, RuleSet
+from SRC.ledger_query import LedgerIndexes
+from SRC.ledger_reconcile import MATCHED, ONLY_IN_A, ONLY_IN_B, reconcile, reconcile_sorted
+from SRC.ledger_stats import QuantileSketch, RunningStats, merge_sketches
+from SRC.spending_analyzer import SpendingAnalyzer
+from SRC.transaction_class import Transaction
+from SRC.keyword_index import KeywordIndex
+from SRC.synthetic_ledger import generate_transactions
+from SRC import benchmark
+from SRC import finance_json
+from SRC import instrumentation
+from SRC import ledger_cli
+from SRC import library_financial_functions
+from SRC.library_financial_functions import (
+    extract_financial_keywords,
+    normalize_description,
+    clean_text_content,
+    categorize_transaction,
+    categorize_many,
+    compute_category_totals,
 )
 
 
@@ -65,6 +104,11 @@ class TestTransactionValidation(unittest.TestCase):
         with self.assertRaises(ValueError):
             IncomeTransaction(-100.0, "2025-11-01", "Salary")
 
+    def test_non_finite_or_huge_amount_raises_error(self):
+        for amount in (float("nan"), float("inf"), "1e400", 1e17):
+            with self.assertRaises(ValueError):
+                ExpenseTransaction(amount, "2025-11-01", "Yacht")
+
     def test_zero_amount_raises_error(self):
         with self.assertRaises(ValueError):
             ExpenseTransaction(0.0, "2025-11-01", "Test")
@@ -169,6 +213,1241 @@ class TestFinanceLedgerIntegration(unittest.TestCase):
         self.assertTrue(len(recurring) > 0)
 
 
+class TestBudgetEvents(unittest.TestCase):
+    """Tests for push-based budget threshold events."""
+
+    def setUp(self):
+        self.ledger = FinanceLedger("Alex", {"food": 100})
+        self.events = []
+        self.ledger.subscribe_budget_events(self.events.append, "Food")
+
+    def test_events_only_on_threshold_crossing(self):
+        self.ledger.add_transaction("expense", "Coffee", 50.0, "2025-11-01")
+        self.assertEqual(self.events, [])
+        self.ledger.add_transaction("expense", "Pizza", 45.0, "2025-11-02")
+        self.ledger.add_transaction("expense", "Burger", 1.0, "2025-11-03")
+        self.ledger.add_transaction("expense", "Cafe", 10.0, "2025-11-04")
+        self.ledger.add_transaction("expense", "Cafe", 10.0, "2025-11-05")
+        self.assertEqual([e.status for e in self.events], ["approaching", "exceeded"])
+        self.assertIsInstance(self.events[0], BudgetEvent)
+        self.assertEqual(self.events[1].spent, 106.0)
+
+    def test_thresholds_reset_each_month(self):
+        self.ledger.add_transaction("expense", "Pizza", 120.0, "2025-11-02")
+        self.ledger.add_transaction("expense", "Pizza", 120.0, "2025-12-02")
+        self.assertEqual([e.month for e in self.events], ["2025-11", "2025-12"])
+        self.assertEqual(self.ledger.month_category_spend(2025, 12), {"food": 120.0})
+
+    def test_replay_matches_live_stream(self):
+        other = []
+        self.ledger.subscribe_budget_events(other.append, "entertainment")
+        self.ledger.add_transaction("expense", "Pizza", 95.0, "2025-11-02")
+        self.assertEqual(other, [])
+        replayed = []
+        count = self.ledger.replay_budget_events(replayed.append, "food")
+        self.assertEqual(count, 1)
+        self.assertEqual(replayed, self.events)
+
+
+class TestBatchValidation(unittest.TestCase):
+    """Tests for exception-free bulk validation."""
+
+    def setUp(self):
+        self.rows = [
+            {"type": "expense", "amount": 12.5, "date": "2025-11-01", "description": "Lunch"},
+            {"type": "income", "amount": "1000", "date": "11/05/2025", "description": "Salary"},
+            {"type": "expense", "amount": -3, "date": "2025-02-30", "description": None},
+            {"type": "refund", "amount": "abc", "date": "2025-11-01", "description": "Oops"},
+        ]
+
+    def test_valid_rows_become_transactions(self):
+        result = validate_transaction_batch(self.rows)
+        self.assertEqual(len(result.valid), 2)
+        self.assertIsInstance(result.valid[0], ExpenseTransaction)
+        self.assertIsInstance(result.valid[1], IncomeTransaction)
+        self.assertEqual(result.valid[1].date, "2025-11-05")
+        self.assertEqual(result.valid[1].amount, 1000.0)
+
+    def test_error_report_lists_every_problem(self):
+        result = validate_transaction_batch(self.rows)
+        self.assertFalse(result.ok)
+        by_row = result.error_rows()
+        self.assertEqual([e.field for e in by_row[2]], ["amount", "date", "description"])
+        self.assertEqual([e.field for e in by_row[3]], ["type", "amount"])
+
+    def test_ledger_bulk_add_skips_bad_rows(self):
+        ledger = FinanceLedger("Alex")
+        errors = ledger.add_transactions(self.rows)
+        self.assertEqual(len(ledger.transactions), 2)
+        self.assertEqual({e.index for e in errors}, {2, 3})
+
+    def test_non_finite_and_out_of_range_amounts_are_row_errors(self):
+        rows = [{"type": "expense", "amount": amount, "date": "2025-11-02", "description": "Yacht"}
+                for amount in (4.0, float("nan"), float("inf"), "1e400", 1e17, 6.0)]
+        ledger = FinanceLedger("Alex")
+        errors = ledger.add_transactions(rows)
+        self.assertEqual([(e.index, e.message) for e in errors],
+                         [(1, "amount must be finite"), (2, "amount must be finite"),
+                          (3, "amount must be finite"), (4, "amount is too large")])
+        self.assertEqual(len(ledger.transactions), 2)
+        self.assertEqual(ledger.query().between("2025-11-01", "2025-11-30").sum(), 10.0)
+        with self.assertRaises(ValueError):
+            library_financial_functions.to_cents(1e17)
+
+
+class TestTextNormalization(unittest.TestCase):
+    """Tests for the shared cached normalization layer."""
+
+    def test_normalized_forms(self):
+        norm = normalize_description("  Starbucks Coffee #123! ")
+        self.assertEqual(norm.lowered, "  starbucks coffee #123! ")
+        self.assertEqual(norm.merchant_key, "starbucks coffee")
+        self.assertEqual(clean_text_content("Café  Été 9"), "caf t")
+
+    def test_each_description_normalized_once(self):
+        normalize_description.cache_clear()
+        desc = "Spotify Premium 05/24"
+        categorize_transaction(desc)
+        clean_text_content(desc)
+        extract_financial_keywords(desc)
+        info = normalize_description.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+
+class TestIntegerCents(unittest.TestCase):
+    """Tests for exact integer-cents aggregation."""
+
+    def test_large_sums_do_not_drift(self):
+        rows = [{"type": "expense", "amount": 1000000000.07, "description": "Airbnb booking",
+                 "date": "2025-03-01"}] * 1000
+        self.assertNotEqual(round(sum(r["amount"] for r in rows), 2), 1000000000070.0)  # float drift
+        self.assertEqual(library_financial_functions.calculate_total_spending(rows), 1000000000070.0)
+        self.assertEqual(compute_category_totals(rows), {"Travel": 1000000000070.0})
+        ledger = FinanceLedger("Alex")
+        ledger.add_transactions(rows)
+        self.assertEqual(ledger.total_spent(), 1000000000070.0)
+        self.assertEqual(ledger.query().in_month(2025, 3).sum(), 1000000000070.0)
+        self.assertEqual(ledger.month_category_spend(2025, 3), {"travel": 1000000000070.0})
+
+    def test_normal_data_rounds_as_before(self):
+        ledger = FinanceLedger("Alex")
+        ledger.add_transactions(generate_transactions(2000, seed=4, mixed_dates=False))
+        expenses = [t for t in ledger.transactions if t["type"] == "expense"]
+        self.assertEqual(ledger.total_spent(), round(sum(t["amount"] for t in expenses), 2))
+        in_range = [t["amount"] for t in expenses if "2015-02-01" <= t["date"] <= "2015-02-28"]
+        self.assertEqual(ledger.total_spent("2015-02-01", "2015-02-28"), round(sum(in_range), 2))
+        by_month = {}
+        for t in expenses:
+            by_month[t["date"][:7]] = by_month.get(t["date"][:7], 0.0) + t["amount"]
+        self.assertEqual(ledger.query().expenses().group_by("month"),
+                         {m: round(v, 2) for m, v in by_month.items()})
+
+
+class TestParallelCategorization(unittest.TestCase):
+    """Tests for categorize_many() and its process-pool path."""
+
+    def setUp(self):
+        self.records = list(generate_transactions(3000, seed=2, mixed_dates=False))
+        self.descriptions = [t["description"] for t in self.records]
+        self.expected = [categorize_transaction(d) for d in self.descriptions]
+
+    def test_process_pool_matches_serial(self):
+        result = categorize_many(self.descriptions, workers=2, chunk_size=500, min_parallel=0)
+        self.assertEqual(result, self.expected)
+        self.assertEqual(compute_category_totals(self.records, workers=2),
+                         compute_category_totals(self.records, workers=1))
+
+    def test_falls_back_to_serial_without_processes(self):
+        with mock.patch.object(library_financial_functions, "ProcessPoolExecutor", side_effect=OSError):
+            self.assertEqual(categorize_many(self.descriptions, workers=4, min_parallel=0), self.expected)
+        with mock.patch.object(library_financial_functions, "ProcessPoolExecutor") as pool:
+            categorize_many(self.descriptions, workers=4)  # far below PARALLEL_MIN_DESCRIPTIONS
+            pool.assert_not_called()
+        with mock.patch.object(library_financial_functions, "ProcessPoolExecutor") as pool:
+            self.assertEqual(categorize_many(self.descriptions, min_parallel=0), self.expected)
+            compute_category_totals(self.records)
+            pool.assert_not_called()  # processes are opt-in
+        with self.assertRaises(TypeError):
+            categorize_many(["ok", 42])
+
+    def test_bulk_load_uses_batch_categories(self):
+        ledger = FinanceLedger("Alex")
+        ledger.add_transactions(self.records, workers=2)
+        self.assertEqual(ledger.query().category("food").count(),
+                         sum(1 for c in self.expected if c == "Food"))
+
+
+class TestDuplicateDetection(unittest.TestCase):
+    """Tests for the duplicate index behind find_duplicates() and skip_duplicates."""
+
+    def setUp(self):
+        self.ledger = FinanceLedger("Alex")
+        self.ledger.add_transaction("expense", "Coffee  Shop", 4.50, "2025-01-10")
+        self.ledger.add_transaction("income", "Payroll", 2000.0, "2025-01-15")
+
+    def test_exact_duplicates_skipped_and_reported(self):
+        rows = [
+            {"type": "expense", "amount": 4.5, "description": "coffee shop", "date": "2025-01-10"},
+            {"type": "expense", "amount": 4.51, "description": "coffee shop", "date": "2025-01-10"},
+            {"type": "income", "amount": 2000.0, "description": "Payroll", "date": "2025-01-15"},
+        ]
+        errors = self.ledger.add_transactions(rows, skip_duplicates=True)
+        self.assertEqual([(e.index, e.field) for e in errors], [(0, "duplicate"), (2, "duplicate")])
+        self.assertEqual(len(self.ledger.transactions), 3)
+
+    def test_window_days_matches_nearby_dates(self):
+        row = {"type": "expense", "amount": 4.5, "description": "Coffee Shop", "date": "2025-01-11"}
+        self.assertEqual(self.ledger.find_duplicates([row]), [])
+        [(index, match)] = self.ledger.find_duplicates([row], window_days=1)
+        self.assertEqual((index, match["date"]), (0, "2025-01-10"))
+        with self.assertRaises(ValueError):
+            self.ledger.find_duplicates([row], window_days=-1)
+
+    def test_each_stored_row_matches_once(self):
+        row = {"type": "expense", "amount": 4.5, "description": "coffee shop", "date": "2025-01-10"}
+        errors = self.ledger.add_transactions([row, dict(row)], skip_duplicates=True)
+        self.assertEqual([e.index for e in errors], [0])
+        # The kept copy is indexed, so re-importing both rows now skips both
+        errors = self.ledger.add_transactions([row, dict(row)], skip_duplicates=True)
+        self.assertEqual([e.index for e in errors], [0, 1])
+        self.assertEqual(len(self.ledger.transactions), 3)
+
+
+class TestReconcile(unittest.TestCase):
+    """Tests for the sort-merge reconciliation in ledger_reconcile."""
+
+    def setUp(self):
+        self.ledger = FinanceLedger("Alex")
+        self.ledger.add_transaction("expense", "Coffee", 4.50, "2025-01-10")
+        self.ledger.add_transaction("expense", "Coffee", 4.50, "2025-01-11")
+        self.ledger.add_transaction("expense", "Gas", 60.00, "2025-01-12")
+        self.ledger.add_transaction("income", "Payroll", 2000.0, "2025-01-15")
+        self.bank = [
+            {"type": "expense", "amount": 4.50, "description": "SQ *COFFEE", "date": "2025-01-11"},
+            {"type": "expense", "amount": 60.01, "description": "SHELL", "date": "2025-01-13"},
+            {"type": "income", "amount": 2000.0, "description": "ACME PAYROLL", "date": "2025-01-15"},
+            {"type": "expense", "amount": 12.00, "description": "FEE", "date": "2025-01-20"},
+        ]
+
+    def test_tolerances(self):
+        exact = reconcile(self.ledger, self.bank)
+        self.assertEqual(len(exact.matched), 2)  # one coffee and the payroll
+        loose = reconcile(self.ledger, self.bank, date_tolerance=1, amount_tolerance=0.01)
+        self.assertEqual([(a["description"], b["description"]) for a, b in loose.matched],
+                         [("Coffee", "SQ *COFFEE"), ("Gas", "SHELL"), ("Payroll", "ACME PAYROLL")])
+        # A is walked in date order, so the earlier coffee takes the bank row first
+        self.assertEqual([t["date"] for t in loose.only_in_a], ["2025-01-11"])
+        self.assertEqual([t["description"] for t in loose.only_in_b], ["FEE"])
+        self.assertFalse(loose.balanced)
+        self.assertTrue(reconcile(self.ledger, self.ledger.snapshot()).balanced)
+
+    def test_matches_nested_loop_counts(self):
+        records = list(generate_transactions(500, seed=4, mixed_dates=False))
+        bank = [t for i, t in enumerate(records) if i % 7]
+        result = reconcile(records, bank, date_tolerance=2)
+        self.assertEqual(len(result.matched), len(bank))
+        self.assertEqual(len(result.only_in_a), len(records) - len(bank))
+        self.assertEqual(result.only_in_b, [])
+
+    def test_streaming_requires_date_order(self):
+        stream = reconcile_sorted(iter(self.bank), iter(self.bank))
+        self.assertEqual({kind for kind, _, _ in stream}, {MATCHED})
+        shuffled = [self.bank[1], self.bank[0]]
+        with self.assertRaises(ValueError):
+            list(reconcile_sorted(shuffled, []))
+        with self.assertRaises(ValueError):
+            list(reconcile_sorted([], shuffled))
+        kinds = [kind for kind, _, _ in reconcile_sorted(self.bank[:1], self.bank[2:])]
+        self.assertEqual(sorted(kinds), sorted([ONLY_IN_A, ONLY_IN_B, ONLY_IN_B]))
+
+    def test_streams_from_partitioned_store(self):
+        from SRC.ledger_storage import PartitionedStore
+        with tempfile.TemporaryDirectory() as tmp:
+            self.ledger.save_partitioned(tmp)
+            stream = PartitionedStore(tmp).iter_records()
+            kinds = [kind for kind, _, _ in reconcile_sorted(stream, self.ledger.snapshot().records)]
+        self.assertEqual(kinds, [MATCHED] * 4)
+
+
+class TestReadCache(unittest.TestCase):
+    """Tests for the generation-checked memoization of ledger read APIs."""
+
+    def setUp(self):
+        self.ledger = FinanceLedger("Alex", {"food": 300.0})
+        self.ledger.add_transactions(generate_transactions(400, seed=8, mixed_dates=False))
+        self.year, self.month = map(int, self.ledger.transactions[200]["date"][:7].split("-"))
+
+    def test_repeat_reads_hit_until_a_write(self):
+        first = self.ledger.top_categories(3)
+        self.assertEqual(self.ledger.top_categories(3), first)
+        self.ledger.month_summary(self.year, self.month)
+        self.ledger.month_summary(self.year, self.month)
+        info = self.ledger.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 2, 2))
+
+        self.ledger.add_transaction("expense", "Safeway groceries", 5000.0, f"{self.year:04d}-{self.month:02d}-15")
+        summary = self.ledger.month_summary(self.year, self.month)
+        self.assertEqual(self.ledger.cache_info().misses, 3)
+        self.assertEqual(summary, FinanceLedger._summarize_month(
+            self.ledger.transactions, self.ledger.category_budgets, self.year, self.month))
+        self.assertEqual(self.ledger.top_categories(1)[0][0], "Food")
+
+    def test_results_are_shared_and_read_only(self):
+        summary = self.ledger.month_summary(self.year, self.month)
+        self.assertIs(self.ledger.month_summary(self.year, self.month), summary)  # a hit copies nothing
+        self.assertIsInstance(summary["totals"], dict)
+        with self.assertRaises(TypeError):
+            summary["totals"].clear()
+        with self.assertRaises(TypeError):
+            self.ledger.top_categories(3).sort()
+        editable = dict(summary["totals"])
+        editable["Food"] = 0.0
+        self.assertNotEqual(self.ledger.month_summary(self.year, self.month)["totals"], editable)
+        self.assertEqual(json.loads(json.dumps(summary)), summary)
+
+    def test_lru_bound_and_disabled(self):
+        small = FinanceLedger("Alex", cache_size=2)
+        small.add_transactions(self.ledger.transactions)
+        for n in (1, 2, 3):
+            small.top_categories(n)
+        small.top_categories(1)  # evicted by n=3
+        info = small.cache_info()
+        self.assertEqual((info.hits, info.currsize, info.evictions), (0, 2, 2))
+        off = FinanceLedger("Alex", cache_size=0)
+        off.add_transactions(self.ledger.transactions)
+        off.trend()
+        off.trend()
+        self.assertEqual((off.cache_info().hits, off.cache_info().currsize), (0, 0))
+        with self.assertRaises(ValueError):
+            FinanceLedger("Alex", cache_size=-1)
+
+
+class TestCategoryRules(unittest.TestCase):
+    """Tests for user-defined rule sets and incremental recategorization."""
+
+    def setUp(self):
+        self.rows = list(generate_transactions(600, seed=12, mixed_dates=False))
+        self.rideshare = RuleSet(list(RuleSet.default_rules()) + [CategoryRule("Rideshare", "UBER", priority=100)])
+
+    def test_default_rules_match_builtin_table(self):
+        matcher = RuleSet.default_rules().compile()
+        descriptions = [r["description"] for r in self.rows] + ["Gift", "uber eats dinner", "Rent payment"]
+        self.assertEqual(matcher.categorize_many(descriptions),
+                         [categorize_transaction(d) for d in descriptions])
+
+    def test_priority_kinds_and_validation(self):
+        rules = RuleSet([CategoryRule("Food", "coffee", priority=1),
+                         CategoryRule("Treats", r"coffee\s+cake", kind="regex", priority=5),
+                         CategoryRule("Groceries", "Trader Joe's #12", kind="merchant", priority=3),
+                         CategoryRule("Shopping", "trader", priority=2)], default="Misc")
+        matcher = rules.compile()
+        self.assertEqual(matcher.categorize("Coffee cake"), "Treats")
+        self.assertEqual(matcher.categorize("coffee"), "Food")
+        self.assertEqual(matcher.categorize("TRADER JOES"), "Groceries")
+        self.assertEqual(matcher.categorize("Trader Vic's"), "Shopping")
+        self.assertEqual(matcher.categorize("Gift"), "Misc")
+        with self.assertRaises(ValueError):
+            CategoryRule("Food", "(", kind="regex")
+        with self.assertRaises(ValueError):
+            CategoryRule("Food", "x", kind="glob")
+
+    def test_changed_rules(self):
+        base = RuleSet.default_rules()
+        self.assertEqual(base.changed_rules(self.rideshare), [CategoryRule("Rideshare", "uber", priority=100)])
+        self.assertEqual(base.changed_rules(RuleSet.default_rules()), [])
+        self.assertIsNone(base.changed_rules(RuleSet(base, default="Misc")))
+        self.assertIsNone(base.changed_rules(RuleSet(reversed(list(base)))))
+
+    def test_set_rules_moves_only_affected_records(self):
+        ledger = FinanceLedger("Alex", {"transportation": 100.0, "rideshare": 50.0})
+        ledger.add_transactions(self.rows)
+        uber = [t for t in ledger.transactions if "uber" in t["description"].lower()]
+        expected = FinanceLedger("Alex", {"transportation": 100.0, "rideshare": 50.0}, rules=self.rideshare)
+        expected.add_transactions(self.rows)
+        ledger.month_summary(2024, 1)  # cached result must not survive the switch
+
+        self.assertEqual(ledger.set_rules(self.rideshare), len(uber))
+        self.assertEqual(ledger.rules, self.rideshare)
+        self.assertEqual(ledger.query().category("rideshare").count(), len(uber))
+        self.assertEqual(ledger.query().category("rideshare").all(), expected.query().category("rideshare").all())
+        self.assertEqual(ledger.query().category("transportation").all(),
+                         expected.query().category("transportation").all())
+        year, month = map(int, uber[0]["date"][:7].split("-"))
+        self.assertEqual(ledger.month_summary(year, month), expected.month_summary(year, month))
+        self.assertEqual(ledger.month_category_spend(year, month), expected.month_category_spend(year, month))
+        self.assertEqual(ledger.top_categories(10), expected.top_categories(10))
+        self.assertEqual(ledger.category_stats(), expected.category_stats())
+        self.assertEqual(ledger.keyword_index().categories(), expected.keyword_index().categories())
+        self.assertEqual(ledger.set_rules(self.rideshare), 0)
+
+        ledger.add_transaction("expense", "Uber trip", 12.0, "2025-03-01")
+        self.assertEqual(ledger.query().category("rideshare").count(), len(uber) + 1)
+
+    def test_set_rules_reports_only_rising_budget_statuses(self):
+        budgets = {"transportation": 40.0, "rideshare": 30.0}
+        ledger = FinanceLedger("Alex", budgets)
+        ledger.add_transactions(self.rows)
+        events = []
+        ledger.subscribe_budget_events(events.append)
+        ledger.set_rules(self.rideshare)
+        self.assertTrue(events)
+        self.assertEqual({e.category for e in events}, {"rideshare"})
+        self.assertTrue(all(e.status in ("approaching", "exceeded") for e in events))
+        expected = FinanceLedger("Alex", budgets, rules=self.rideshare)
+        expected.add_transactions(self.rows)
+        self.assertEqual(ledger._budget_states, expected._budget_states)
+        del events[:]
+        ledger.set_rules(RuleSet.default_rules())  # back again: rideshare falls silently
+        self.assertNotIn("rideshare", {e.category for e in events})
+        self.assertTrue(all(e.status in ("approaching", "exceeded") for e in events))
+        fresh = FinanceLedger("Alex", budgets)
+        fresh.add_transactions(self.rows)
+        self.assertEqual({k: v for k, v in ledger._budget_states.items() if v != "under"}, fresh._budget_states)
+
+    def test_rules_are_saved_with_the_ledger(self):
+        ledger = FinanceLedger("Alex", rules=self.rideshare)
+        ledger.add_transactions(self.rows[:50])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ledger.json")
+            ledger.save_to_file(path)
+            loaded = FinanceLedger.load_from_file(path)
+            self.rideshare.save(os.path.join(tmp, "rules.json"))
+            self.assertEqual(RuleSet.load(os.path.join(tmp, "rules.json")), self.rideshare)
+        self.assertEqual(loaded.rules, self.rideshare)
+        self.assertEqual(loaded.top_categories(10), ledger.top_categories(10))
+
+
+class TestLedgerQuery(unittest.TestCase):
+    """Tests for the lazy FinanceLedger.query() builder."""
+
+    def setUp(self):
+        self.ledger = FinanceLedger("Alex")
+        self.ledger.add_transaction("expense", "Uber ride", 25.0, "2025-01-05")
+        self.ledger.add_transaction("expense", "Uber eats pizza", 60.0, "2025-02-10")
+        self.ledger.add_transaction("expense", "Pizza place", 80.0, "2025-02-11")
+        self.ledger.add_transaction("income", "Payroll", 2000.0, "2025-02-15")
+        self.ledger.add_transaction("expense", "Lyft ride", 70.0, "2025-03-01")
+
+    def test_chained_filters_match_manual_filtering(self):
+        q = self.ledger.query().between("2025-02-01", "2025-03-31").expenses().amount_over(50).text("uber")
+        self.assertEqual([t["description"] for t in q], ["Uber eats pizza"])
+        expected = [t for t in self.ledger.transactions
+                    if t["type"] == "expense" and t["amount"] > 50 and "2025-02-01" <= t["date"] <= "2025-03-31"]
+        self.assertEqual(self.ledger.query().between("2025-02-01", "2025-03-31").expenses().amount_over(50).all(),
+                         expected)
+
+    def test_aggregate_terminals(self):
+        q = self.ledger.query().expenses()
+        self.assertEqual(q.count(), 4)
+        self.assertEqual(q.sum(), 235.0)
+        self.assertEqual(self.ledger.query().expenses().group_by("month"),
+                         {"2025-01": 25.0, "2025-02": 140.0, "2025-03": 70.0})
+        self.assertEqual(self.ledger.query().category("transportation").group_by("category"),
+                         {"Transportation": 95.0})
+
+    def test_planner_picks_most_selective_index(self):
+        q = self.ledger.query().expenses().in_month(2025, 1)
+        self.assertTrue(q.explain().startswith("month index"))
+        q = self.ledger.query().between("2025-01-01", "2025-12-31").income()
+        self.assertTrue(q.explain().startswith("type index"))
+        self.assertEqual(self.ledger.query().explain(), "full scan: ~5 candidate rows")
+
+
+class TestAmountIndex(unittest.TestCase):
+    """Tests for amount-range and top-N queries on the amount-sorted index."""
+
+    def setUp(self):
+        self.ledger = FinanceLedger("Alex")
+        for desc, amount, date in [("Rent", 1500.0, "2025-01-01"), ("TV", 700.0, "2025-01-20"),
+                                   ("Coffee", 4.0, "2025-02-01"), ("Laptop", 1200.0, "2025-02-15"),
+                                   ("Snack", 4.0, "2025-03-01"), ("Couch", 900.0, "2024-12-10")]:
+            self.ledger.add_transaction("expense", desc, amount, date)
+        self.ledger.add_transaction("income", "Bonus", 5000.0, "2025-02-20")
+
+    def test_amount_range_is_insertion_ordered(self):
+        over = self.ledger.amount_range(700)
+        self.assertEqual([t["description"] for t in over], ["Rent", "TV", "Laptop", "Couch"])
+        self.assertEqual(self.ledger.query().expenses().amount_over(700).explain(), "amount index: ~3 candidate rows")
+
+    def test_top_n_with_date_bounds(self):
+        top = self.ledger.largest(2, start_date="2025-01-01", end_date="2025-12-31")
+        self.assertEqual([t["amount"] for t in top], [1500.0, 1200.0])
+        self.assertEqual([t["description"] for t in self.ledger.smallest(2)], ["Coffee", "Snack"])
+        self.assertEqual(self.ledger.largest(1, ttype="income")[0]["amount"], 5000.0)
+
+    def test_index_stays_correct_after_inserts(self):
+        self.ledger.add_transaction("expense", "Car repair", 1300.0, "2025-03-05")
+        self.assertEqual([t["amount"] for t in self.ledger.largest(3)], [1500.0, 1300.0, 1200.0])
+        self.assertEqual(len(self.ledger.amount_range(1000, 1400)), 2)
+
+    def test_interleaved_appends_keep_amount_order(self):
+        rng = random.Random(5)
+        ledger = FinanceLedger("Alex")
+        amounts = []
+        for batch in range(5):
+            rows = [{"type": "expense", "description": f"Item {batch}-{i}", "date": "2025-04-01",
+                     "amount": rng.choice([5.0, 12.5, 40.0, 99.99])} for i in range(50)]
+            ledger.add_transactions(rows)
+            amounts += [r["amount"] for r in rows]
+            # ties come back in insertion order, both before and after the pending rows are merged
+            ties = [t["description"] for t in ledger.amount_range(12.5, 12.5)]
+            self.assertEqual(ties, [f"Item {b}-{i}" for b in range(batch + 1) for i in range(50)
+                                    if amounts[b * 50 + i] == 12.5])
+            self.assertEqual([t["amount"] for t in ledger.smallest(len(amounts))], sorted(amounts))
+
+    def test_single_inserts_use_the_recent_run_and_fold(self):
+        rng = random.Random(9)
+        ledger = FinanceLedger("Alex")
+        ledger.add_transactions([{"type": "expense", "description": f"Bulk {i}", "date": "2025-04-01",
+                                  "amount": float(rng.randint(1, 20))} for i in range(100)])
+        with mock.patch.object(LedgerIndexes, "_MIN_FOLD", 8):
+            for i in range(40):
+                ledger.add_transaction("expense", f"Single {i}", float(rng.randint(1, 20)), "2025-04-02")
+                expected = ledger.transactions
+                runs = ledger._indexes.amount_runs("expense")
+                self.assertLessEqual(len(runs), 2)
+                self.assertEqual(sum(len(a) for a, _ in runs), len(expected))
+                in_range = [t["description"] for t in expected if 5 <= t["amount"] <= 9]
+                self.assertEqual([t["description"] for t in ledger.amount_range(5, 9)], in_range)
+                by_amount = sorted(expected, key=lambda t: t["amount"])
+                self.assertEqual([t["description"] for t in ledger.smallest(10)],
+                                 [t["description"] for t in by_amount[:10]])
+
+
+class TestRunningStatsAndAnomalies(unittest.TestCase):
+    """Tests for Welford statistics and anomaly flags."""
+
+    def setUp(self):
+        self.ledger = FinanceLedger("Alex", anomaly_threshold=5.0)
+        self.amounts = [52.3, 61.0, 48.75, 55.2, 58.9, 49.99, 60.01, 53.5]
+        for i, amount in enumerate(self.amounts):
+            self.ledger.add_transaction("expense", "Safeway groceries", amount, f"2025-01-{i + 1:02d}")
+
+    def test_matches_full_recomputation(self):
+        food = self.ledger.category_stats()["food"]
+        self.assertEqual(food["count"], len(self.amounts))
+        self.assertAlmostEqual(food["mean"], statistics.mean(self.amounts), places=9)
+        self.assertAlmostEqual(food["variance"], statistics.variance(self.amounts), places=9)
+        merged = RunningStats()
+        for half in (self.amounts[:3], self.amounts[3:]):
+            part = RunningStats()
+            for x in half:
+                part.update(x)
+            merged.merge(part)
+        self.assertAlmostEqual(merged.variance, statistics.variance(self.amounts), places=9)
+
+    def test_on_insert_hook_flags_outlier(self):
+        flagged = []
+        self.ledger.on_anomaly(flagged.append)
+        self.ledger.add_transaction("expense", "Safeway groceries", 56.0, "2025-01-20")
+        self.assertEqual(flagged, [])
+        self.ledger.add_transaction("expense", "Safeway groceries", 400.0, "2025-01-21")
+        self.assertEqual({a.scope for a in flagged}, {"category", "merchant"})
+        self.assertIsInstance(flagged[0], Anomaly)
+        self.assertGreater(flagged[0].z_score, 5.0)
+
+    def test_anomalies_scan_uses_current_stats(self):
+        self.ledger.add_transaction("expense", "Safeway groceries", 2000.0, "2025-01-21")
+        found = self.ledger.anomalies(threshold=2.0)
+        self.assertEqual([a.record["amount"] for a in found], [2000.0])
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """Tests for the KLL sketches behind spending_percentiles()."""
+
+    @staticmethod
+    def _rank(ordered, value):
+        return sum(1 for x in ordered if x <= value) / len(ordered)
+
+    def test_large_stream_stays_bounded_and_accurate(self):
+        rng = random.Random(7)
+        data = [rng.lognormvariate(3, 1) for _ in range(50000)]
+        halves = [QuantileSketch(), QuantileSketch()]
+        for i, x in enumerate(data):
+            halves[i % 2].update(x)
+        merged = merge_sketches(halves)
+        self.assertEqual(merged.count, len(data))
+        self.assertLess(sum(map(len, merged._compactors)), 1000)
+        ordered = sorted(data)
+        for q in (0.5, 0.9, 0.99):
+            self.assertAlmostEqual(self._rank(ordered, merged.quantile(q)), q, delta=0.02)
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(merged.to_dict())))
+        self.assertEqual(restored.quantile(0.5), merged.quantile(0.5))
+
+    def test_ledger_percentiles_by_category_and_month(self):
+        ledger = FinanceLedger("Alex")
+        for day in range(1, 21):
+            ledger.add_transaction("expense", "Safeway groceries", float(day), f"2025-01-{day:02d}")
+        ledger.add_transaction("expense", "Uber ride", 500.0, "2025-02-01")
+        self.assertEqual(ledger.spending_percentiles(category="Food", percentiles=(50, 90)),
+                         {"p50": 10.0, "p90": 18.0})
+        self.assertEqual(ledger.spending_percentiles(month="2025-02")["p50"], 500.0)
+        self.assertEqual(ledger.spending_percentiles(category="travel"), {"p50": None, "p90": None, "p99": None})
+        self.assertEqual(ledger.spending_percentiles(percentiles=[100])["p100"], 500.0)
+        with self.assertRaises(ValueError):
+            ledger.spending_percentiles(category="food", month="2025-01")
+        sketches = ledger.quantile_sketches("month")
+        self.assertEqual(sorted(sketches), ["2025-01", "2025-02"])
+        sketches["2025-01"].update(1e6)  # copies: the ledger is unaffected
+        self.assertEqual(ledger.spending_percentiles(month="2025-01", percentiles=[100])["p100"], 20.0)
+
+
+class TestAsyncPersistence(unittest.IsolatedAsyncioTestCase):
+    """Tests for asave/aload/aexport_monthly_report."""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "ledger.json")
+        self.ledger = FinanceLedger("Alex", {"food": 100.0})
+        self.ledger.add_transaction("expense", "Safeway groceries", 80.0, "2025-11-03")
+        self.ledger.add_transaction("income", "Payroll", 2000.0, "2025-11-01")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    async def test_round_trip_is_silent_and_atomic(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            await self.ledger.asave(self.path)
+            loaded = await FinanceLedger.aload(self.path)
+            report = await self.ledger.aexport_monthly_report(2025, 11, os.path.join(self.dir.name, "r.csv"))
+        self.assertEqual(out.getvalue(), "")
+        self.assertEqual(loaded.transactions, self.ledger.transactions)
+        self.assertEqual(loaded.category_budgets, {"food": 100.0})
+        self.assertEqual(sorted(os.listdir(self.dir.name)), ["ledger.json", "r.csv"])  # no temp files left
+        sync_report = os.path.join(self.dir.name, "sync.csv")
+        with contextlib.redirect_stdout(out):
+            self.ledger.export_monthly_report(2025, 11, sync_report)
+        with open(report, encoding="utf-8") as a, open(sync_report, encoding="utf-8") as b:
+            self.assertEqual(a.read(), b.read())
+
+    async def test_burst_of_saves_coalesces(self):
+        writes = []
+        original = self.ledger._write_snapshot
+
+        def counting(filename, data, compression=None):
+            writes.append(len(data["transactions"]))
+            original(filename, data, compression)
+        self.ledger._write_snapshot = counting
+        await asyncio.gather(*(self.ledger.asave(self.path) for _ in range(10)))
+        self.assertEqual(writes, [2])
+        first = asyncio.ensure_future(self.ledger.asave(self.path))
+        await asyncio.sleep(0.01)  # let the first write start
+        self.ledger.add_transaction("expense", "Uber ride", 12.0, "2025-11-04")
+        await asyncio.gather(first, *(self.ledger.asave(self.path) for _ in range(5)))
+        self.assertEqual(writes, [2, 2, 3])  # one in-flight write plus one follow-up with the new row
+        self.assertEqual(len((await FinanceLedger.aload(self.path)).transactions), 3)
+
+    async def test_cancelled_save_does_not_block_later_saves(self):
+        # Cancelled after one loop tick, before its write started
+        first = asyncio.ensure_future(self.ledger.asave(self.path))
+        joined = asyncio.ensure_future(self.ledger.asave(self.path))
+        await asyncio.sleep(0)
+        first.cancel()
+        results = await asyncio.gather(first, joined, return_exceptions=True)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertIsNone(results[1])  # the joined caller started the write itself
+        self.assertEqual(self.ledger._save_slots, {})
+        self.assertEqual(len((await FinanceLedger.aload(self.path)).transactions), 2)
+        await asyncio.wait_for(self.ledger.asave(self.path), timeout=3)
+        self.assertEqual(self.ledger._save_slots, {})
+
+    async def test_cancelled_save_finishes_its_write(self):
+        writes = []
+        original = self.ledger._write_snapshot
+
+        def slow(filename, data, compression=None):
+            time.sleep(0.05)
+            original(filename, data, compression)
+            writes.append(len(data["transactions"]))
+        self.ledger._write_snapshot = slow
+        first = asyncio.ensure_future(self.ledger.asave(self.path))
+        joined = asyncio.ensure_future(self.ledger.asave(self.path))
+        await asyncio.sleep(0.01)  # the write is in flight
+        first.cancel()
+        self.ledger.add_transaction("expense", "Uber ride", 12.0, "2025-11-04")
+        await asyncio.wait_for(self.ledger.asave(self.path), timeout=3)
+        results = await asyncio.gather(first, joined, return_exceptions=True)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertIsNone(results[1])
+        self.assertEqual(writes, [2, 3])  # the later save waited for the cancelled caller's write
+        self.assertEqual(self.ledger._save_slots, {})
+        self.assertEqual(len((await FinanceLedger.aload(self.path)).transactions), 3)
+
+    async def test_event_loop_keeps_serving_during_large_save(self):
+        self.ledger.add_transactions(generate_transactions(10000, seed=3, mixed_dates=False))
+        ticks = []
+        stop = asyncio.Event()
+
+        async def heartbeat():
+            while not stop.is_set():
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.001)
+        beat = asyncio.create_task(heartbeat())
+        await self.ledger.asave(self.path)
+        stop.set()
+        await beat
+        self.assertGreater(len(ticks), 5)
+        self.assertLess(max(b - a for a, b in zip(ticks, ticks[1:])), 0.05)
+        self.assertEqual(len((await FinanceLedger.aload(self.path)).transactions), 10002)
+
+
+class TestCompressedSnapshots(unittest.TestCase):
+    """Tests for gzip/bz2/lzma snapshots in both ledger formats."""
+
+    MAGIC = {"gzip": b"\x1f\x8b", "bz2": b"BZh", "lzma": b"\xfd7zXZ"}
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ledger = FinanceLedger("Alex", {"food": 300.0})
+        self.ledger.add_transactions(generate_transactions(300, seed=5, mixed_dates=False))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def _magic(self, path, codec):
+        with open(path, "rb") as f:
+            return f.read(len(self.MAGIC[codec])) == self.MAGIC[codec]
+
+    def test_codec_from_extension(self):
+        plain = self._path("ledger.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.ledger.save_to_file(plain)
+            for codec, ext in benchmark.CODEC_SUFFIXES.items():
+                path = self._path("ledger.json" + ext)
+                self.ledger.save_to_file(path)
+                self.assertTrue(self._magic(path, codec), codec)
+                self.assertLess(os.path.getsize(path), os.path.getsize(plain) / 4)
+                self.assertEqual(FinanceLedger.load_from_file(path).transactions, self.ledger.transactions)
+
+    def test_codec_from_argument(self):
+        path = self._path("ledger.snapshot")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.ledger.save_to_file(path, compression="lzma")
+            self.assertTrue(self._magic(path, "lzma"))
+            loaded = FinanceLedger.load_from_file(path, compression="lzma")
+            self.assertEqual(loaded.transactions, self.ledger.transactions)
+            self.ledger.save_to_file(self._path("plain.gz"), compression="none")
+            with open(self._path("plain.gz"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["owner"], "Alex")
+        with self.assertRaises(ValueError):
+            asyncio.run(self.ledger.asave(path, compression="zip"))
+
+    def test_saved_file_permissions(self):
+        for umask in (0o022, 0o077):
+            path = self._path(f"ledger-{umask:o}.json.gz")
+            previous = os.umask(umask)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.ledger.save_to_file(path)  # a new file gets open()'s mode under the umask
+                    self.assertEqual(os.stat(path).st_mode & 0o777, 0o666 & ~umask)
+                    os.chmod(path, 0o640)
+                    self.ledger.save_to_file(path)  # a replaced file keeps its mode
+            finally:
+                os.umask(previous)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+        self.assertEqual([n for n in os.listdir(os.path.dirname(path)) if n.endswith(".tmp")], [])
+
+    def test_finance_json_round_trip(self):
+        ledger = finance_json.FinanceLedger("Alex", {"food": 300.0})
+        ledger.transactions = self.ledger.transactions
+        path = self._path("fj.json.bz2")
+        ledger.save_to_json(path)
+        self.assertTrue(self._magic(path, "bz2"))
+        self.assertEqual(finance_json.FinanceLedger.load_from_json(path).transactions, ledger.transactions)
+
+
+class TestPartitionedStorage(unittest.TestCase):
+    """Tests for month-partitioned save/open with lazy loading."""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "ledger")
+        self.ledger = FinanceLedger("Alex", {"food": 300.0})
+        self.ledger.add_transactions(generate_transactions(600, seed=11, mixed_dates=False))
+        self.months = self.ledger.loaded_months()
+        self.assertEqual(self.ledger.save_partitioned(self.path), self.months)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_queries_load_only_the_months_they_touch(self):
+        lazy = FinanceLedger.open_partitioned(self.path)
+        self.assertEqual(lazy.loaded_months(), [])
+        year, month = map(int, self.months[1].split("-"))
+        self.assertEqual(lazy.month_summary(year, month), self.ledger.month_summary(year, month))
+        self.assertEqual(lazy.loaded_months(), [self.months[1]])
+        self.assertEqual(lazy.total_spent(), self.ledger.total_spent())  # manifest aggregates only
+        self.assertEqual(lazy.loaded_months(), [self.months[1]])
+        start = f"{self.months[0]}-15"
+        self.assertEqual(lazy.total_spent(start, None), self.ledger.total_spent(start, None))
+        self.assertEqual(lazy.loaded_months(), self.months[:2])  # only the month the range cuts through
+        self.assertEqual(len(lazy.search("uber")), len(self.ledger.search("uber")))
+        self.assertEqual(lazy.loaded_months(), self.months)
+
+    def test_lazy_loads_do_not_notify(self):
+        lazy = FinanceLedger.open_partitioned(self.path)
+        events, anomalies = [], []
+        lazy.subscribe_budget_events(events.append)
+        lazy.on_anomaly(anomalies.append)
+        year, month = map(int, self.months[-1].split("-"))
+        lazy.month_summary(year, month)
+        lazy.search("uber")
+        self.assertEqual(lazy.loaded_months(), self.months)
+        self.assertEqual((events, anomalies), ([], []))
+        # the history is still rebuilt, in the order the months were loaded
+        self.assertEqual(sorted(lazy.budget_events, key=lambda e: e.month),
+                         sorted(self.ledger.budget_events, key=lambda e: e.month))
+        lazy.add_transaction("expense", "Safeway groceries", 5000.0, f"{self.months[-1]}-28")
+        self.assertEqual(len(anomalies), 2)  # new rows still reach the hooks
+
+    def test_adding_to_an_unloaded_month_notifies_against_its_stored_rows(self):
+        ledger = FinanceLedger("Alex", {"food": 100.0})
+        ledger.add_transaction("expense", "Safeway groceries", 95.0, "2025-03-02")
+        for day, fare in enumerate([18.0, 20.0, 22.0, 19.0, 21.0], start=1):
+            ledger.add_transaction("expense", "Uber ride", fare, f"2025-04-{day:02d}")
+        path = os.path.join(self.dir.name, "small")
+        ledger.save_partitioned(path)
+        lazy = FinanceLedger.open_partitioned(path)
+        events = []
+        lazy.subscribe_budget_events(events.append)
+        lazy.add_transaction("expense", "Pizza night", 10.0, "2025-03-09")
+        self.assertEqual([(e.month, e.category, e.status) for e in events], [("2025-03", "food", "exceeded")])
+        self.assertEqual(lazy.loaded_months(), ["2025-03"])
+        anomalies = []
+        lazy.on_anomaly(anomalies.append)
+        lazy.add_transaction("expense", "Uber ride", 200.0, "2025-05-02")
+        self.assertEqual(lazy.loaded_months(), ["2025-03", "2025-04", "2025-05"])
+        # judged against April's stored rides, not an empty history
+        self.assertEqual(sorted(a.scope for a in anomalies), ["category", "merchant"])
+
+    def test_category_rules_survive_a_round_trip(self):
+        rules = RuleSet(list(RuleSet.default_rules()) + [CategoryRule("Rideshare", "UBER", priority=100)])
+        self.ledger.set_rules(rules)
+        path = os.path.join(self.dir.name, "ruled")
+        self.ledger.save_partitioned(path)
+        lazy = FinanceLedger.open_partitioned(path)
+        self.assertEqual(lazy.rules.to_dict(), rules.to_dict())
+        self.assertEqual(lazy.top_categories(10), self.ledger.top_categories(10))
+        self.assertIn("Rideshare", dict(lazy.top_categories(10)))
+        plain = FinanceLedger.open_partitioned(path, rules=RuleSet.default_rules())
+        self.assertNotIn("Rideshare", dict(plain.top_categories(10)))
+
+    def test_save_rewrites_only_dirty_months(self):
+        lazy = FinanceLedger.open_partitioned(self.path)
+        last = self.months[-1]
+        lazy.add_transaction("expense", "Late coffee", 4.5, f"{last}-02")
+        untouched = os.path.join(self.path, "months", f"{self.months[0]}.json")
+        before = os.stat(untouched).st_mtime_ns
+        self.assertEqual(lazy.save_partitioned(self.path), [last])
+        self.assertEqual(lazy.save_partitioned(self.path), [])
+        self.assertEqual(os.stat(untouched).st_mtime_ns, before)
+        reopened = FinanceLedger.open_partitioned(self.path)
+        self.assertEqual(len(reopened.transactions), len(self.ledger.transactions) + 1)
+        self.assertEqual(reopened.category_budgets, {"food": 300.0})
+
+
+class TestConcurrentLedger(unittest.TestCase):
+    """Stress tests for concurrent mode: one writer, several snapshot readers."""
+
+    def setUp(self):
+        self.rows = list(generate_transactions(4000, seed=5, mixed_dates=False))
+        # No read cache: these tests time and race the reads themselves
+        self.ledger = FinanceLedger("Alex", concurrent=True, cache_size=0)
+        self.ledger.add_transactions(self.rows[:1000])
+
+    def _run(self, readers, read, duration):
+        """Run one appending writer and `readers` reader threads for `duration` seconds; return reads done."""
+        stop = threading.Event()
+        counts, errors = [0] * readers, []
+
+        def writer():
+            for r in self.rows[1000:]:
+                if stop.is_set():
+                    break
+                self.ledger.add_transaction(r["type"], r["description"], r["amount"], r["date"])
+
+        def reader(slot):
+            try:
+                while not stop.is_set():
+                    read()
+                    counts[slot] += 1
+            except Exception as e:  # surfaced below; a failing thread must not pass silently
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(i,))
+                                                       for i in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        return sum(counts)
+
+    def test_readers_see_consistent_snapshots(self):
+        last_seen = threading.local()
+
+        def read():
+            snap = self.ledger.snapshot()
+            self.assertGreaterEqual(snap.epoch, getattr(last_seen, "epoch", 0))  # epochs only move forward
+            last_seen.epoch = snap.epoch
+            expected = round(sum(r["amount"] for r in self.rows[:snap.epoch] if r["type"] == "expense"), 2)
+            self.assertEqual(snap.total_spent(), expected)
+            self.assertEqual(len(snap.search("")), snap.epoch)
+            self.assertLessEqual(self.ledger.query().expenses().count(), len(self.ledger.transactions))
+        self.assertGreater(self._run(3, read, 0.3), 0)
+
+    def test_read_throughput_scales_with_reader_threads(self):
+        read = lambda: self.ledger.month_summary(2015, 1)
+        throughput = {n: self._run(n, read, 0.25) for n in (1, 2, 4)}
+        # Readers never queue behind the writer or each other, so adding readers never costs throughput;
+        # under the GIL total CPU is shared, and only a free-threaded build gains real parallel speedup
+        self.assertGreater(throughput[4], 0.6 * throughput[1])
+        if not getattr(sys, "_is_gil_enabled", lambda: True)() and (os.cpu_count() or 1) >= 4:
+            self.assertGreater(throughput[4], 2 * throughput[1])
+
+
+class TestKeywordIndex(unittest.TestCase):
+    """Tests for the corpus-level keyword index."""
+
+    def setUp(self):
+        self.records = [
+            {"description": "Uber ride downtown", "date": "2024-03-01"},
+            {"description": "Uber ride airport", "date": "2024-03-09"},
+            {"description": "Starbucks coffee", "date": "2024-04-02"},
+            {"description": "Coffee beans purchase", "date": "2024-04-20"},
+        ]
+
+    def test_frequency_tables(self):
+        index = KeywordIndex(self.records)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.document_frequency("uber"), 2)
+        self.assertEqual(index.top_keywords(1)[0][1], 2)
+        self.assertEqual(index.month_keywords("2024-04", 1)[0][0], "coffee")
+
+    def test_single_description_matches_extract_financial_keywords(self):
+        desc = "Amazon Prime Video Subscription - Entertainment"
+        index = KeywordIndex([{"description": desc}])
+        self.assertEqual([t for t, _ in index.top_keywords(4)], extract_financial_keywords(desc, 4))
+
+    def test_ledger_index_updates_incrementally(self):
+        ledger = FinanceLedger("Alex")
+        ledger.add_transaction("expense", "Netflix", 15.0, "2025-11-01")
+        index = ledger.keyword_index()
+        ledger.add_transaction("expense", "Netflix premium", 20.0, "2025-12-01")
+        self.assertEqual(index.document_frequency("netflix"), 2)
+        self.assertEqual(ledger.keyword_index().month_keywords("2025-12", 1)[0][0], "premium")
+
+
+class TestTransactionClass(unittest.TestCase):
+    """Tests for the slotted, lazily categorized Transaction."""
+
+    def test_category_is_lazy_and_correct(self):
+        txn = Transaction("t1", "  Uber ride ", 12.0, "expense", "03/05/2024")
+        self.assertIsNone(txn._category)
+        self.assertEqual(txn.category, "Transportation")
+        self.assertEqual(txn.date, "2024-03-05")
+        self.assertFalse(hasattr(txn, "__dict__"))
+
+    def test_from_trusted_matches_validated_constructor(self):
+        checked = Transaction("t1", "Netflix", 15.0, "expense", "2024-03-01")
+        trusted = Transaction.from_trusted("t1", "Netflix", 15.0, "expense", "2024-03-01")
+        self.assertEqual(str(trusted), str(checked))
+
+
+class TestSpendingAnalyzer(unittest.TestCase):
+    """Tests for the cached single-pass SpendingAnalyzer."""
+
+    def setUp(self):
+        self.txns = [
+            Transaction("t1", "Starbucks coffee", 5.0, "expense", "2024-01-10"),
+            Transaction("t2", "Uber ride", 20.0, "expense", "2024-01-12"),
+            Transaction("t3", "Payroll deposit", 1000.0, "income", "2024-01-15"),
+            Transaction("t4", "Pizza night", 30.0, "expense", "2024-02-03"),
+        ]
+        self.analyzer = SpendingAnalyzer(self.txns)
+
+    def test_summary_statistics(self):
+        self.assertEqual(self.analyzer.total_spent(), 55.0)
+        self.assertEqual(self.analyzer.average_spending(), 18.33)
+        self.assertEqual(self.analyzer.average_spending("Food"), 17.5)
+        self.assertEqual(self.analyzer.top_categories(1), [("Food", 35.0)])
+
+    def test_spending_trends_uses_expenses(self):
+        trends = self.analyzer.spending_trends()
+        self.assertEqual(trends["monthly_totals"], {"2024-01": 25.0, "2024-02": 30.0})
+        self.assertEqual(trends["trend"], "increasing")
+
+    def test_extend_matches_full_recompute(self):
+        self.analyzer.total_spent()  # populate the cache before extending
+        extra = [Transaction("t5", "Netflix", 15.0, "expense", "2024-03-01")]
+        self.analyzer.extend(extra)
+        fresh = SpendingAnalyzer(self.txns + extra)
+        self.assertEqual(self.analyzer.summary(), fresh.summary())
+
+    def test_replacing_transactions_invalidates_cache(self):
+        self.analyzer.total_spent()
+        self.analyzer.transactions = self.txns[:1]
+        self.assertEqual(self.analyzer.total_spent(), 5.0)
+
+    def test_streaming_matches_list_mode(self):
+        stream = SpendingAnalyzer.streaming(t for t in self.txns)
+        self.assertTrue(stream.is_streaming)
+        self.assertEqual(stream.summary(), self.analyzer.summary())
+        self.assertEqual(stream.spending_trends(), self.analyzer.spending_trends())
+        with self.assertRaises(ValueError):
+            stream.transactions
+
+    def test_streaming_validates_lazily(self):
+        stream = SpendingAnalyzer.streaming(iter([self.txns[0], object()]))
+        with self.assertRaises(ValueError):
+            stream.total_spent()
+
+    def test_streaming_failure_is_sticky(self):
+        # A bad item mid-stream must not leave later calls returning partial totals
+        stream = SpendingAnalyzer.streaming(iter([self.txns[0], object(), self.txns[1]]))
+        with self.assertRaises(ValueError):
+            stream.total_spent()
+        with self.assertRaises(ValueError):
+            stream.total_spent()
+        with self.assertRaises(ValueError):
+            stream.summary()
+
+    def test_streaming_type_error_is_sticky(self):
+        bad = types.SimpleNamespace(amount="x", txn_type="expense", category="Food", date="2024-01-11")
+        stream = SpendingAnalyzer.streaming(iter([self.txns[0], bad, self.txns[1]]))
+        with self.assertRaises(TypeError):
+            stream.total_spent()
+        with self.assertRaises(ValueError):
+            stream.total_spent()
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Tests for opt-in call counters and timings."""
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_leaves_functions_untouched(self):
+        original = library_financial_functions.categorize_transaction
+        instrumentation.enable()
+        self.assertIsNot(library_financial_functions.categorize_transaction, original)
+        instrumentation.disable()
+        self.assertIs(library_financial_functions.categorize_transaction, original)
+
+    def test_global_and_ledger_stats(self):
+        instrumentation.enable()
+        ledger = FinanceLedger("Alex", {"food": 100})
+        ledger.add_transaction("expense", "Coffee", 4.0, "2025-11-01")
+        ledger.add_transaction("expense", "Pizza", 14.0, "2025-11-02")
+        ledger.month_summary(2025, 11)
+        stats = instrumentation.get_stats()
+        self.assertEqual(stats["FinanceLedger.add_transaction"]["calls"], 2)
+        # two from add_transaction, four from the month filter (bounds + each row)
+        self.assertEqual(stats["library_financial_functions.parse_date"]["calls"], 6)
+        self.assertEqual(ledger.stats()["month_summary"]["rows"], 2)
+
+    def test_profile_block_reports_only_its_calls(self):
+        with instrumentation.profile(stream=None) as report:
+            library_financial_functions.compute_category_totals(
+                [{"type": "expense", "amount": 3, "description": "Uber"}])
+        self.assertEqual(report["library_financial_functions.categorize_transaction"]["calls"], 1)
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual(instrumentation.get_stats(), {})
+
+    def test_counts_calls_bound_by_any_module(self):
+        ledger = FinanceLedger("Alex")
+        with instrumentation.profile(stream=None) as report:
+            ledger.query().between("2025-11-01", "2025-11-30").all()
+            Transaction("T1", "Zzyzx Road Diner", 9.0, "expense", "2025-11-03").category
+        # two parse_date calls from ledger_query.between(), one from Transaction; the
+        # categorization cache forwards its miss
+        self.assertEqual(report["library_financial_functions.parse_date"]["calls"], 3)
+        self.assertEqual(report["library_financial_functions.categorize_transaction"]["calls"], 1)
+
+    def test_recording_from_threads(self):
+        instrumentation.enable()
+
+        def work():
+            for _ in range(500):
+                library_financial_functions.to_cents(1.25)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = instrumentation.get_stats()["library_financial_functions.to_cents"]
+        self.assertEqual(stats["calls"], 2000)
+        self.assertEqual(stats["rows"], 2000)
+
+
+class TestLedgerCli(unittest.TestCase):
+    """Tests for the batch-processing command line."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.rows = list(generate_transactions(500, seed=21, mixed_dates=False))
+        self.csv_path = self.path("bank.csv")
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=ledger_cli.CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.rows)
+            writer.writerow({"type": "expense", "description": "Bad", "amount": "-3", "date": "2024-13-01"})
+        self.ledger = FinanceLedger("Alex", {"food": 400.0})
+        self.ledger.add_transactions(self.rows)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def run_cli(self, *argv):
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            code = ledger_cli.main(list(argv))
+        return code, out.getvalue(), err.getvalue()
+
+    def test_import_then_summarize(self):
+        code, _, err = self.run_cli("import", self.csv_path, "--output", self.path("ledger.json.gz"),
+                                    "--owner", "Alex", "--budget", "food=400", "--chunk-size", "64")
+        self.assertEqual(code, 0, err)
+        self.assertIn("501 rows, 1 rejected", err)
+        self.assertIn("rows/s", err)
+        self.assertIn("peak memory", err)
+        self.assertIn("row 500: amount", err)
+        code, out, err = self.run_cli("summarize", self.path("ledger.json.gz"), "--output-format", "json")
+        self.assertEqual(code, 0, err)
+        report = json.loads(out)
+        self.assertEqual(report["owner"], "Alex")
+        self.assertEqual(list(report["months"]), self.ledger.loaded_months())
+        key = self.ledger.loaded_months()[0]
+        year, month = int(key[:4]), int(key[5:7])
+        self.assertEqual(report["months"][key]["categories"], self.ledger.month_category_spend(year, month))
+        self.assertAlmostEqual(report["months"][key]["expenses"],
+                               self.ledger.query().in_month(year, month).expenses().sum())
+
+    def test_import_fails_when_the_output_cannot_be_written(self):
+        target = self.path(os.path.join("missing", "ledger.json"))
+        code, out, err = self.run_cli("import", self.csv_path, "--output", target)
+        self.assertEqual(code, 1)
+        self.assertIn("error", err)
+        self.assertEqual(out, "")
+        self.assertFalse(os.path.exists(target))
+
+    def test_partitioned_import_keeps_rules(self):
+        rules = RuleSet(list(RuleSet.default_rules()) + [CategoryRule("Rideshare", "UBER", priority=100)])
+        rules.save(self.path("rules.json"))
+        code, _, err = self.run_cli("import", self.csv_path, "--output", self.path("parts"), "--partitioned",
+                                    "--rules", self.path("rules.json"))
+        self.assertEqual(code, 0, err)
+        reopened = FinanceLedger.open_partitioned(self.path("parts"))
+        self.assertEqual(reopened.rules.to_dict(), rules.to_dict())
+
+    def test_convert_format_streams_valid_rows(self):
+        target = self.path("bank.jsonl.gz")
+        code, _, err = self.run_cli("convert-format", self.csv_path, target, "--chunk-size", "100")
+        self.assertEqual(code, 0, err)
+        self.assertIn("1 rejected", err)
+        rows = [row for chunk in ledger_cli.RowSource(target).chunks() for row in chunk]
+        self.assertEqual(rows, self.ledger.transactions)
+        code, _, err = self.run_cli("convert-format", target, self.path("bank.json"))
+        self.assertEqual(code, 0, err)
+        with open(self.path("bank.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f), self.ledger.transactions)
+
+    def test_export_reports_and_detect_recurring(self):
+        code, out, err = self.run_cli("export-reports", self.csv_path, "--owner", "Alex", "--budget", "food=400",
+                                      "--out-dir", self.path("reports"), "--workers", "2")
+        self.assertEqual(code, 0, err)
+        written = out.split()
+        self.assertEqual(len(written), len(self.ledger.loaded_months()))
+        key = self.ledger.loaded_months()[-1]
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.ledger.export_monthly_report(int(key[:4]), int(key[5:7]), self.path("expected.csv"))
+        with open(self.path("expected.csv"), encoding="utf-8") as a, open(written[-1], encoding="utf-8") as b:
+            self.assertEqual(a.read(), b.read())
+
+        code, out, err = self.run_cli("detect-recurring", self.csv_path, "--output-format", "csv")
+        self.assertEqual(code, 0, err)
+        found = list(csv.DictReader(io.StringIO(out)))
+        self.assertEqual([r["merchant"] for r in found], [r["merchant"] for r in self.ledger.detect_recurring()])
+
+    def test_errors_exit_nonzero(self):
+        code, _, err = self.run_cli("summarize", self.path("missing.csv"))
+        self.assertEqual(code, 1)
+        self.assertIn("error", err)
+        code, _, err = self.run_cli("summarize", self.csv_path, "--budget", "food")
+        self.assertEqual(code, 1)
+        with self.assertRaises(ValueError):
+            ledger_cli.file_format("ledger.txt")
+        self.assertEqual(ledger_cli.file_format("rows.ndjson.xz"), "jsonl")
+
+
+class TestPackageImports(unittest.TestCase):
+    """Tests for the lazily loaded SRC package."""
+
+    def run_python(self, code):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(benchmark.__file__)))
+        proc = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        return proc.stdout.split()
+
+    def test_package_import_loads_nothing_heavy(self):
+        loaded = self.run_python(
+            "import sys, SRC; print(*sorted(m for m in ('SRC.library_financial_functions', 'SRC.finance_ledger',"
+            " 'asyncio', 'multiprocessing') if m in sys.modules))")
+        self.assertEqual(loaded, [])
+        loaded = self.run_python(
+            "import sys, SRC; SRC.categorize_transaction('Uber'); SRC.FinanceLedger('Alex');"
+            " print(*sorted(m for m in ('SRC.finance_ledger', 'asyncio', 'multiprocessing') if m in sys.modules))")
+        self.assertEqual(loaded, ["SRC.finance_ledger"])
+
+    def test_import_leaves_global_import_state_alone(self):
+        out = self.run_python(
+            "import sys; before = (list(sys.path), list(sys.meta_path))\n"
+            "import SRC, SRC.finance_ledger; from SRC import RuleSet, ledger_reconcile\n"
+            "print(before == (sys.path, sys.meta_path), 'finance_ledger' in sys.modules,"
+            " RuleSet is SRC.category_rules.RuleSet, ledger_reconcile is sys.modules['SRC.ledger_reconcile'],"
+            " 'FinanceLedger' in dir(SRC))")
+        self.assertEqual(out, ["True", "False", "True", "True", "True"])
+
+    def test_unknown_names_raise(self):
+        out = self.run_python(
+            "import SRC\ntry:\n    SRC.parse_search_query\nexcept AttributeError:\n    print('missing')\n"
+            "print(set(SRC.__all__) <= set(dir(SRC)))")
+        self.assertEqual(out, ["missing", "True"])
+
+    def test_import_time_is_measured(self):
+        report = benchmark.check_import_budgets({"SRC.ledger_cache": 10_000.0}, runs=1)
+        self.assertGreater(report["SRC.ledger_cache"]["ms"], 0)
+        self.assertTrue(report["SRC.ledger_cache"]["ok"])
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Smoke tests for the synthetic generator and benchmark runner."""
+
+    def test_generator_is_seeded_and_parseable(self):
+        rows = list(generate_transactions(300, seed=7))
+        self.assertEqual(rows, list(generate_transactions(300, seed=7)))
+        ledger = FinanceLedger("Bench")
+        self.assertEqual(ledger.add_transactions(rows), [])
+        self.assertTrue(ledger.detect_recurring())
+
+    def test_every_public_callable_has_a_case(self):
+        self.assertEqual(benchmark.uncovered_public_api(), [])
+
+    def test_report_is_json_serializable(self):
+        report = benchmark.run_benchmarks([50], repeat=1, only="ledger.total", log=lambda line: None)
+        self.assertIn("ledger.total_spent", report["results"]["50"])
+        json.dumps(report)
+
+
 if __name__ == "__main__":
     unittest.main()
 